@@ -1,16 +1,19 @@
 import streamlit as st
 import os
-import base64
 from dotenv import load_dotenv
 from datetime import datetime
-import hashlib
+from functools import lru_cache
 import google.generativeai as genai
 from langchain_google_genai import GoogleGenerativeAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
-from langchain_community.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
 
+from configs.app_config import config
+from src.core.ingestion import ingest, iter_text_segments
+from src.ui.assets import get_profile_photo_background
+from src.ui.components import fragment, render_chat_history
+from src.utils.chat_history import get_session_chat_history
+
 # Load environment variables
 load_dotenv()
 
@@ -74,31 +77,9 @@ def initialize_embeddings():
         raise Exception("Unable to initialize any embedding system")
 
 def extract_pdf_text(uploaded_file):
-    """Extract text from PDF file using pypdf"""
-    try:
-        from pypdf import PdfReader
-        
-        # Reset file pointer to beginning
-        uploaded_file.seek(0)
-        
-        reader = PdfReader(uploaded_file)
-        text = ""
-        
-        for page_num, page in enumerate(reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            except Exception as e:
-                st.warning(f"Could not extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        if not text.strip():
-            raise Exception("No text could be extracted from the PDF")
-            
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error extracting PDF text: {str(e)}")
+    """Extract text from PDF file (pages in parallel, cached by page content)"""
+    from src.utils.file_processing import extract_pdf_text as extract_pdf_pages_text
+    return extract_pdf_pages_text(uploaded_file)
 
 # Configure Streamlit page
 st.set_page_config(
@@ -108,34 +89,50 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Initialize session state for chat history
-if "messages" not in st.session_state:
-    st.session_state.messages = []
-
 def get_kb_hash():
-    """Get hash of current knowledge base for caching."""
-    try:
-        with open("knowledge_base.txt", "r", encoding="utf-8") as f:
-            content = f.read()
-        return hashlib.md5(content.encode()).hexdigest()
-    except FileNotFoundError:
-        return "no_file"
-
-@st.cache_resource
-def validate_name_in_content(content: str) -> bool:
-    """Check if the content contains Abdolamir Karbalaie"""
-    name_variations = [
-        "Abdolamir Karbalaie",
-        "abdolamir karbalaie", 
-        "ABDOLAMIR KARBALAIE",
-        "Abdolamir",
-        "Karbalaie"
-    ]
-    content_lower = content.lower()
-    return any(name.lower() in content_lower for name in name_variations)
+    """Get hash of current knowledge base for caching (rehashed only when the file changes)."""
+    from src.utils.fingerprint import get_fingerprinter
+    return get_fingerprinter().content_hash("knowledge_base.txt")
+
+def validate_name_in_content(content: str, content_hash: str = None) -> bool:
+    """Check if the content contains Abdolamir Karbalaie (cached by content hash, not content)"""
+    from src.utils.name_validation import get_name_matcher
+    return get_name_matcher().matches(content, content_hash)
+
+def get_upload_hash() -> str:
+    """Get hash of the uploaded content (rehashed only when the file changes)."""
+    from src.utils.fingerprint import get_fingerprinter
+    return get_fingerprinter().content_hash("uploaded_content.txt")
+
+def get_active_content_hash(kb_hash: str, use_uploaded: bool) -> str:
+    """Hash of the content the pipeline indexes: the upload if selected and present."""
+    from src.utils.fingerprint import NO_FILE_HASH
+    upload_hash = get_upload_hash() if use_uploaded else NO_FILE_HASH
+    return upload_hash if upload_hash != NO_FILE_HASH else kb_hash
 
 def load_rag_pipeline(kb_hash: str, use_uploaded: bool = False):
-    """Load and cache the RAG pipeline."""
+    """Load the RAG pipeline, cached in the shared registry by content hash."""
+    from src.core.pipeline_registry import get_pipeline_registry
+    
+    content_hash = get_active_content_hash(kb_hash, use_uploaded)
+    cache_key = f"app:{content_hash}_{use_uploaded}"
+    
+    registry = get_pipeline_registry()
+    bundle = registry.get(cache_key)
+    if bundle is None:
+        bundle = build_rag_pipeline(kb_hash, use_uploaded)
+        if bundle is not None:
+            registry.put(cache_key, bundle, protected=not use_uploaded,
+                         content_hash=content_hash, resource_type="app")
+    return bundle
+
+def invalidate_rag_pipeline(content_hash: str):
+    """Drop the cached pipelines of one content version, leaving other users' cached."""
+    from src.core.pipeline_registry import get_pipeline_registry
+    get_pipeline_registry().invalidate(content_hash=content_hash, resource_type="app")
+
+def build_rag_pipeline(kb_hash: str, use_uploaded: bool = False):
+    """Build the RAG pipeline."""
     try:
         # Always read knowledge base as primary source
         with open("knowledge_base.txt", "r", encoding="utf-8") as f:
@@ -146,7 +143,7 @@ def load_rag_pipeline(kb_hash: str, use_uploaded: bool = False):
         if use_uploaded and os.path.exists("uploaded_content.txt"):
             with open("uploaded_content.txt", "r", encoding="utf-8") as f:
                 uploaded_content = f.read()
-                if validate_name_in_content(uploaded_content):
+                if validate_name_in_content(uploaded_content, get_upload_hash()):
                     content_to_use = uploaded_content
                 else:
                     st.warning("⚠️ Uploaded content doesn't contain your name. Using knowledge base instead.")
@@ -165,22 +162,12 @@ def load_rag_pipeline(kb_hash: str, use_uploaded: bool = False):
         model="gemini-2.0-flash-exp",
         google_api_key=os.getenv("GOOGLE_API_KEY"),
         temperature=0.3,
-        timeout=15
+        timeout=config.model.timeout
     )
     
-    # Split text
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=1000,
-        chunk_overlap=200,
-        length_function=len
-    )
-    chunks = text_splitter.split_text(cv_content)
-    
-    # Create embeddings with cached initialization
+    # Chunk, embed and index in streamed batches
     embeddings = initialize_embeddings()
-    
-    # Create vector store
-    vectorstore = FAISS.from_texts(chunks, embeddings)
+    vectorstore, _ = ingest(iter_text_segments(cv_content), embeddings)
     
     # Create custom prompt template for more natural responses
     template = """
@@ -222,22 +209,87 @@ def load_rag_pipeline(kb_hash: str, use_uploaded: bool = False):
     )
     
     built_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    return {"chain": qa_chain, "kb_hash": kb_hash, "built_at": built_at}
+    return {
+        "chain": qa_chain, "kb_hash": kb_hash, "built_at": built_at,
+        "vectorstore": vectorstore, "content_length": len(cv_content)
+    }
 
-# Inject CSS styles
-def _inject_css():
-    # Get profile image as base64 - try both locations
-    banner_b64 = ""
-    profile_paths = ["phto.jpg", "assets/profile.jpg"]
-    
-    for profile_path in profile_paths:
-        try:
-            with open(profile_path, "rb") as f:
-                banner_b64 = base64.b64encode(f.read()).decode()
-                break
-        except Exception:
-            continue
+def answer_question(qa_chain, prompt: str) -> str:
+    """Run the QA chain and turn its output or error into displayable text."""
+    try:
+        response = qa_chain.invoke({"query": prompt})
+        
+        # Handle different response formats from LangChain
+        if isinstance(response, dict):
+            response = response.get('result', str(response))
+        
+        if not response or (isinstance(response, str) and response.strip() == ""):
+            response = "I apologize, but I couldn't generate a response. This might be due to API limitations. Please try rephrasing your question or try again later."
+        
+    except Exception as e:
+        if "quota" in str(e).lower() or "limit" in str(e).lower():
+            response = "⚠️ API quota exceeded. The free tier has daily limits. Please try again later or upgrade your API plan."
+        else:
+            response = f"❌ Error: {str(e)}"
+    return response
+
+@fragment
+def render_chat(qa_chain):
+    """Quick start questions and chat; a chat turn reruns only this fragment."""
+    # Quick Start Questions
+    st.markdown("###  Quick Start Questions")
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        if st.button("🔚 End-to-End ML", use_container_width=True):
+            st.session_state.suggested_query = "Tell me about your end-to-end machine learning experience"
+    with col2:
+        if st.button(" Technical skills", use_container_width=True):
+            st.session_state.suggested_query = "Tell me about your Technical skills experience"
+    with col3:
+        if st.button(" Reliability", use_container_width=True):
+            st.session_state.suggested_query = "How do you ensure reliability in AI systems?"
+    with col4:
+        if st.button(" RAG", use_container_width=True):
+            st.session_state.suggested_query = "Tell me about your experience with RAG development and deployment"
     
+    # Chat Interface inside right column
+    st.markdown("---")
+    st.markdown("### 💬 Start Chatting")
+
+    # History renders above the input; new turns are appended to it in place
+    history_container = st.container()
+    user_prompt = st.chat_input("Ask about the CV/Resume...")
+
+    # Suggested queries take priority
+    if "suggested_query" in st.session_state:
+        user_prompt = st.session_state.suggested_query
+        del st.session_state.suggested_query
+
+    # Bounded chat history: recent turns in memory, older ones on disk
+    history = get_session_chat_history()
+
+    with history_container:
+        # Display the newest chat messages
+        render_chat_history(history, avatars={"assistant": "🤖", "user": "👤"})
+
+        if user_prompt:
+            # Add user message to chat history
+            history.append("user", user_prompt)
+            with st.chat_message("user", avatar="👤"):
+                st.markdown(user_prompt)
+            
+            with st.chat_message("assistant", avatar="🤖"):
+                with st.spinner("Thinking..."):
+                    response = answer_question(qa_chain, user_prompt)
+                st.markdown(response)
+            
+            # Add assistant response to chat history
+            history.append("assistant", response)
+
+# Inject CSS styles
+@lru_cache(maxsize=4)
+def _render_css(photo_background: str) -> str:
+    """Render the page CSS once per profile photo version."""
     css = f"""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
@@ -296,7 +348,7 @@ footer {{ visibility: hidden !important; }}
     width: 180px;
     height: 180px;
     border-radius: 50%;
-    background: url(data:image/jpeg;base64,{banner_b64}) center top 15px/cover no-repeat;
+    {photo_background}
     border: 4px solid rgba(255,255,255,0.8);
     box-shadow: 0 8px 20px rgba(0,0,0,0.15);
     position: relative;
@@ -455,9 +507,44 @@ div[data-testid="stChatMessage"].user-msg {{
 }}
 </style>
 """
-    st.markdown(css, unsafe_allow_html=True)
+    return css
+
+@lru_cache(maxsize=4)
+def _render_profile_css(photo_background: str) -> str:
+    """Render the profile card CSS once per profile photo version."""
+    return """
+    <style>
+    .profile-container {
+        background: #003147;
+        padding: 2rem;
+        border-radius: 20px;
+        text-align: center;
+        color: white;
+        margin-bottom: 1rem;
+    }
+    .profile-photo {
+        width: 150px;
+        height: 150px;
+        border-radius: 50%;
+        margin: 0 auto 1rem auto;
+        """ + photo_background + """
+        border: 4px solid rgba(255,255,255,0.8);
+        box-shadow: 0 8px 20px rgba(0,0,0,0.15);
+    }
+    .skill-tag {
+        background: rgba(255,255,255,0.2);
+        color: white;
+        padding: 4px 12px;
+        border-radius: 15px;
+        font-size: 0.8rem;
+        margin: 2px;
+        display: inline-block;
+    }
+    </style>
+    """
 
-_inject_css()
+# Resized profile photo variants are served from static/ and only regenerated when it changes
+st.markdown(_render_css(get_profile_photo_background("center top 15px")), unsafe_allow_html=True)
 
 # Simple header with dark blue background
 st.markdown("""
@@ -501,10 +588,15 @@ with st.sidebar:
                 st.success(f"✅ Text file uploaded: {uploaded_file.name}")
             
             if text_content.strip():
-                with open("uploaded_content.txt", "w", encoding="utf-8") as f:
-                    f.write(text_content)
+                # The uploader keeps the file across reruns; only act on new content
+                from src.utils.file_processing import get_content_hash
+                previous_hash = get_upload_hash()
+                if get_content_hash(text_content) != previous_hash:
+                    with open("uploaded_content.txt", "w", encoding="utf-8") as f:
+                        f.write(text_content)
+                    # Free the previous upload's pipeline; the knowledge base index stays hot
+                    invalidate_rag_pipeline(previous_hash)
                 st.success("✅ Content saved for processing")
-                st.cache_resource.clear()
             else:
                 st.error("❌ No readable content found")
         except Exception as e:
@@ -513,71 +605,28 @@ with st.sidebar:
     # Current knowledge base info
     st.subheader(" Knowledge Base Status")
     try:
-        with open("knowledge_base.txt", "r", encoding="utf-8") as f:
-            kb_content = f.read()
-        st.info(f" Base: {len(kb_content):,} characters")
+        from src.utils.fingerprint import get_fingerprinter
+        fingerprinter = get_fingerprinter()
+        st.info(f" Base: {fingerprinter.fingerprint('knowledge_base.txt').characters:,} characters")
         
         if os.path.exists("uploaded_content.txt"):
-            with open("uploaded_content.txt", "r", encoding="utf-8") as f:
-                uploaded_content = f.read()
-            st.info(f"📄 Uploaded: {len(uploaded_content):,} characters")
+            st.info(f"📄 Uploaded: {fingerprinter.fingerprint('uploaded_content.txt').characters:,} characters")
     except FileNotFoundError:
         st.warning("⚠️ Knowledge base file not found")
     
     # Manual rebuild
     if st.button("🔄 Rebuild Vectors"):
-        st.cache_resource.clear()
+        # Only the selected content's pipeline is rebuilt
+        invalidate_rag_pipeline(get_active_content_hash(get_kb_hash(), use_uploaded))
         st.success("✅ Vectors will rebuild on next query")
 
-# Get profile image as base64 for inline use
-banner_b64 = ""
-profile_paths = ["phto.jpg", "assets/profile.jpg"]
-
-for profile_path in profile_paths:
-    try:
-        with open(profile_path, "rb") as f:
-            banner_b64 = base64.b64encode(f.read()).decode()
-            break
-    except Exception:
-        continue
-
 # Main Layout - Profile Left, Chat Right
 main_col1, main_col2 = st.columns([1, 2])
 
 # Left Column - Profile Section
 with main_col1:
     # Inject profile CSS first
-    profile_css = """
-    <style>
-    .profile-container {
-        background: #003147;
-        padding: 2rem;
-        border-radius: 20px;
-        text-align: center;
-        color: white;
-        margin-bottom: 1rem;
-    }
-    .profile-photo {
-        width: 150px;
-        height: 150px;
-        border-radius: 50%;
-        margin: 0 auto 1rem auto;
-        background: url(data:image/jpeg;base64,""" + banner_b64 + """) center top 1px/cover no-repeat;
-        border: 4px solid rgba(255,255,255,0.8);
-        box-shadow: 0 8px 20px rgba(0,0,0,0.15);
-    }
-    .skill-tag {
-        background: rgba(255,255,255,0.2);
-        color: white;
-        padding: 4px 12px;
-        border-radius: 15px;
-        font-size: 0.8rem;
-        margin: 2px;
-        display: inline-block;
-    }
-    </style>
-    """
-    st.markdown(profile_css, unsafe_allow_html=True)
+    st.markdown(_render_profile_css(get_profile_photo_background("center top 1px")), unsafe_allow_html=True)
     
     # Profile content
     st.markdown("""
@@ -613,26 +662,6 @@ with main_col2:
     # Welcome message
 
     
-    # Quick Start Questions
-    st.markdown("###  Quick Start Questions")
-    col1, col2, col3, col4 = st.columns(4)
-    with col1:
-        if st.button("🔚 End-to-End ML", use_container_width=True):
-            st.session_state.suggested_query = "Tell me about your end-to-end machine learning experience"
-    with col2:
-        if st.button(" Technical skills", use_container_width=True):
-            st.session_state.suggested_query = "Tell me about your Technical skills experience"
-    with col3:
-        if st.button(" Reliability", use_container_width=True):
-            st.session_state.suggested_query = "How do you ensure reliability in AI systems?"
-    with col4:
-        if st.button(" RAG", use_container_width=True):
-            st.session_state.suggested_query = "Tell me about your experience with RAG development and deployment"
-    
-    # Chat Interface inside right column
-    st.markdown("---")
-    st.markdown("### 💬 Start Chatting")
-    
     # Load RAG pipeline
     kb_hash_now = get_kb_hash()
     rag_bundle = load_rag_pipeline(kb_hash_now, use_uploaded=use_uploaded)
@@ -641,70 +670,8 @@ with main_col2:
         st.error("❌ Could not load RAG pipeline. Please check your knowledge base file.")
         st.stop()
 
-    qa_chain = rag_bundle["chain"]
-
-    # Handle suggested queries first
-    if "suggested_query" in st.session_state:
-        user_prompt = st.session_state.suggested_query
-        del st.session_state.suggested_query
-        
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_prompt})
-        
-        # Generate and add response to chat history
-        try:
-            response = qa_chain.invoke({"query": user_prompt})
-            
-            # Handle different response formats from LangChain
-            if isinstance(response, dict):
-                response = response.get('result', str(response))
-            
-            if not response or (isinstance(response, str) and response.strip() == ""):
-                response = "I apologize, but I couldn't generate a response. This might be due to API limitations. Please try rephrasing your question or try again later."
-            
-        except Exception as e:
-            if "quota" in str(e).lower() or "limit" in str(e).lower():
-                response = "⚠️ API quota exceeded. The free tier has daily limits. Please try again later or upgrade your API plan."
-            else:
-                response = f"❌ Error: {str(e)}"
-        
-        # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
-
-    # Display all chat history
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"], avatar="🤖" if message["role"] == "assistant" else "👤"):
-            st.markdown(message["content"])
-
-    # Chat input at the bottom
-    user_prompt = st.chat_input("Ask about the CV/Resume...")
-    
-    if user_prompt:
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_prompt})
-        
-        # Generate and add response to chat history
-        try:
-            response = qa_chain.invoke({"query": user_prompt})
-            
-            # Handle different response formats from LangChain
-            if isinstance(response, dict):
-                response = response.get('result', str(response))
-            
-            if not response or (isinstance(response, str) and response.strip() == ""):
-                response = "I apologize, but I couldn't generate a response. This might be due to API limitations. Please try rephrasing your question or try again later."
-            
-        except Exception as e:
-            if "quota" in str(e).lower() or "limit" in str(e).lower():
-                response = "⚠️ API quota exceeded. The free tier has daily limits. Please try again later or upgrade your API plan."
-            else:
-                response = f"❌ Error: {str(e)}"
-        
-        # Add assistant response to chat history
-        st.session_state.messages.append({"role": "assistant", "content": response})
-        
-        # Rerun to display the new messages
-        st.rerun()
+    # Quick start questions and chat rerun as a fragment, not the whole page
+    render_chat(rag_bundle["chain"])
     
     # Footer
     st.caption(f"Vector store built: {rag_bundle.get('built_at','?')} | KB {rag_bundle.get('kb_hash','?')[:12]}…")
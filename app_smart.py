@@ -8,11 +8,19 @@ import sys
 import os
 from datetime import datetime, timedelta
 import time
+import uuid
 
 # Add the current directory to sys.path to import modules
 sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
 
-from src.ui.components import render_profile_section, render_social_links, inject_custom_css, show_success_message
+from src.ui.components import (
+    render_profile_section, render_social_links, inject_custom_css, show_success_message,
+    render_build_status, render_chat_history, reset_chat_window, fragment, FRAGMENTS_SUPPORTED
+)
+from src.utils.chat_history import get_session_chat_history
+from src.core.request_coalescer import get_request_coalescer
+from src.core.llm_client import GeminiClient, classify_api_error
+from src.core.deadline import Deadline
 from configs.app_config import config
 
 class APIQuotaManager:
@@ -49,12 +57,9 @@ class APIQuotaManager:
             api_key = get_google_api_key()
             genai.configure(api_key=api_key)
             
-            # Quick test with working model
-            model = genai.GenerativeModel(ModelConfig.PRIMARY_MODEL)
-            response = model.generate_content(
-                "Hi", 
-                generation_config={'max_output_tokens': 5}
-            )
+            # Quick test with working model (short throttles are retried)
+            client = GeminiClient(genai.GenerativeModel(ModelConfig.PRIMARY_MODEL))
+            client.generate("Hi", generation_config={'max_output_tokens': 5})
             
             # API is working
             st.session_state.quota_status.update({
@@ -67,14 +72,17 @@ class APIQuotaManager:
             return st.session_state.quota_status
             
         except Exception as e:
-            error_msg = str(e).lower()
-            
-            # Detect quota-related errors
-            is_quota_error = any(keyword in error_msg for keyword in [
-                'quota', '429', 'exceeded', 'limit', 'rate limit'
-            ])
+            error_kind = classify_api_error(e)
             
-            if is_quota_error:
+            if error_kind == "rate":
+                # Per-minute throttling is transient: stay in full mode
+                st.session_state.quota_status.update({
+                    'api_available': True,
+                    'last_check': current_time,
+                    'error_count': st.session_state.quota_status['error_count'] + 1,
+                    'last_error': 'rate_limited'
+                })
+            elif error_kind == "daily":
                 # Estimate quota reset time (24 hours from first quota error)
                 if st.session_state.quota_status['quota_reset_time'] is None:
                     st.session_state.quota_status['quota_reset_time'] = current_time + timedelta(hours=24)
@@ -124,17 +132,66 @@ def main():
     # Initialize quota manager
     quota_manager = APIQuotaManager()
     
+    # Persona this session talks to
+    persona = select_persona()
+    
     # Check API status
     api_status = quota_manager.check_api_status()
     
     if api_status['api_available']:
         # Run full application
-        run_full_application(quota_manager)
+        run_full_application(quota_manager, persona)
     else:
         # Run quota-safe version
-        run_quota_safe_application(quota_manager)
+        run_quota_safe_application(quota_manager, persona)
 
-def run_full_application(quota_manager):
+def get_query_param(name):
+    """Read a URL query parameter (st.query_params needs Streamlit 1.30+)."""
+    query_params = getattr(st, "query_params", None)
+    if query_params is not None:
+        return query_params.get(name)
+    values = st.experimental_get_query_params().get(name)
+    return values[0] if values else None
+
+def select_persona():
+    """
+    Choose the persona this session talks to.
+    
+    A ?persona=<id> link picks it; when several personas are defined the
+    sidebar offers a selector. Unknown ids fall back to the default persona.
+    Switching personas starts a new conversation.
+    
+    Returns:
+        Persona definition
+    """
+    from src.core.personas import get_persona_registry
+    registry = get_persona_registry()
+    personas = {persona.persona_id: persona for persona in registry.personas()}
+    
+    if "persona_id" not in st.session_state:
+        requested = get_query_param("persona")
+        st.session_state.persona_id = requested if requested in personas else config.personas.default_persona
+    
+    if len(personas) > 1:
+        with st.sidebar:
+            st.markdown("### 👤 Persona")
+            ids = list(personas)
+            selected = st.selectbox(
+                "Choose persona:",
+                options=ids,
+                index=ids.index(st.session_state.persona_id) if st.session_state.persona_id in personas else 0,
+                format_func=lambda persona_id: personas[persona_id].display_name,
+                label_visibility="collapsed"
+            )
+            st.markdown("---")
+        if selected != st.session_state.persona_id:
+            st.session_state.persona_id = selected
+            get_session_chat_history().clear()
+            reset_chat_window()
+    
+    return personas.get(st.session_state.persona_id) or registry.resolve()
+
+def run_full_application(quota_manager, persona):
     """Run the full application with AI capabilities."""
     
     # Sidebar
@@ -183,8 +240,8 @@ def run_full_application(quota_manager):
                 
                 # Process uploaded file
                 from src.utils.smart_adapter import smart_file_upload
-                content = smart_file_upload(uploaded_file)
-                if content:
+                content_hash = smart_file_upload(uploaded_file)
+                if content_hash:
                     # Successfully processed file
                     use_uploaded = True  # Automatically switch to uploaded content
                     st.success("✅ File uploaded and processed successfully!")
@@ -193,25 +250,41 @@ def run_full_application(quota_manager):
                     st.error("❌ Error processing file")
                     use_uploaded = False
         
-        # Knowledge base status
+        # Knowledge base status (cached by the background watcher, no file I/O)
         st.markdown("###  Knowledge Base Status")
-        try:
-            with open('knowledge_base.txt', 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            char_count = len(content)
-            word_count = len(content.split())
-            
+        from src.core.simple_rag import watch_persona_knowledge_base
+        kb_fingerprint = watch_persona_knowledge_base(persona.persona_id).current
+        if kb_fingerprint:
             st.success("✅ Base Knowledge")
-            st.caption(f"📝 {char_count:,} characters • 📄 {word_count:,} words")
-            
-        except Exception as e:
-            st.error(f"❌ Error loading knowledge base: {str(e)}")
+            st.caption(
+                f"📝 {kb_fingerprint.characters:,} characters • 📄 {kb_fingerprint.words:,} words • "
+                f"🗂️ {len(kb_fingerprint.documents)} document(s)"
+            )
+        else:
+            st.error("❌ Error loading knowledge base: file not found")
+        
+        from src.core.pipeline_registry import get_pipeline_registry
+        cache_stats = get_pipeline_registry().stats()
+        st.caption(
+            f"🧠 {cache_stats['entries']} cached pipeline(s) • "
+            f"{cache_stats['bytes'] / 1e6:.1f} / {cache_stats['max_bytes'] / 1e6:.0f} MB • "
+            f"{cache_stats['evictions']} evicted"
+        )
+        
+        from src.core.personas import get_persona_registry
+        persona_stats = get_persona_registry().stats()
+        if persona_stats['personas'] > 1:
+            st.caption(
+                f"👥 {persona_stats['loaded']} / {persona_stats['personas']} persona(s) loaded • "
+                f"{persona_stats['bytes'] / 1e6:.1f} / {persona_stats['max_bytes'] / 1e6:.0f} MB"
+            )
         
         # Manual rebuild option
         if st.button("🔄 Rebuild Vectors"):
+            # Only this content's pipeline is rebuilt; other users' stay cached
             from src.core.simple_rag import clear_simple_pipeline_cache
-            clear_simple_pipeline_cache()
+            content_hash, source_is_upload = resolve_content_source(use_uploaded, persona.persona_id)
+            clear_simple_pipeline_cache(content_hash, source_is_upload, persona.persona_id)
             show_success_message("Vectors will rebuild on next query")
     
     # Main layout - Profile Left, Chat Right
@@ -219,32 +292,49 @@ def run_full_application(quota_manager):
     
     # Left Column - Profile Section
     with main_col1:
-        render_profile_section()
-        render_social_links()
+        render_profile_section(persona)
+        render_social_links(persona)
     
     # Right Column - Chat Interface with Quota Protection
     with main_col2:
         st.markdown("#  Chat with my AI Professional Persona")
         st.markdown("*Ask about experience, architecture decisions, measurable impact, leadership, or how I deliver reliable AI systems. Answers are strictly grounded in my curated professional knowledge base (RAG retrieval).*")
         
-        # Get or build RAG pipeline with error handling
+        # Get the RAG pipeline; builds run in the background so the page renders now.
+        # Chat turns rerun only the chat fragment, each with its own deadline.
         try:
-            pipeline_data = get_or_build_pipeline_safe(use_uploaded, quota_manager)
+            with Deadline(config.latency.load, name="load") as load_deadline:
+                pipeline_data, build_job = get_or_build_pipeline_safe(
+                    use_uploaded, quota_manager, persona.persona_id, load_deadline
+                )
+            
+            building = build_job is not None and build_job.in_progress
+            if build_job is not None:
+                if FRAGMENTS_SUPPORTED and building:
+                    render_build_progress(build_job.key, pipeline_data is not None)
+                else:
+                    render_build_status(build_job, pipeline_data is not None)
             
             if pipeline_data:
-                # Quick start questions
-                render_quick_start_questions()
-                
-                # Chat interface
+                # Quick start questions and chat rerun together as one fragment
                 render_chat_interface(pipeline_data, quota_manager)
+            elif building:
+                if not FRAGMENTS_SUPPORTED:
+                    # Nothing to interact with yet: poll with full reruns
+                    time.sleep(config.build.poll_interval)
+                    st.rerun()
             else:
-                st.error("❌ Failed to initialize AI pipeline. Switching to safe mode...")
-                time.sleep(2)
-                st.rerun()
+                if not st.session_state.quota_status['api_available']:
+                    # The daily quota ran out while loading; the next run is safe mode
+                    st.rerun()
+                if build_job is None:
+                    st.error("❌ Failed to initialize AI pipeline.")
+                # A failed build's error is shown once above; it is retried on a
+                # later run after config.build.failure_retry_after, not in a loop
+                st.stop()
                 
         except Exception as e:
-            error_msg = str(e).lower()
-            if any(keyword in error_msg for keyword in ['quota', '429', 'exceeded', 'limit']):
+            if classify_api_error(e) == "daily":
                 st.error("⚠️ API quota exceeded. Switching to safe mode...")
                 st.session_state.quota_status['api_available'] = False
                 time.sleep(2)
@@ -252,37 +342,91 @@ def run_full_application(quota_manager):
             else:
                 st.error(f"❌ Unexpected error: {str(e)}")
 
-def get_or_build_pipeline_safe(use_uploaded, quota_manager):
-    """Safely get or build pipeline with quota monitoring."""
+def resolve_content_source(use_uploaded, persona_id=None, deadline=None):
+    """
+    Resolve which content the pipeline is built from.
+    
+    With a deadline, checking the upload gets the upload_check stage budget;
+    if it runs out, this run falls back to the knowledge base and the next
+    run picks the upload up from the cached fingerprint and name results.
+    
+    Returns:
+        Tuple of (content hash, whether it is an upload)
+    """
+    from src.core.simple_rag import watch_persona_knowledge_base
+    from src.utils.smart_adapter import smart_get_upload_hash
+    
+    if use_uploaded:
+        # Uploaded text stays in the shared content store; only its hash is needed here
+        if deadline is None:
+            upload_hash = smart_get_upload_hash()
+        else:
+            with deadline.stage("upload_check", config.latency.upload_check) as stage:
+                upload_hash = smart_get_upload_hash(stage)
+            if not upload_hash and stage.expired():
+                st.info("⏳ Still checking your upload; answering from the knowledge base for now.")
+        if upload_hash:
+            return upload_hash, True
+    
+    # Knowledge base hash comes from the persona's watcher, not a file read
+    if deadline is None:
+        return watch_persona_knowledge_base(persona_id).current_hash(), False
+    with deadline.stage("fingerprint", deadline.remaining()):
+        return watch_persona_knowledge_base(persona_id).current_hash(), False
+
+def get_or_build_pipeline_safe(use_uploaded, quota_manager, persona_id=None, deadline=None):
+    """
+    Safely get the pipeline with quota monitoring, without blocking on builds.
+    
+    Args:
+        use_uploaded: Whether to prefer uploaded content
+        quota_manager: APIQuotaManager for quota fallback
+        persona_id: Persona whose knowledge base is used
+        deadline: Optional load Deadline bounding content resolution
+    
+    Returns:
+        Tuple of (pipeline data or None, background build job or None)
+    """
     try:
-        from src.core.simple_rag import get_simple_rag_pipeline
-        from src.utils.smart_adapter import smart_get_content_hash, smart_load_knowledge_base, smart_load_uploaded_content
-        get_content_hash = smart_get_content_hash
-        load_knowledge_base = smart_load_knowledge_base
-        load_uploaded_content = smart_load_uploaded_content
+        from src.core.simple_rag import request_simple_rag_pipeline
         
-        # Load content
+        content_hash, use_uploaded = resolve_content_source(use_uploaded, persona_id, deadline)
         if use_uploaded:
-            content = load_uploaded_content()
-            if not content:
-                content = load_knowledge_base()
-                use_uploaded = False
+            # Uploads are served per session; the worker thread reads the
+            # text from the shared content store by hash
+            if "session_id" not in st.session_state:
+                st.session_state.session_id = uuid.uuid4().hex
+            pipeline_data, job = request_simple_rag_pipeline(
+                f"uploaded:{st.session_state.session_id}", content_hash, True, persona_id=persona_id
+            )
         else:
-            content = load_knowledge_base()
+            # One shared knowledge base slot per persona
+            slot = "knowledge_base" if persona_id in (None, config.personas.default_persona) else f"knowledge_base:{persona_id}"
+            pipeline_data, job = request_simple_rag_pipeline(slot, content_hash, persona_id=persona_id)
         
-        content_hash = get_content_hash(content)
-        return get_simple_rag_pipeline(content_hash, use_uploaded)
+        if job is not None and job.state == "failed" and classify_api_error(job.error) == "daily":
+            raise job.error
+        return pipeline_data, job
         
     except Exception as e:
-        error_msg = str(e).lower()
-        if any(keyword in error_msg for keyword in ['quota', '429', 'exceeded', 'limit']):
+        if classify_api_error(e) == "daily":
             # Update quota status and trigger safe mode
             st.session_state.quota_status['api_available'] = False
             quota_manager.check_api_status()
-            return None
+            return None, None
         else:
             raise e
 
+@fragment(run_every=config.build.poll_interval)
+def render_build_progress(job_key, serving_previous):
+    """Poll a background build and rerun the app once it finishes or fails."""
+    from src.core.pipeline_builder import get_pipeline_build_manager
+    job = get_pipeline_build_manager().status(job_key)
+    # A failed build reruns too, so a daily-quota failure reaches safe mode
+    if job is None or job.state in ("ready", "failed"):
+        st.rerun()
+    render_build_status(job, serving_previous)
+
 def render_quick_start_questions():
     """Render quick start question buttons."""
     st.markdown("###  Quick Start Questions")
@@ -303,71 +447,87 @@ def render_quick_start_questions():
             if st.button(label, key=f"quick_{i}", use_container_width=True):
                 st.session_state.user_question = question
 
+@fragment
 def render_chat_interface(pipeline_data, quota_manager):
-    """Render the main chat interface with quota monitoring."""
+    """
+    Render the quick start questions and chat with quota monitoring.
     
-    # Initialize chat history
-    if "messages" not in st.session_state:
-        st.session_state.messages = []
+    Runs as a fragment, so a chat turn reruns only this panel instead of
+    the whole page (CSS, profile, sidebar).
+    """
     
-    # Handle quick start questions first
-    if "user_question" in st.session_state:
-        user_question = st.session_state.user_question
-        del st.session_state.user_question
-        
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_question})
-        
-        # Generate AI response with quota monitoring
-        try:
-            response = generate_response_safe(pipeline_data, user_question, quota_manager)
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            
-        except Exception as e:
-            error_msg = str(e).lower()
-            if any(keyword in error_msg for keyword in ['quota', '429', 'exceeded', 'limit']):
-                st.error("⚠️ API quota exceeded during response generation. Switching to safe mode...")
-                st.session_state.quota_status['api_available'] = False
-                time.sleep(2)
-                st.rerun()
-            else:
-                st.error(f"❌ Error generating response: {str(e)}")
+    # Bounded chat history: recent turns in memory, older ones on disk
+    history = get_session_chat_history()
     
-    # Display chat messages
-    for message in st.session_state.messages:
-        with st.chat_message(message["role"]):
-            st.markdown(message["content"])
+    # Quick start questions (clicks rerun only this fragment)
+    render_quick_start_questions()
     
-    # Chat input at the very bottom
+    # History renders above the input; new turns are appended to it in place
+    history_container = st.container()
     user_question = st.chat_input("Ask about the CV/Resume...")
+    if "user_question" in st.session_state:
+        user_question = st.session_state.user_question
+        del st.session_state.user_question
     
-    if user_question:
-        # Add user message to chat history
-        st.session_state.messages.append({"role": "user", "content": user_question})
+    with history_container:
+        # Display the newest chat messages
+        render_chat_history(history)
         
-        # Generate AI response with quota monitoring
-        try:
-            response = generate_response_safe(pipeline_data, user_question, quota_manager)
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            st.rerun()  # Refresh to show the new messages
+        if user_question:
+            # Add user message to chat history
+            history.append("user", user_question)
+            with st.chat_message("user"):
+                st.markdown(user_question)
             
-        except Exception as e:
-            error_msg = str(e).lower()
-            if any(keyword in error_msg for keyword in ['quota', '429', 'exceeded', 'limit']):
-                st.error("⚠️ API quota exceeded during response generation. Switching to safe mode...")
-                st.session_state.quota_status['api_available'] = False
-                time.sleep(2)
-                st.rerun()
-            else:
-                st.error(f"❌ Error generating response: {str(e)}")
-                st.rerun()
+            # Per-turn deadline covering retrieval and generation
+            deadline = Deadline(config.latency.total)
+            
+            # Generate AI response with quota monitoring, rendering it as it streams
+            try:
+                with st.chat_message("assistant"):
+                    placeholder = st.empty()
+                    response = generate_response_safe(pipeline_data, user_question, quota_manager, placeholder, deadline)
+                history.append("assistant", response)
+                
+            except Exception as e:
+                if classify_api_error(e) == "daily":
+                    st.error("⚠️ API quota exceeded during response generation. Switching to safe mode...")
+                    st.session_state.quota_status['api_available'] = False
+                    time.sleep(2)
+                    st.rerun()  # Full app rerun to switch modes
+                else:
+                    st.error(f"❌ Error generating response: {str(e)}")
 
-def generate_response_safe(pipeline_data, question, quota_manager):
-    """Generate response with quota monitoring."""
+def generate_response_safe(pipeline_data, question, quota_manager, placeholder=None, deadline=None):
+    """Generate response with quota monitoring.
+    
+    Identical questions already in flight from other sessions share one
+    generation. When a placeholder is given, the response is rendered into
+    it as it streams. The deadline bounds retrieval and generation time.
+    """
     try:
         pipeline = pipeline_data.get('pipeline')
         if pipeline and hasattr(pipeline, 'query'):
-            return pipeline.query(question)
+            coalescer = get_request_coalescer()
+            # Personas answer the same content differently; only share within one
+            scope = f"{pipeline_data.get('persona_id', '')}:{pipeline_data.get('content_hash', '')}"
+            key = coalescer.make_key(scope, question)
+            if hasattr(pipeline, 'query_stream'):
+                response = ""
+                try:
+                    for chunk in coalescer.stream(key, lambda: pipeline.query_stream(question, deadline), deadline):
+                        response += chunk
+                        if placeholder is not None:
+                            placeholder.markdown(response + "▌")
+                except Exception as e:
+                    if not response or classify_api_error(e) == "daily":
+                        raise
+                    # Keep the partial answer and report the interruption beside it
+                    st.warning(f"⚠️ The response was interrupted: {str(e)}")
+                if placeholder is not None:
+                    placeholder.markdown(response)
+                return response
+            return coalescer.run(key, lambda: pipeline.query(question, deadline), deadline)
         else:
             # Fallback to chain
             chain = pipeline_data.get('chain')
@@ -380,14 +540,13 @@ def generate_response_safe(pipeline_data, question, quota_manager):
                 return "❌ Pipeline not properly initialized."
                 
     except Exception as e:
-        error_msg = str(e).lower()
-        if any(keyword in error_msg for keyword in ['quota', '429', 'exceeded', 'limit']):
+        if classify_api_error(e) == "daily":
             st.session_state.quota_status['api_available'] = False
             raise e
         else:
             return f"❌ Error: {str(e)}"
 
-def run_quota_safe_application(quota_manager):
+def run_quota_safe_application(quota_manager, persona):
     """Run the quota-safe version of the application."""
     
     # Sidebar with status
@@ -424,8 +583,8 @@ def run_quota_safe_application(quota_manager):
     
     # Left Column - Profile Section (works without API)
     with main_col1:
-        render_profile_section()
-        render_social_links()
+        render_profile_section(persona)
+        render_social_links(persona)
     
     # Right Column - Quota Status and Static Info
     with main_col2:
@@ -456,10 +615,10 @@ def run_quota_safe_application(quota_manager):
         
         st.markdown("---")
         
-        # Display static information
-        display_static_highlights()
-        
-        st.markdown("---")
+        # Display static information (written for the default persona only)
+        if persona.is_default:
+            display_static_highlights()
+            st.markdown("---")
         st.success("🤖 **Smart Recovery**: The app monitors API status and will automatically restore full functionality when available!")
 
 def display_static_highlights():
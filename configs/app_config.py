@@ -19,6 +19,8 @@ class ModelConfig:
     temperature: float = 0.7
     max_output_tokens: int = 1024
     embedding_dimension: int = 384  # Standard dimension for embeddings
+    timeout: float = 15.0  # Seconds per Gemini request
+    requests_per_minute: int = 15  # Process-wide Gemini request rate, shared by all personas
     
     # Also keep the class attributes for backward compatibility
     PRIMARY_MODEL = "gemini-2.0-flash"
@@ -27,12 +29,179 @@ class ModelConfig:
     MAX_OUTPUT_TOKENS = 1024
     EMBEDDING_DIMENSION = 384
 
+@dataclass
+class RetryConfig:
+    """Retry and backoff settings for throttled Gemini API calls."""
+    max_attempts: int = 4
+    base_delay: float = 1.0  # Seconds, doubled after each throttled attempt
+    max_delay: float = 20.0
+    jitter: float = 0.5  # Extra random seconds added to server retry hints
+    request_deadline: float = 30.0  # Total seconds a request may spend retrying
+
+@dataclass
+class LatencyBudgetConfig:
+    """Per-request deadline and per-stage time budgets (seconds)."""
+    total: float = 20.0
+    load: float = 2.0
+    upload_check: float = 1.5  # Of load: fingerprinting and name-checking an upload
+    retrieval: float = 1.0
+    context: float = 0.5
+    generation: float = 15.0
+    
+    # Degradation steps when budgets run short
+    reduced_k: int = 1  # Chunks retrieved when retrieval must be cut short
+    compressed_context_chars: int = 1500  # Context size when compressing
+    fast_model: str = "gemini-1.5-flash-8b"  # Used below fast_model_threshold
+    fast_model_threshold: float = 6.0
+    min_generation_time: float = 1.5  # Below this, answer extractively
+
 @dataclass
 class VectorStoreConfig:
     """Configuration for vector store and text processing."""
     chunk_size: int = 1000
     chunk_overlap: int = 200
     search_k: int = 3
+    embed_batch_size: int = 64  # Chunks embedded and appended to the index at a time
+    read_block_chars: int = 64 * 1024  # Characters read per block when streaming text
+    section_aware: bool = True  # Chunk by CV sections and list items (see src/core/cv_sections.py)
+    section_chunk_size: int = 600  # Maximum chunk length when chunking by section
+    section_chunk_overlap: int = 60  # Overlap only between pieces of one oversized line
+
+@dataclass
+class DedupConfig:
+    """Configuration for near-duplicate chunk removal at index build time."""
+    enabled: bool = True
+    threshold: float = 0.8  # Estimated Jaccard similarity of word shingles that counts as duplicate
+    num_perm: int = 64  # MinHash signature length
+    bands: int = 16  # LSH bands (num_perm / bands rows each)
+    shingle_words: int = 3  # Words per shingle
+
+@dataclass
+class ServingConfig:
+    """Configuration for concurrent (asyncio) query serving."""
+    max_concurrency: int = 8  # In-flight questions per abatch call
+    retrieval_workers: int = 4  # Threads running retrieval off the event loop
+
+@dataclass
+class BuildConfig:
+    """Configuration for background pipeline builds."""
+    max_workers: int = 2  # Concurrent pipeline builds
+    poll_interval: float = 1.0  # Seconds between UI status checks while building
+    failure_retry_after: float = 30.0  # Seconds before a failed build is retried
+
+@dataclass
+class PipelineCacheConfig:
+    """Configuration for the in-memory pipeline registry."""
+    max_bytes: int = 512 * 1024 * 1024  # Estimated memory budget for cached pipelines
+    max_entries: int = 32  # Maximum cached pipelines regardless of size
+
+@dataclass
+class GuardrailConfig:
+    """Configuration for the local out-of-scope question classifier."""
+    enabled: bool = True
+    refusal_message: str = (
+        "I do not have information on that topic. "
+        "For details, it would be best to speak with Abdolamir directly."
+    )
+    # Regex rules per refused topic (matched case-insensitively). Words that
+    # also name ML concepts ("voting" ensembles, "compensation" modelling)
+    # or projects ("family business", "church renovation") only count in a
+    # personal context such as "his salary". <name> stands for the words of
+    # the persona's name variations.
+    topic_patterns: Dict[str, List[str]] = field(default_factory=lambda: {
+        "contact": [
+            r"\b(phone|mobile|cell)\s*(number|no\.?)\b",
+            r"\be-?mail\s+(address|him|you)\b",
+            r"\b(home|street|postal|mailing|residential)\s+address\b",
+            r"\bwhere\s+(does|do)\s+(he|you|<name>)\s+live\b",
+            r"\bcontact\s+(details|info|information|number)\b",
+            r"\bhow\s+(can|do|could)\s+i\s+(contact|reach|call|email|phone)\b",
+        ],
+        "family": [
+            r"\b(married|marital|wife|husband|spouse|girlfriend|boyfriend)\b",
+            r"\b(his|your)\s+(children|kids|son|daughter|mother|father|parents)\b",
+            r"\b(his|your)\s+family\s+(life|members?|situation|status|plans)\b",
+            r"\b(does|do)\s+(he|you)\s+have\s+(children|kids|a\s+family)\b",
+        ],
+        "salary": [
+            r"\b(his|your)\s+(salary|salaries|wages?|pay|paycheck|compensation|income)\b",
+            r"\b(salary|wage|pay|compensation)\s+(does|do|did|would|is)\s+(he|you)\b",
+            r"\b(salary|pay|compensation)\s+(expectations?|requirements?)\b",
+            r"\bhow\s+much\s+(does|do)\s+(he|you)\s+(earn|make|charge)\b",
+            r"\b(hourly|daily|day)\s+rate\b",
+        ],
+        "religion": [
+            r"\b(religion|religious|muslim|islam|christian|jewish|hindu|buddhist|atheist)\b",
+            r"\b(his|your)\s+(church|mosque|synagogue|temple|faith)\b",
+            r"\b(go|goes|went|attend|attends|attended|pray|prays)\s+(to\s+|at\s+)?(a\s+|the\s+)?(church|mosque|synagogue|temple)\b",
+            r"\b(church|mosque|synagogue|temple)\s+(does|do|did)\s+(he|you)\s+(go|attend|belong)",
+        ],
+        "politics": [
+            r"\b(politics|politician|democrat|republican)\b",
+            r"\bpolitical\s+(views|opinions|beliefs|affiliation|party|leaning)\b",
+            r"\bwho\s+(does|did|do)\s+(he|you)\s+vote\b",
+        ],
+    })
+    # Example out-of-scope questions for similarity matching
+    exemplar_questions: Dict[str, List[str]] = field(default_factory=lambda: {
+        "contact": ["What is his phone number?", "Where does he live?", "What is his email?"],
+        "family": ["Is he married?", "Does he have children?", "Does he have a wife or kids?"],
+        "salary": ["How much does he earn?", "What salary does he expect?"],
+        "religion": ["What is his religion?", "Does he believe in god?"],
+        "politics": ["Which party does he vote for?", "What are his political views?"],
+    })
+    similarity_threshold: float = 0.8
+
+@dataclass
+class WatchConfig:
+    """Configuration for the background knowledge base watcher."""
+    enabled: bool = True
+    poll_interval: float = 2.0  # Seconds between stat checks
+
+@dataclass
+class ChatHistoryConfig:
+    """Configuration for per-session chat history storage and rendering."""
+    memory_window: int = 50  # Messages kept in memory; older ones spill to disk
+    render_window: int = 20  # Messages rendered per page ("load earlier" adds a page)
+    spill_directory: Optional[str] = None  # Defaults to a folder in the system temp dir
+    log_max_age_hours: float = 24.0  # Spilled logs older than this are deleted
+    cleanup_interval: float = 600.0  # Seconds between sweeps for old logs (run on spills)
+
+@dataclass
+class ContentStoreConfig:
+    """Configuration for the shared store of extracted document text."""
+    backend: str = "auto"  # "memory", "disk", "mmap", or "auto" (memory on Streamlit Cloud, else mmap in a per-process temp folder)
+    directory: str = "data/content"  # Content files of the configured disk and mmap backends
+    ttl: float = 7 * 24 * 3600.0  # Content files older than this (seconds) are swept on startup
+
+@dataclass
+class PdfExtractionConfig:
+    """Configuration for PDF text extraction."""
+    max_pages: int = 500  # Pages beyond this are not extracted
+    timeout: float = 120.0  # Seconds allowed for extracting one PDF
+    max_workers: int = 2  # Worker processes for page extraction
+    pages_per_task: int = 2  # Pages per worker task (progress granularity)
+    inline_page_threshold: int = 3  # Extract this few pages without the pool
+    cache_pages: int = 2000  # Page texts cached by page-content hash
+
+@dataclass
+class UploadStoreConfig:
+    """Configuration for reading uploads and the shared content-addressed upload store."""
+    max_idle_entries: int = 16  # Unreferenced uploads kept for reuse
+    session_ttl: float = 3600.0  # Seconds before an inactive session's upload is released
+    encoding_sample_bytes: int = 64 * 1024  # Prefix sniffed to detect a text file's encoding
+    read_block_bytes: int = 1024 * 1024  # Bytes copied or decoded at a time
+    max_bytes: int = 100 * 1024 * 1024  # Largest accepted upload (keep server.maxUploadSize in step)
+    spool_memory_bytes: int = 8 * 1024 * 1024  # Uploads beyond this are spooled to disk
+    spool_directory: Optional[str] = None  # Defaults to the system temp dir
+
+@dataclass
+class PersonaRegistryConfig:
+    """Configuration for serving several personas from one process."""
+    directory: str = "personas"  # One folder per persona, each with a persona.json
+    default_persona: str = "default"  # Persona built from this config; served when none is chosen
+    max_loaded: int = 8  # Personas with indexes in memory at once (the default is never evicted)
+    max_bytes: int = 256 * 1024 * 1024  # Estimated index memory of loaded personas
 
 @dataclass
 class ServerConfig:
@@ -47,6 +216,10 @@ class UIConfig:
     """Configuration for UI elements."""
     profile_photo_paths: Optional[List[str]] = None
     social_links: Optional[Dict[str, str]] = None
+    serve_static: bool = True  # Serve the photo from static/ instead of inlining it
+    static_dir: str = "static"  # Streamlit static folder (next to the app script)
+    profile_photo_size: int = 160  # Displayed avatar size in CSS pixels (1x variant)
+    profile_photo_quality: int = 82  # JPEG quality of the resized variants
     
     def __post_init__(self):
         if self.profile_photo_paths is None:
@@ -64,7 +237,9 @@ class UIConfig:
 class PathConfig:
     """Configuration for file paths and directories."""
     # Data files
-    knowledge_base_file: str = "data/knowledge_base.txt"
+    knowledge_base_directory: str = "data/knowledge_base"  # One document per file; indexed per file
+    knowledge_base_extensions: List[str] = field(default_factory=lambda: [".txt", ".md", ".pdf"])
+    knowledge_base_file: str = "data/knowledge_base.txt"  # Used when the directory has no documents
     uploaded_content_file: str = "data/uploaded_content.txt"
     
     # Configuration files
@@ -84,10 +259,23 @@ class AppConfig:
     """Main application configuration."""
     # Sub-configurations
     model: ModelConfig = field(default_factory=ModelConfig)
+    retry: RetryConfig = field(default_factory=RetryConfig)
+    latency: LatencyBudgetConfig = field(default_factory=LatencyBudgetConfig)
     vector_store: VectorStoreConfig = field(default_factory=VectorStoreConfig)
+    dedup: DedupConfig = field(default_factory=DedupConfig)
+    guardrail: GuardrailConfig = field(default_factory=GuardrailConfig)
+    serving: ServingConfig = field(default_factory=ServingConfig)
+    watch: WatchConfig = field(default_factory=WatchConfig)
+    build: BuildConfig = field(default_factory=BuildConfig)
+    pipeline_cache: PipelineCacheConfig = field(default_factory=PipelineCacheConfig)
+    chat: ChatHistoryConfig = field(default_factory=ChatHistoryConfig)
+    uploads: UploadStoreConfig = field(default_factory=UploadStoreConfig)
+    content_store: ContentStoreConfig = field(default_factory=ContentStoreConfig)
+    pdf: PdfExtractionConfig = field(default_factory=PdfExtractionConfig)
     server: ServerConfig = field(default_factory=ServerConfig)
     ui: UIConfig = field(default_factory=UIConfig)
     paths: PathConfig = field(default_factory=PathConfig)
+    personas: PersonaRegistryConfig = field(default_factory=PersonaRegistryConfig)
     
     # Identity validation
     name_variations: Optional[List[str]] = None
@@ -133,3 +321,25 @@ Question
 
 Answer:
 """
+
+# Prompt template of personas without a prompt.txt; {name} and {short_name}
+# are filled in when the persona loads, {context} and {question} per request
+PERSONA_PROMPT_TEMPLATE = """
+You are the professional AI persona of {name}. Use ONLY the Context. Do not invent or speculate.
+
+Write naturally and concisely in third person. Do not say "according to the context." Quantify only when numbers appear in the Context.
+
+If the question is identity/overview (e.g., "who is…", "tell me about…"), produce a polished 2–3 sentence paragraph. Otherwise, write one direct opening sentence followed by 3 compact bullets with **Bold labels** (≤2 words) and a colon.
+
+If the needed facts are missing: "I do not have that information in the current context."
+If the question is personal/out-of-scope (contact, family, salary, religion, politics):
+"I do not have information on that topic. For details, it would be best to speak with {short_name} directly."
+
+Context
+{context}
+
+Question
+{question}
+
+Answer:
+"""
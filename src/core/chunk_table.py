@@ -0,0 +1,260 @@
+"""
+Chunk table module for CV RAG Chatbot.
+Compact docstore for the FAISS index: chunks are rows of parallel arrays
+(start, end, section id, hash) over one UTF-8 buffer of the indexed text,
+and a chunk's text and Document are built only when a search returns it.
+Tables over identical text share a single buffer, and tables of several
+documents can be searched as one, with each chunk naming its source.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+import weakref
+from array import array
+from bisect import bisect_right
+from collections.abc import Mapping
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Sized, Tuple, Union
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_community.docstore.base import Docstore
+from langchain_core.documents import Document
+
+from src.core.cv_sections import Chunk
+
+
+class SourceBuffer:
+    """Immutable UTF-8 text shared by every table built from it."""
+
+    __slots__ = ("data", "__weakref__")
+
+    def __init__(self, data: Union[bytes, memoryview]):
+        self.data = data
+
+
+# Live source buffers by content hash; entries go away with their last table
+_sources: "weakref.WeakValueDictionary[str, SourceBuffer]" = weakref.WeakValueDictionary()
+_sources_lock = threading.Lock()
+
+
+def share_source(data: Union[bytes, memoryview]) -> SourceBuffer:
+    """
+    Get the shared buffer for some text, reusing one that is already live.
+
+    Args:
+        data: UTF-8 encoded text (bytes, or a view of a bytearray)
+
+    Returns:
+        SourceBuffer holding data (or identical bytes)
+    """
+    key = hashlib.md5(data).hexdigest()
+    with _sources_lock:
+        source = _sources.get(key)
+        if source is None:
+            source = _sources[key] = SourceBuffer(data)
+    return source
+
+
+def chunk_hash(text: str) -> int:
+    """64-bit hash of a chunk's text."""
+    return int.from_bytes(hashlib.blake2b(text.encode(), digest_size=8).digest(), "little")
+
+
+class RowIds(Mapping):
+    """FAISS position -> docstore id map of a table: every row is its own id."""
+
+    def __init__(self, table: Sized):
+        self._table = table
+
+    def __getitem__(self, position: int) -> int:
+        position = int(position)
+        if not 0 <= position < len(self._table):
+            raise KeyError(position)
+        return position
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(range(len(self._table)))
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+
+class ChunkTable(Docstore):
+    """
+    Docstore of chunks stored as offsets into one source buffer.
+
+    Rows are appended while the index is built; the source is attached
+    once all text has streamed past. Row ids equal FAISS positions.
+    """
+
+    def __init__(self):
+        self.starts = array("q")
+        self.ends = array("q")
+        self.section_ids = array("H")
+        self.hashes = array("Q")
+        self.sections: List[str] = []
+        self._section_index: Dict[str, int] = {}
+        # Extra metadata of the few rows that have any (e.g. merged duplicates)
+        self.extra: Dict[int, Dict[str, Any]] = {}
+        self.source: Optional[SourceBuffer] = None
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def append(self, chunk: Chunk) -> int:
+        """
+        Add a row for a chunk (its text is not kept).
+
+        Args:
+            chunk: Chunk with byte offsets into the source
+
+        Returns:
+            Row id
+        """
+        section_id = self._section_index.get(chunk.section)
+        if section_id is None:
+            section_id = self._section_index[chunk.section] = len(self.sections)
+            self.sections.append(chunk.section)
+        self.starts.append(chunk.start)
+        self.ends.append(chunk.end)
+        self.section_ids.append(section_id)
+        self.hashes.append(chunk_hash(chunk.text))
+        return len(self.starts) - 1
+
+    def attach(self, data: Union[bytes, memoryview]):
+        """
+        Set the text the rows point into.
+
+        Args:
+            data: UTF-8 encoded text the chunk offsets refer to; a view is
+                kept as is (its buffer must not change afterwards)
+        """
+        self.source = share_source(data)
+
+    def row_ids(self) -> RowIds:
+        """Position -> id map to hand to FAISS alongside this docstore."""
+        return RowIds(self)
+
+    def text(self, row: int) -> str:
+        """
+        Decode one chunk's text from the source.
+
+        Args:
+            row: Row id
+
+        Returns:
+            Chunk text
+        """
+        if self.source is None:
+            raise ValueError("Chunk table has no source attached")
+        return str(memoryview(self.source.data)[self.starts[row]:self.ends[row]], "utf-8")
+
+    def metadata(self, row: int) -> Dict[str, Any]:
+        """
+        Metadata of one chunk.
+
+        Args:
+            row: Row id
+
+        Returns:
+            Dict with section, byte offsets and hash, plus any extra metadata
+        """
+        metadata = {
+            "section": self.sections[self.section_ids[row]],
+            "start": self.starts[row],
+            "end": self.ends[row],
+            "hash": f"{self.hashes[row]:016x}",
+        }
+        metadata.update(self.extra.get(row, {}))
+        return metadata
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        """
+        Build the Document for a row (called by FAISS for search results only).
+
+        Args:
+            search: Row id
+
+        Returns:
+            Document, or an error message if there is no such row
+        """
+        try:
+            row = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= row < len(self):
+            return f"ID {search} not found."
+        return Document(page_content=self.text(row), metadata=self.metadata(row))
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the table.
+
+        Returns:
+            Bytes of the row arrays and the source buffer (counted in full
+            even when shared)
+        """
+        arrays = (self.starts, self.ends, self.section_ids, self.hashes)
+        size = sum(column.itemsize * len(column) for column in arrays)
+        return size + (len(self.source.data) if self.source is not None else 0)
+
+
+class MergedChunkTables(Docstore):
+    """
+    Several documents' chunk tables searched as one docstore.
+
+    Row ids run through the tables in order, matching an index built by
+    appending each document's vectors in the same order. Tables are shared,
+    not copied.
+    """
+
+    def __init__(self, tables: Sequence[Tuple[str, ChunkTable]]):
+        """
+        Initialize the merged view.
+
+        Args:
+            tables: (source name, table) pairs in index order
+        """
+        self.tables = list(tables)
+        self._offsets: List[int] = []
+        total = 0
+        for _, table in self.tables:
+            self._offsets.append(total)
+            total += len(table)
+        self._length = total
+
+    def __len__(self) -> int:
+        return self._length
+
+    def row_ids(self) -> RowIds:
+        """Position -> id map to hand to FAISS alongside this docstore."""
+        return RowIds(self)
+
+    def search(self, search: Union[int, str]) -> Union[str, Document]:
+        """
+        Build the Document for a row, with its source in the metadata.
+
+        Args:
+            search: Row id
+
+        Returns:
+            Document, or an error message if there is no such row
+        """
+        try:
+            row = int(search)
+        except (TypeError, ValueError):
+            return f"ID {search} not found."
+        if not 0 <= row < len(self):
+            return f"ID {search} not found."
+        position = bisect_right(self._offsets, row) - 1
+        source, table = self.tables[position]
+        document = table.search(row - self._offsets[position])
+        document.metadata["source"] = source
+        return document
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the tables (see ChunkTable.nbytes)."""
+        return sum(table.nbytes() for _, table in self.tables)
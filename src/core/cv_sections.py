@@ -0,0 +1,233 @@
+"""
+CV section module for CV RAG Chatbot.
+Structure-aware chunking for CVs: section headings and list items are
+detected line by line, so chunks follow the document's own structure and
+carry the section they belong to. Questions are routed to a section with
+the same heading vocabulary, for filtered retrieval.
+"""
+
+import os
+import re
+import sys
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+
+from configs.app_config import config
+
+# Section of text before the first recognized heading
+DEFAULT_SECTION = "General"
+
+# Canonical sections and the heading patterns that name them, checked in
+# order (so "Supervision Experiences" is Teaching, not Experience)
+SECTION_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    (section, re.compile(pattern)) for section, pattern in [
+        ("Summary", r"summary|profile|about me|objective"),
+        ("Contact", r"contact"),
+        ("Teaching", r"teaching|supervision|course title|lecturing"),
+        ("Publications", r"publication|journal|conference|thesis|paper"),
+        ("Education", r"education|academic background|degree"),
+        ("Skills", r"skill|competenc|expertise"),
+        ("Experience", r"experience|employment|work history|career"),
+        # Only a heading of its own: "Tools and Languages" is a skills list
+        ("Languages", r"^(?:spoken |foreign )?languages?(?: skills)?$"),
+        ("Certifications", r"certification|license|licence|certificate"),
+        ("Awards", r"award|honou?r|grant"),
+        ("Collaboration", r"collaboration"),
+        ("Service", r"community|reviewer|academic service"),
+        ("Projects", r"project"),
+    ]
+]
+
+# Words a question uses for a section without naming its heading
+_QUESTION_PATTERNS: List[Tuple[str, "re.Pattern[str]"]] = [
+    (section, re.compile(pattern)) for section, pattern in [
+        ("Teaching", r"teach|supervis|course|student|lectur"),
+        ("Publications", r"publication|publish|paper|journal|conference|thesis|article"),
+        ("Education", r"education|degree|ph\.?d|study|studied|university|graduat"),
+        ("Skills", r"skill|programming|tools|technolog|framework"),
+        ("Experience", r"experience|worked|\bjobs?\b|employ|career|position|\broles?\b"),
+        ("Languages", r"languages|\bspeaks?\b"),
+        ("Certifications", r"certif|license|licence"),
+        ("Awards", r"award|honou?r|prize|grant"),
+        ("Contact", r"contact|e-?mail|phone|linkedin"),
+    ]
+]
+
+_MARKDOWN_HEADING = re.compile(r"^(#{1,6})\s+")
+_BULLET = re.compile(r"^(?:[-*•–▪◦♥►]|\d{1,2}[.)])\s+")
+_MAX_HEADING_WORDS = 6
+
+
+class Chunk(NamedTuple):
+    """A chunk of normalized document text and where it came from."""
+    text: str
+    start: int  # Offset of the first byte in the UTF-8 encoded normalized text
+    end: int  # Offset after the last byte
+    section: str
+
+
+def utf8_length(text: str) -> int:
+    """Length of text in UTF-8 bytes (the unit of chunk offsets)."""
+    return len(text) if text.isascii() else len(text.encode())
+
+
+def _match_section(text: str, patterns: List[Tuple[str, "re.Pattern[str]"]]) -> Optional[str]:
+    """First section whose pattern occurs in text (lowercase)."""
+    for section, pattern in patterns:
+        if pattern.search(text):
+            return section
+    return None
+
+
+def detect_heading(line: str) -> Tuple[bool, Optional[str]]:
+    """
+    Decide whether a line is a heading and which section it opens.
+
+    Markdown and ALL-CAPS lines are headings; markdown headings below
+    level two are subheadings of the current section. Short title-case
+    lines are headings only when they name a known section, so job titles
+    and employer names stay part of the text.
+
+    Args:
+        line: One line of text
+
+    Returns:
+        Tuple of (is heading, canonical section or None for a subheading
+        that stays in the current section)
+    """
+    text = line.strip()
+    if not text or len(text) > 80:
+        return False, None
+
+    markdown = _MARKDOWN_HEADING.match(text)
+    title = _MARKDOWN_HEADING.sub("", text).strip("*_:# ")
+    words = title.split()
+    if not words or len(words) > _MAX_HEADING_WORDS or _BULLET.match(text):
+        return False, None
+    if any(char in title for char in "()|@,;.") or any(char.isdigit() for char in title):
+        return False, None
+
+    section = _match_section(title.lower(), SECTION_PATTERNS)
+    letters = [char for char in title if char.isalpha()]
+    if markdown:
+        return True, section if len(markdown.group(1)) <= 2 else None
+    if len(letters) > 2 and all(char.isupper() for char in letters):
+        return True, section
+
+    title_case = all(word[0].isupper() for word in words if len(word) > 3 and word[0].isalpha())
+    if section and title_case and title[0].isupper():
+        return True, section
+    return False, None
+
+
+def section_for_question(question: str) -> Optional[str]:
+    """
+    Guess which CV section a question is about.
+
+    Args:
+        question: User question
+
+    Returns:
+        Canonical section name, or None if the question names no section
+    """
+    return _match_section(question.lower(), _QUESTION_PATTERNS)
+
+
+def chunk_sections(segments: Iterable[str], chunk_size: Optional[int] = None,
+                   chunk_overlap: Optional[int] = None) -> Iterator[Chunk]:
+    """
+    Split streamed CV text into chunks that follow its sections and list items.
+
+    Every heading starts a new chunk. Within a section, lines are packed
+    up to chunk_size; when a chunk is full it is cut before the list item
+    or paragraph in progress, so items are not split across chunks. Only
+    single lines longer than chunk_size go through the recursive splitter,
+    and only their pieces overlap.
+
+    Args:
+        segments: Blocks of normalized text
+        chunk_size: Maximum chunk length (defaults to config)
+        chunk_overlap: Overlap between pieces of an oversized line (defaults to config)
+
+    Yields:
+        Chunks in document order, with offsets and section
+    """
+    chunk_size = chunk_size or config.vector_store.section_chunk_size
+    chunk_overlap = chunk_overlap if chunk_overlap is not None else config.vector_store.section_chunk_overlap
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    )
+
+    section = DEFAULT_SECTION
+    lines: List[Tuple[int, str]] = []  # (byte offset, line) of the chunk being built
+    item_start = 0  # Index in lines where the current item or paragraph starts
+    length = 0
+    has_body = False  # Whether lines hold more than headings
+
+    def emit(parts: List[Tuple[int, str]]) -> Iterator[Chunk]:
+        if not parts:
+            return
+        text = "".join(line for _, line in parts)
+        stripped = text.strip()
+        if stripped:
+            start = parts[0][0] + utf8_length(text[:len(text) - len(text.lstrip())])
+            yield Chunk(stripped, start, start + utf8_length(stripped), section)
+
+    def add(offset: int, line: str) -> Iterator[Chunk]:
+        nonlocal section, lines, item_start, length, has_body
+        is_heading, heading_section = detect_heading(line)
+        starts_item = _BULLET.match(line.lstrip()) is not None or not line.strip() or not lines
+
+        if is_heading:
+            # Consecutive headings stay together with the text that follows them
+            if has_body:
+                yield from emit(lines)
+                lines, item_start, length, has_body = [], 0, 0, False
+            if heading_section:
+                section = heading_section
+        elif length + len(line) > chunk_size and lines:
+            # Cut before the unfinished item when that leaves something behind
+            cut = item_start if not starts_item and item_start > 0 else len(lines)
+            yield from emit(lines[:cut])
+            lines = lines[cut:]
+            item_start, length, has_body = 0, sum(len(part) for _, part in lines), bool(lines)
+            if length + len(line) > chunk_size:
+                yield from emit(lines)
+                lines, length, has_body = [], 0, False
+
+        if len(line) > chunk_size:
+            yield from emit(lines)
+            position = 0
+            for piece in splitter.split_text(line):
+                found = line.find(piece, position)
+                position = found if found >= 0 else position
+                start = offset + utf8_length(line[:position])
+                yield Chunk(piece, start, start + utf8_length(piece), section)
+            lines, item_start, length, has_body = [], 0, 0, False
+            return
+
+        if starts_item or is_heading:
+            item_start = len(lines)
+        lines.append((offset, line))
+        length += len(line)
+        has_body = has_body or (not is_heading and bool(line.strip()))
+
+    offset = 0
+    pending = ""
+    for segment in segments:
+        pending += segment
+        if "\n" not in segment:
+            continue
+        *complete, pending = pending.split("\n")
+        for line in complete:
+            yield from add(offset, line + "\n")
+            offset += utf8_length(line) + 1
+    if pending:
+        yield from add(offset, pending)
+    yield from emit(lines)
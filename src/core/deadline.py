@@ -0,0 +1,82 @@
+"""
+Deadline module for CV RAG Chatbot.
+Per-request time budgets that flow through loading, retrieval, context
+building and generation.
+"""
+
+import time
+from typing import Dict, Optional
+
+
+class Deadline:
+    """
+    Absolute time limit for one request, with per-stage sub-budgets.
+
+    A stage deadline never outlives its parent: its budget is capped by the
+    time the parent has left. Stage timings are recorded on the root
+    deadline so they can be reported after the request.
+    """
+
+    def __init__(self, budget: float, name: str = "request", parent: Optional["Deadline"] = None):
+        """
+        Initialize the deadline.
+
+        Args:
+            budget: Seconds available from now
+            name: Label used when recording timings
+            parent: Enclosing deadline, if this is a stage
+        """
+        self.name = name
+        self.parent = parent
+        self.started_at = time.monotonic()
+        self.budget = budget if parent is None else max(0.0, min(budget, parent.remaining()))
+        self.expires_at = self.started_at + self.budget
+        self.timings: Dict[str, float] = {}
+
+    def remaining(self) -> float:
+        """Seconds left before the deadline (never negative)."""
+        return max(0.0, self.expires_at - time.monotonic())
+
+    def elapsed(self) -> float:
+        """Seconds since the deadline started."""
+        return time.monotonic() - self.started_at
+
+    def expired(self) -> bool:
+        """Whether the deadline has passed."""
+        return self.remaining() <= 0.0
+
+    def overrun(self) -> bool:
+        """Whether more time was spent than budgeted."""
+        return self.elapsed() > self.budget
+
+    def stage(self, name: str, budget: float) -> "Deadline":
+        """
+        Start a stage with its own budget, capped by this deadline.
+
+        Use as a context manager to record the stage duration.
+
+        Args:
+            name: Stage name (e.g. "retrieval")
+            budget: Seconds allotted to the stage
+
+        Returns:
+            Child Deadline for the stage
+        """
+        return Deadline(budget, name=name, parent=self)
+
+    def _root(self) -> "Deadline":
+        """Top-level deadline of this request."""
+        node = self
+        while node.parent is not None:
+            node = node.parent
+        return node
+
+    def __enter__(self) -> "Deadline":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._root().timings[self.name] = round(self.elapsed(), 3)
+        return False
+
+    def __repr__(self) -> str:
+        return f"Deadline(name={self.name!r}, remaining={self.remaining():.2f}s)"
@@ -0,0 +1,174 @@
+"""
+Near-duplicate detection module for CV RAG Chatbot.
+MinHash signatures over word shingles, bucketed with locality-sensitive
+hashing, find chunks that repeat text already indexed. Only the first
+copy is embedded; later copies are folded into its metadata, so every
+retrieved slot carries distinct information.
+"""
+
+import hashlib
+import os
+import re
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+
+from configs.app_config import config
+from src.core.cv_sections import Chunk
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = (1 << 32) - 1
+_WORD = re.compile(r"\w+")
+
+
+def _shingle_hashes(text: str, shingle_words: int) -> np.ndarray:
+    """32-bit hashes of the lowercase word n-grams of a text."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= shingle_words:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + shingle_words]) for i in range(len(words) - shingle_words + 1)}
+    return np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=4).digest(), "little") for s in shingles),
+        dtype=np.uint64, count=len(shingles)
+    )
+
+
+class MinHasher:
+    """MinHash signatures estimating the Jaccard similarity of word shingle sets."""
+
+    def __init__(self, num_perm: Optional[int] = None, shingle_words: Optional[int] = None, seed: int = 1):
+        """
+        Draw the hash permutations.
+
+        Args:
+            num_perm: Signature length (defaults to config)
+            shingle_words: Words per shingle (defaults to config)
+            seed: Seed of the permutations (signatures compare only under the same seed)
+        """
+        self.num_perm = num_perm or config.dedup.num_perm
+        self.shingle_words = shingle_words or config.dedup.shingle_words
+        rng = np.random.RandomState(seed)
+        # a, b and the hashes stay below 2**32, so a * h + b fits in 64 bits
+        self._a = rng.randint(1, _MAX_HASH, size=self.num_perm, dtype=np.uint64)
+        self._b = rng.randint(0, _MAX_HASH, size=self.num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """
+        MinHash signature of a text.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Array of num_perm minimum hash values
+        """
+        hashes = _shingle_hashes(text, self.shingle_words)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME
+        return permuted.min(axis=0)
+
+    @staticmethod
+    def similarity(first: np.ndarray, second: np.ndarray) -> float:
+        """Estimated Jaccard similarity of two signatures."""
+        return float(np.mean(first == second))
+
+
+@dataclass
+class DuplicateGroup:
+    """Chunks folded into one indexed representative."""
+    position: int  # Position of the representative in the index
+    sections: List[str] = field(default_factory=list)
+    spans: List[Tuple[int, int]] = field(default_factory=list)  # (start, end) of each dropped copy
+
+
+class NearDuplicateFilter:
+    """
+    Streaming LSH index over the chunks kept so far.
+
+    Signatures are cut into bands; chunks sharing any band are candidates
+    and count as duplicates when their estimated similarity reaches the
+    threshold. Identical texts are caught by an exact hash first.
+    """
+
+    def __init__(self, threshold: Optional[float] = None, num_perm: Optional[int] = None,
+                 bands: Optional[int] = None, shingle_words: Optional[int] = None):
+        """
+        Initialize an empty filter.
+
+        Args:
+            threshold: Estimated Jaccard similarity that counts as duplicate (defaults to config)
+            num_perm: Signature length (defaults to config)
+            bands: LSH bands; num_perm must divide evenly (defaults to config)
+            shingle_words: Words per shingle (defaults to config)
+        """
+        self.threshold = threshold if threshold is not None else config.dedup.threshold
+        self.hasher = MinHasher(num_perm, shingle_words)
+        self.bands = bands or config.dedup.bands
+        if self.hasher.num_perm % self.bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self._rows = self.hasher.num_perm // self.bands
+        self._exact: Dict[bytes, int] = {}
+        self._buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self._signatures: List[np.ndarray] = []
+
+    def add(self, text: str) -> Optional[int]:
+        """
+        Look a chunk up and keep it if it is new.
+
+        Args:
+            text: Chunk text
+
+        Returns:
+            Position of the kept chunk it duplicates, or None if the chunk
+            was new (it is then kept at the next position)
+        """
+        key = hashlib.blake2b(" ".join(_WORD.findall(text.lower())).encode(), digest_size=16).digest()
+        if key in self._exact:
+            return self._exact[key]
+
+        signature = self.hasher.signature(text)
+        band_keys = [signature[i * self._rows:(i + 1) * self._rows].tobytes() for i in range(self.bands)]
+        candidates = {position for band, band_key in enumerate(band_keys)
+                      for position in self._buckets[band].get(band_key, ())}
+        for position in sorted(candidates):
+            if self.hasher.similarity(signature, self._signatures[position]) >= self.threshold:
+                return position
+
+        position = len(self._signatures)
+        self._signatures.append(signature)
+        self._exact[key] = position
+        for band, band_key in enumerate(band_keys):
+            self._buckets[band].setdefault(band_key, []).append(position)
+        return None
+
+
+def drop_near_duplicates(chunks: Iterable[Chunk], groups: Dict[int, DuplicateGroup],
+                         near_filter: Optional[NearDuplicateFilter] = None) -> Iterator[Chunk]:
+    """
+    Pass on the first copy of each near-duplicate group.
+
+    Args:
+        chunks: Chunks in document order
+        groups: Filled with the dropped copies, keyed by the position of
+            their representative among the chunks passed on
+        near_filter: Filter to use (defaults to a new one from config)
+
+    Yields:
+        Chunks that are not near-duplicates of an earlier one
+    """
+    near_filter = near_filter or NearDuplicateFilter()
+    for chunk in chunks:
+        position = near_filter.add(chunk.text)
+        if position is None:
+            yield chunk
+            continue
+        group = groups.get(position)
+        if group is None:
+            group = groups[position] = DuplicateGroup(position)
+        group.sections.append(chunk.section)
+        group.spans.append((chunk.start, chunk.end))
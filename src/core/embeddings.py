@@ -3,10 +3,12 @@ Embeddings module for CV RAG Chatbot.
 Provides simple hash-based embeddings for maximum compatibility.
 """
 
+import hashlib
 import re
 from typing import List, Union, Optional
 import sys
 import os
+import threading
 
 # Add the parent directory to sys.path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
@@ -42,8 +44,9 @@ class SimpleHashEmbeddings:
         # Create a simple hash-based vector
         vector = [0.0] * self.dimension
         for word in words[:self.dimension]:
-            # Use hash to create pseudo-random but deterministic values
-            hash_val = hash(word) % self.dimension
+            # blake2b, not hash(): str hashes are randomized per process
+            digest = hashlib.blake2b(word.encode(), digest_size=8).digest()
+            hash_val = int.from_bytes(digest, "little") % self.dimension
             vector[hash_val] += 1.0
         
         # Simple normalization
@@ -93,11 +96,19 @@ class SimpleHashEmbeddings:
             return self.embed_query(text)
 
 
+_embeddings: Optional[SimpleHashEmbeddings] = None
+_embeddings_lock = threading.Lock()
+
+
 def get_embeddings() -> SimpleHashEmbeddings:
     """
-    Factory function to get embeddings instance.
+    Get the process-wide embeddings instance (shared by all personas and pipelines).
     
     Returns:
         Configured embeddings instance
     """
-    return SimpleHashEmbeddings()
+    global _embeddings
+    with _embeddings_lock:
+        if _embeddings is None:
+            _embeddings = SimpleHashEmbeddings()
+    return _embeddings
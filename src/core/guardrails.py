@@ -0,0 +1,166 @@
+"""
+Guardrails module for CV RAG Chatbot.
+Classifies personal and out-of-scope questions locally, before any retrieval
+or LLM call is made.
+"""
+
+import math
+import os
+import re
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, List, Optional, Pattern, Sequence, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config, GuardrailConfig
+from src.core.embeddings import get_embeddings
+
+# Words ignored when comparing questions to exemplars, so that shared
+# question scaffolding ("what is his ...") does not count as similarity.
+# Each guardrail adds the words of its persona's name.
+_STOPWORDS = frozenset("""
+a an and are about can could did do does for from has have he her him his how
+i in is it me of on or please tell the their them they this to was what when
+where which who whom why will with would you your
+""".split())
+
+# Placeholder in topic patterns for the persona's name words
+_NAME_PLACEHOLDER = "<name>"
+
+
+@dataclass
+class GuardrailDecision:
+    """Result of classifying a single question."""
+    blocked: bool
+    topic: Optional[str] = None
+    reason: str = ""
+    score: float = 0.0
+
+
+class ScopeGuardrail:
+    """
+    Fast local classifier for personal and out-of-scope questions.
+    Combines regex rules with similarity to exemplar questions.
+    """
+
+    def __init__(self, guardrail_config: Optional[GuardrailConfig] = None, embeddings=None,
+                 name_variations: Optional[Sequence[str]] = None, refusal_message: Optional[str] = None):
+        """
+        Initialize the guardrail.
+
+        Args:
+            guardrail_config: Rules and thresholds (defaults to the app config)
+            embeddings: Embeddings used for exemplar similarity
+            name_variations: Names of the persona the questions are about
+                (defaults to config.name_variations)
+            refusal_message: Refusal in the persona's words (defaults to the config's)
+        """
+        self.config = guardrail_config or config.guardrail
+        self.embeddings = embeddings or get_embeddings()
+        self.refusal_message = refusal_message or self.config.refusal_message
+        names = name_variations if name_variations is not None else config.name_variations or []
+        name_words = sorted({w for name in names for w in re.findall(r'\w+', name.lower())}, key=len, reverse=True)
+        self._stopwords: FrozenSet[str] = _STOPWORDS | frozenset(name_words)
+        # A name alternative that never matches when the persona has no name words
+        name_pattern = "|".join(re.escape(w) for w in name_words) or "(?!)"
+        self._patterns: List[Tuple[str, Pattern]] = [
+            (topic, re.compile(pattern.replace(_NAME_PLACEHOLDER, name_pattern), re.IGNORECASE))
+            for topic, patterns in self.config.topic_patterns.items()
+            for pattern in patterns
+        ]
+        self._exemplars: List[Tuple[str, List[float]]] = []
+        for topic, questions in self.config.exemplar_questions.items():
+            for question in questions:
+                vector = self._embed(question)
+                if vector is not None:
+                    self._exemplars.append((topic, vector))
+
+    def _embed(self, text: str) -> Optional[List[float]]:
+        """Embed the content words of a question, or None if there are none."""
+        words = [w for w in re.findall(r'\w+', text.lower()) if w not in self._stopwords]
+        if not words:
+            return None
+        return self.embeddings.embed_query(" ".join(words))
+
+    @staticmethod
+    def _cosine(a: List[float], b: List[float]) -> float:
+        """Cosine similarity between two vectors."""
+        dot = sum(x * y for x, y in zip(a, b))
+        norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+        return dot / norm if norm else 0.0
+
+    def classify(self, question: str) -> GuardrailDecision:
+        """
+        Classify a question as in scope or out of scope.
+
+        Args:
+            question: User question
+
+        Returns:
+            GuardrailDecision describing whether the question is refused
+        """
+        if not self.config.enabled or not question or not question.strip():
+            return GuardrailDecision(blocked=False)
+
+        for topic, pattern in self._patterns:
+            match = pattern.search(question)
+            if match:
+                return GuardrailDecision(
+                    blocked=True, topic=topic, reason=f"rule: {match.group(0)}", score=1.0
+                )
+
+        vector = self._embed(question)
+        if vector is None or not self._exemplars:
+            return GuardrailDecision(blocked=False)
+
+        best_topic, best_score = None, 0.0
+        for topic, exemplar in self._exemplars:
+            score = self._cosine(vector, exemplar)
+            if score > best_score:
+                best_topic, best_score = topic, score
+
+        if best_score >= self.config.similarity_threshold:
+            return GuardrailDecision(
+                blocked=True, topic=best_topic, reason="exemplar similarity", score=best_score
+            )
+        return GuardrailDecision(blocked=False, score=best_score)
+
+    def check(self, question: str) -> Optional[str]:
+        """
+        Return the canned refusal for an out-of-scope question.
+
+        Args:
+            question: User question
+
+        Returns:
+            Refusal message if the question is out of scope, None otherwise
+        """
+        if self.classify(question).blocked:
+            return self.refusal_message
+        return None
+
+
+_guardrails: Dict[Tuple[Tuple[str, ...], Optional[str]], ScopeGuardrail] = {}
+_guardrails_lock = threading.Lock()
+
+
+def get_guardrail(name_variations: Optional[Sequence[str]] = None,
+                  refusal_message: Optional[str] = None) -> ScopeGuardrail:
+    """
+    Get the shared guardrail for a persona, building it on first use.
+
+    Args:
+        name_variations: Names of the persona (defaults to config.name_variations)
+        refusal_message: Refusal in the persona's words (defaults to the config's)
+
+    Returns:
+        ScopeGuardrail built once per distinct persona name list and refusal
+    """
+    key = (tuple(name_variations if name_variations is not None else config.name_variations or []), refusal_message)
+    with _guardrails_lock:
+        guardrail = _guardrails.get(key)
+        if guardrail is None:
+            guardrail = _guardrails[key] = ScopeGuardrail(name_variations=key[0], refusal_message=refusal_message)
+    return guardrail
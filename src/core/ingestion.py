@@ -0,0 +1,331 @@
+"""
+Ingestion module for CV RAG Chatbot.
+Generator pipeline from documents to a FAISS index: extract, normalize,
+chunk, drop near-duplicates, embed and append in batches. Each stage
+holds at most a few blocks of text, so memory stays flat with document
+size and the first chunks are indexed while later pages are still being
+extracted. The index keeps chunks as offsets into one copy of the text.
+"""
+
+import hashlib
+import itertools
+import os
+import re
+import sys
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+import numpy as np
+from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.faiss import dependable_faiss_import
+
+from configs.app_config import config
+from src.core.chunk_table import ChunkTable
+from src.core.cv_sections import DEFAULT_SECTION, Chunk, chunk_sections, utf8_length
+from src.core.dedup import DuplicateGroup, drop_near_duplicates
+from src.core.embeddings import get_embeddings
+from src.utils.pdf_extraction import iter_pdf_pages
+
+# Text is re-split once the chunker holds this many chunks' worth of text
+_CHUNKER_FLUSH_CHUNKS = 4
+
+_HORIZONTAL_WHITESPACE = re.compile(r"[ \t\f\v]+")
+
+# (chunk, vector) pairs of one embedded batch
+EmbeddedBatch = List[Tuple[Chunk, List[float]]]
+
+
+@dataclass
+class IngestionStats:
+    """What one ingestion run processed."""
+    characters: int = 0
+    chunks: int = 0
+    duplicates: int = 0  # Near-duplicate chunks left out of the index
+    duplicate_characters: int = 0
+    batches: int = 0
+    seconds: float = 0.0
+    content_hash: str = ""
+
+
+def iter_text_segments(text: str, block_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Split an in-memory string into blocks for the pipeline.
+
+    Args:
+        text: Text content
+        block_chars: Characters per block (defaults to config)
+
+    Yields:
+        Consecutive blocks of the text
+    """
+    block_chars = block_chars or config.vector_store.read_block_chars
+    for start in range(0, len(text), block_chars):
+        yield text[start:start + block_chars]
+
+
+def iter_file_segments(path: str, block_chars: Optional[int] = None) -> Iterator[str]:
+    """
+    Stream a document from disk: PDFs page by page, anything else as UTF-8 text.
+
+    Args:
+        path: Document path
+        block_chars: Characters per text block (defaults to config)
+
+    Yields:
+        Blocks of document text
+    """
+    if path.lower().endswith(".pdf"):
+        # Workers open the file by path; its bytes are never read whole here
+        for page in iter_pdf_pages(path):
+            yield page + "\n"
+        return
+
+    block_chars = block_chars or config.vector_store.read_block_chars
+    with open(path, "r", encoding="utf-8") as f:
+        while True:
+            block = f.read(block_chars)
+            if not block:
+                break
+            yield block
+
+
+def normalize_segments(segments: Iterable[str]) -> Iterator[str]:
+    """
+    Normalize line endings, drop NUL bytes and collapse runs of spaces.
+
+    A trailing carriage return is held back so CRLF pairs split across
+    blocks still become a single newline.
+
+    Args:
+        segments: Blocks of raw text
+
+    Yields:
+        Normalized blocks
+    """
+    pending_cr = ""
+    for segment in segments:
+        text = pending_cr + segment
+        pending_cr = ""
+        if text.endswith("\r"):
+            text, pending_cr = text[:-1], "\r"
+        text = text.replace("\r\n", "\n").replace("\r", "\n").replace("\x00", "")
+        text = _HORIZONTAL_WHITESPACE.sub(" ", text)
+        if text:
+            yield text
+    if pending_cr:
+        yield "\n"
+
+
+def chunk_segments(segments: Iterable[str], chunk_size: Optional[int] = None,
+                   chunk_overlap: Optional[int] = None) -> Iterator[Chunk]:
+    """
+    Split streamed text into overlapping chunks, ignoring document structure.
+
+    Text is buffered until it spans a few chunks, split, and every chunk
+    but the last is emitted. The last chunk stays in the buffer with the
+    text after it, so no chunk is cut at a block boundary and consecutive
+    chunks keep their overlap, as when splitting the whole text at once.
+
+    Args:
+        segments: Blocks of text
+        chunk_size: Maximum chunk length (defaults to config)
+        chunk_overlap: Overlap between chunks (defaults to config)
+
+    Yields:
+        Chunks in document order, with offsets (section is DEFAULT_SECTION)
+    """
+    chunk_size = chunk_size or config.vector_store.chunk_size
+    chunk_overlap = chunk_overlap if chunk_overlap is not None else config.vector_store.chunk_overlap
+    splitter = RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len
+    )
+    flush_at = chunk_size * _CHUNKER_FLUSH_CHUNKS
+
+    def located(chunks: List[str], buffer: str, buffer_offset: int) -> Iterator[Chunk]:
+        # Chunks appear in order, so byte offsets advance from the previous one
+        position = start = 0
+        for text in chunks:
+            found = max(buffer.find(text, position), position)
+            start += utf8_length(buffer[position:found])
+            position = found
+            yield Chunk(text, buffer_offset + start, buffer_offset + start + utf8_length(text), DEFAULT_SECTION)
+
+    buffer = ""
+    buffer_offset = 0  # Byte offset of the buffer in the whole text
+    for segment in segments:
+        buffer += segment
+        if len(buffer) < flush_at:
+            continue
+        chunks = splitter.split_text(buffer) if buffer.strip() else []
+        start = buffer.rfind(chunks[-1]) if len(chunks) >= 2 else -1
+        if start <= 0:
+            # Nothing to hold back (e.g. a long run of whitespace): cut here
+            # rather than re-split an ever growing buffer on every segment
+            yield from located(chunks, buffer, buffer_offset)
+            buffer_offset += utf8_length(buffer)
+            buffer = ""
+            continue
+        yield from located(chunks[:-1], buffer, buffer_offset)
+        buffer_offset += utf8_length(buffer[:start])
+        buffer = buffer[start:]
+
+    if buffer.strip():
+        yield from located(splitter.split_text(buffer), buffer, buffer_offset)
+
+
+def embed_chunks(chunks: Iterable[Chunk], embeddings, batch_size: Optional[int] = None) -> Iterator[EmbeddedBatch]:
+    """
+    Embed chunks in fixed-size batches.
+
+    Args:
+        chunks: Text chunks
+        embeddings: Embeddings object with embed_documents()
+        batch_size: Chunks per batch (defaults to config)
+
+    Yields:
+        Lists of (chunk, vector) pairs
+    """
+    batch_size = batch_size or config.vector_store.embed_batch_size
+    iterator = iter(chunks)
+    while True:
+        batch = list(itertools.islice(iterator, batch_size))
+        if not batch:
+            break
+        yield list(zip(batch, embeddings.embed_documents([chunk.text for chunk in batch])))
+
+
+def append_to_index(batches: Iterable[EmbeddedBatch], embeddings, table: ChunkTable,
+                    vectorstore: Optional[FAISS] = None) -> Optional[FAISS]:
+    """
+    Add embedded batches to a FAISS index, creating it from the first batch.
+
+    Vectors go straight into the FAISS index and chunks become rows of
+    the table, which serves as the index's docstore; no Document is
+    created until a search returns the chunk.
+
+    Args:
+        batches: Lists of (chunk, vector) pairs
+        embeddings: Embeddings object used for queries
+        table: Chunk table the index's docstore is (or will be) built on
+        vectorstore: Existing index over table to append to
+
+    Returns:
+        The index, or None if there were no batches and none was given
+    """
+    for batch in batches:
+        vectors = np.asarray([vector for _, vector in batch], dtype=np.float32)
+        if vectorstore is None:
+            index = dependable_faiss_import().IndexFlatL2(vectors.shape[1])
+            vectorstore = FAISS(embeddings, index, table, table.row_ids())
+        vectorstore.index.add(vectors)
+        for chunk, _ in batch:
+            table.append(chunk)
+    return vectorstore
+
+
+def merge_duplicates(table: ChunkTable, groups: Dict[int, DuplicateGroup]):
+    """
+    Record dropped near-duplicates in the metadata of their representatives.
+
+    Args:
+        table: Chunk table of the index built from the deduplicated chunks
+        groups: Dropped copies by representative row (from drop_near_duplicates)
+    """
+    for group in groups.values():
+        section = table.sections[table.section_ids[group.position]]
+        table.extra[group.position] = {
+            "sections": sorted({section, *group.sections}),
+            "duplicates": len(group.spans),
+            "duplicate_spans": list(group.spans),
+        }
+
+
+def _record(segments: Iterable[str], sink: bytearray) -> Iterator[str]:
+    """Keep the UTF-8 encoding of text as it streams past (the chunk table source)."""
+    for segment in segments:
+        sink += segment.encode()
+        yield segment
+
+
+def _measure(segments: Iterable[str], stats: IngestionStats) -> Iterator[str]:
+    """Count and hash text as it streams past (same hash as get_content_hash)."""
+    digest = hashlib.md5()
+    for segment in segments:
+        stats.characters += len(segment)
+        digest.update(segment.encode())
+        yield segment
+    stats.content_hash = digest.hexdigest()
+
+
+def _count(items: Iterable, stats: IngestionStats, field_name: str) -> Iterator:
+    """Count items as they stream past."""
+    for item in items:
+        setattr(stats, field_name, getattr(stats, field_name) + 1)
+        yield item
+
+
+def ingest(segments: Iterable[str], embeddings=None, chunk_size: Optional[int] = None,
+           chunk_overlap: Optional[int] = None, batch_size: Optional[int] = None,
+           section_aware: Optional[bool] = None, dedup: Optional[bool] = None) -> Tuple[FAISS, IngestionStats]:
+    """
+    Run streamed text through normalize, chunk, embed and index-append.
+
+    Args:
+        segments: Blocks of document text (e.g. from iter_file_segments)
+        embeddings: Embeddings object (defaults to get_embeddings())
+        chunk_size: Maximum chunk length (defaults to config for the chunker used)
+        chunk_overlap: Overlap between chunks (defaults to config for the chunker used)
+        batch_size: Chunks embedded per batch (defaults to config)
+        section_aware: Chunk by CV sections and list items instead of by
+            size alone (defaults to config)
+        dedup: Leave near-duplicate chunks out of the index (defaults to config)
+
+    Returns:
+        Tuple of (FAISS index, IngestionStats); the stats hash and character
+        count cover the text as received, before normalization
+
+    Raises:
+        ValueError: If the documents contain no text to index
+    """
+    started = time.monotonic()
+    embeddings = embeddings or get_embeddings()
+    stats = IngestionStats()
+
+    source = bytearray()
+    table = ChunkTable()
+    text = _record(normalize_segments(_measure(segments, stats)), source)
+    if section_aware is None:
+        section_aware = config.vector_store.section_aware
+    chunker = chunk_sections if section_aware else chunk_segments
+    chunks = chunker(text, chunk_size, chunk_overlap)
+    groups: Dict[int, DuplicateGroup] = {}
+    if config.dedup.enabled if dedup is None else dedup:
+        chunks = drop_near_duplicates(chunks, groups)
+    chunks = _count(chunks, stats, "chunks")
+    batches = _count(embed_chunks(chunks, embeddings, batch_size), stats, "batches")
+    vectorstore = append_to_index(batches, embeddings, table)
+
+    stats.seconds = time.monotonic() - started
+    if vectorstore is None:
+        raise ValueError("No text to index")
+    # A view, not bytes(source): copying would briefly hold the text twice
+    table.attach(memoryview(source))
+    del source
+    merge_duplicates(table, groups)
+    stats.duplicates = sum(len(group.spans) for group in groups.values())
+    stats.duplicate_characters = sum(end - start for group in groups.values() for start, end in group.spans)
+
+    print(f"Indexed {stats.chunks} chunks from {stats.characters:,} characters "
+          f"in {stats.batches} batches ({stats.seconds:.2f}s)")
+    if stats.duplicates:
+        share = stats.duplicates / (stats.chunks + stats.duplicates)
+        print(f"Dropped {stats.duplicates} near-duplicate chunks "
+              f"({stats.duplicate_characters:,} characters, {share:.0%} of chunks)")
+    return vectorstore, stats
@@ -0,0 +1,188 @@
+"""
+Knowledge base module for CV RAG Chatbot.
+Indexes each knowledge base document on its own, keyed by its content
+fingerprint, and merges the per-document indexes into one searchable
+index. Adding, editing or deleting a document re-embeds only that
+document; every retrieved chunk names the document it came from.
+"""
+
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from langchain_community.vectorstores import FAISS
+from langchain_community.vectorstores.faiss import dependable_faiss_import
+
+from src.core.chunk_table import MergedChunkTables
+from src.core.embeddings import get_embeddings
+from src.core.ingestion import IngestionStats, ingest, iter_file_segments
+from src.utils.file_processing import get_document_source, get_knowledge_base_documents
+from src.utils.fingerprint import FileFingerprint, KnowledgeBaseFingerprint, get_fingerprinter
+
+
+@dataclass
+class DocumentIndex:
+    """Index of one knowledge base document version."""
+    source: str
+    content_hash: str
+    vectorstore: FAISS
+    stats: IngestionStats
+
+
+class KnowledgeBaseIndexer:
+    """
+    Per-document indexes of the knowledge base, rebuilt only for changed files.
+
+    Indexes are kept by document path and reused while the document's
+    content hash is unchanged, so a rebuild after editing one file embeds
+    that file alone. Deleted documents are dropped on the next build.
+    """
+
+    def __init__(self, embeddings=None, directory: Optional[str] = None):
+        """
+        Initialize the indexer.
+
+        Args:
+            embeddings: Embeddings object (defaults to get_embeddings() on first build)
+            directory: Knowledge base directory (defaults to the configured one)
+        """
+        self.embeddings = embeddings
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._documents: Dict[str, DocumentIndex] = {}
+
+    def _index_document(self, fingerprint: FileFingerprint) -> Optional[DocumentIndex]:
+        """Index one document version, reusing the previous index if unchanged."""
+        cached = self._documents.get(fingerprint.path)
+        if cached is not None and cached.content_hash == fingerprint.content_hash:
+            return cached
+
+        source = get_document_source(fingerprint.path, self.directory)
+        try:
+            vectorstore, stats = ingest(iter_file_segments(fingerprint.path), self.embeddings)
+        except ValueError:
+            print(f"Knowledge base document {source} has no text to index, skipping")
+            return None
+        print(f"Indexed knowledge base document {source}")
+        return DocumentIndex(source, fingerprint.content_hash, vectorstore, stats)
+
+    def build(self, fingerprint: Optional[KnowledgeBaseFingerprint] = None) -> Tuple[FAISS, IngestionStats]:
+        """
+        Bring the per-document indexes up to date and merge them.
+
+        Args:
+            fingerprint: Knowledge base version to build (defaults to the
+                documents on disk now)
+
+        Returns:
+            Tuple of (merged FAISS index, IngestionStats totalled over the
+            documents, with the combined knowledge base hash)
+
+        Raises:
+            FileNotFoundError: If there are no knowledge base documents
+            ValueError: If no document contains text to index
+        """
+        if fingerprint is None:
+            fingerprint = get_fingerprinter().fingerprint_all(self.documents())
+        if fingerprint is None:
+            raise FileNotFoundError("No knowledge base documents found")
+
+        with self._lock:
+            self.embeddings = self.embeddings or get_embeddings()
+            documents = {}
+            for document in fingerprint.documents:
+                index = self._index_document(document)
+                if index is not None:
+                    documents[document.path] = index
+            # Replacing the dict drops indexes of deleted or emptied documents
+            self._documents = documents
+            indexes = list(documents.values())
+
+        if not indexes:
+            raise ValueError("No text to index")
+        vectorstore = merge_document_indexes(indexes, self.embeddings)
+
+        stats = IngestionStats(content_hash=fingerprint.content_hash)
+        for index in indexes:
+            stats.characters += index.stats.characters
+            stats.chunks += index.stats.chunks
+            stats.duplicates += index.stats.duplicates
+            stats.duplicate_characters += index.stats.duplicate_characters
+            stats.batches += index.stats.batches
+            stats.seconds += index.stats.seconds
+        return vectorstore, stats
+
+    def documents(self) -> List[str]:
+        """Paths of the knowledge base documents on disk now."""
+        return get_knowledge_base_documents(self.directory)
+
+    def sources(self) -> List[str]:
+        """Names of the documents currently indexed."""
+        with self._lock:
+            return [index.source for index in self._documents.values()]
+
+    def nbytes(self) -> int:
+        """
+        Approximate memory held by the per-document indexes.
+
+        Returns:
+            Bytes of the stored vectors and chunk tables
+        """
+        with self._lock:
+            indexes = list(self._documents.values())
+        size = 0
+        for document in indexes:
+            index = document.vectorstore.index
+            size += index.ntotal * index.d * 4
+            nbytes = getattr(document.vectorstore.docstore, "nbytes", None)
+            size += nbytes() if nbytes else 0
+        return size
+
+
+def merge_document_indexes(indexes: List[DocumentIndex], embeddings) -> FAISS:
+    """
+    Combine per-document indexes into one, without re-embedding.
+
+    Vectors are copied into a new flat index; the documents' chunk tables
+    are shared through a MergedChunkTables docstore.
+
+    Args:
+        indexes: Document indexes in a stable order
+        embeddings: Embeddings object used for queries
+
+    Returns:
+        FAISS index over all documents
+    """
+    dimension = indexes[0].vectorstore.index.d
+    index = dependable_faiss_import().IndexFlatL2(dimension)
+    tables = []
+    for document in indexes:
+        document_index = document.vectorstore.index
+        if document_index.ntotal:
+            index.add(document_index.reconstruct_n(0, document_index.ntotal))
+        tables.append((document.source, document.vectorstore.docstore))
+    docstore = MergedChunkTables(tables)
+    return FAISS(embeddings, index, docstore, docstore.row_ids())
+
+
+_indexer: Optional[KnowledgeBaseIndexer] = None
+_indexer_lock = threading.Lock()
+
+
+def get_knowledge_base_indexer() -> KnowledgeBaseIndexer:
+    """
+    Get the process-wide knowledge base indexer.
+
+    Returns:
+        Shared KnowledgeBaseIndexer instance
+    """
+    global _indexer
+    with _indexer_lock:
+        if _indexer is None:
+            _indexer = KnowledgeBaseIndexer()
+    return _indexer
@@ -0,0 +1,344 @@
+"""
+LLM client module for CV RAG Chatbot.
+Wraps Gemini models with retry, backoff and rate-limit classification.
+All clients in the process draw from one request rate limiter, so
+several personas share the API's per-minute quota instead of each
+tripping it.
+"""
+
+import asyncio
+import os
+import random
+import re
+import sys
+import threading
+import time
+from typing import Any, Dict, Iterator, Optional
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config, RetryConfig
+from src.core.deadline import Deadline
+
+
+class RateLimitError(Exception):
+    """Short-lived throttling (e.g. requests per minute) that outlasted the retry budget."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class QuotaExhaustedError(Exception):
+    """Daily quota exhausted; retrying before the quota resets is pointless."""
+
+
+_DAILY_MARKERS = ("perday", "per day", "per_day", "daily")
+_RATE_MARKERS = ("429", "resource_exhausted", "resource exhausted", "quota", "rate limit", "too many requests")
+_RETRY_DELAY_PATTERNS = (
+    re.compile(r"retry_delay\s*\{\s*seconds:\s*(\d+)(?:\s*nanos:\s*(\d+))?"),
+    re.compile(r"retry in\s*([\d.]+)\s*s", re.IGNORECASE),
+    re.compile(r"retry-after:?\s*([\d.]+)", re.IGNORECASE),
+)
+
+
+def classify_api_error(error: BaseException) -> Optional[str]:
+    """
+    Classify an API error as daily quota exhaustion or short-term throttling.
+
+    Args:
+        error: Exception raised by the Gemini client
+
+    Returns:
+        "daily", "rate" or None if the error is not quota related
+    """
+    if isinstance(error, QuotaExhaustedError):
+        return "daily"
+    if isinstance(error, RateLimitError):
+        return "rate"
+    message = str(error).lower()
+    if getattr(error, "code", None) != 429 and not any(m in message for m in _RATE_MARKERS):
+        return None
+    if any(marker in message for marker in _DAILY_MARKERS):
+        return "daily"
+    return "rate"
+
+
+def parse_retry_delay(error: BaseException) -> Optional[float]:
+    """
+    Extract the server-provided retry delay from an API error, if any.
+
+    Args:
+        error: Exception raised by the Gemini client
+
+    Returns:
+        Delay in seconds, or None if the server gave no hint
+    """
+    for detail in getattr(error, "details", None) or []:
+        retry_delay = getattr(detail, "retry_delay", None)
+        if retry_delay is not None:
+            return retry_delay.seconds + retry_delay.nanos / 1e9
+
+    message = str(error)
+    for pattern in _RETRY_DELAY_PATTERNS:
+        match = pattern.search(message)
+        if match:
+            delay = float(match.group(1))
+            if match.lastindex and match.lastindex > 1 and match.group(2):
+                delay += int(match.group(2)) / 1e9
+            return delay
+    return None
+
+
+def _chunk_text(chunk: Any) -> str:
+    """Text of a streamed chunk; blocked or empty chunks have none (.text raises ValueError)."""
+    if chunk is None:
+        return ""
+    try:
+        return chunk.text or ""
+    except ValueError:
+        return ""
+
+
+class RateLimiter:
+    """
+    Token bucket spacing requests to a sustained rate.
+
+    Up to a minute's worth of requests may burst; beyond that, callers
+    reserve the next free slot and wait for it, in arrival order.
+    """
+
+    def __init__(self, requests_per_minute: Optional[int] = None):
+        """
+        Initialize a full bucket.
+
+        Args:
+            requests_per_minute: Sustained request rate (defaults to config)
+        """
+        self.rate = (requests_per_minute or config.model.requests_per_minute) / 60.0
+        self.capacity = max(1.0, self.rate * 60.0)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, max_wait: float) -> Optional[float]:
+        """
+        Reserve a request slot.
+
+        Args:
+            max_wait: Longest acceptable wait in seconds
+
+        Returns:
+            Seconds to wait before sending the request, or None (nothing
+            reserved) if the next slot is further away than max_wait
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            wait = max(0.0, (1.0 - self._tokens) / self.rate)
+            if wait > max_wait:
+                return None
+            # Tokens go negative while requests queue for future slots
+            self._tokens -= 1.0
+            return wait
+
+
+_rate_limiter: Optional[RateLimiter] = None
+_rate_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    Get the process-wide Gemini request rate limiter.
+
+    Returns:
+        Shared RateLimiter instance
+    """
+    global _rate_limiter
+    with _rate_limiter_lock:
+        if _rate_limiter is None:
+            _rate_limiter = RateLimiter()
+    return _rate_limiter
+
+
+class GeminiClient:
+    """
+    Gemini model wrapper that retries throttled requests.
+
+    Per-minute throttling is retried with jittered exponential backoff, or
+    after the server's retry hint when one is given, for as long as the
+    request deadline allows. Daily quota exhaustion fails fast. Every
+    attempt first waits for a slot from the rate limiter.
+    """
+
+    def __init__(self, model: Any, retry_config: Optional[RetryConfig] = None,
+                 rate_limiter: Optional[RateLimiter] = None):
+        """
+        Initialize the client.
+
+        Args:
+            model: google.generativeai GenerativeModel instance
+            retry_config: Retry settings (defaults to the app config)
+            rate_limiter: Request rate limiter (defaults to the shared one)
+        """
+        self.model = model
+        self.retry = retry_config or config.retry
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+
+    @property
+    def model_name(self) -> str:
+        """Name of the wrapped model."""
+        return getattr(self.model, "model_name", "unknown")
+
+    def _next_delay(self, error: BaseException, attempt: int, deadline: Deadline) -> float:
+        """
+        Decide how long to wait before retrying, or raise if we should not.
+
+        Args:
+            error: Error from the last attempt
+            attempt: Number of attempts made so far
+            deadline: Deadline by which the request must finish
+
+        Returns:
+            Seconds to sleep before the next attempt
+
+        Raises:
+            QuotaExhaustedError: If the daily quota is exhausted
+            RateLimitError: If the retry budget is spent
+            Exception: The original error if it is not quota related
+        """
+        kind = classify_api_error(error)
+        if kind is None:
+            raise error
+        if kind == "daily":
+            raise QuotaExhaustedError(str(error)) from error
+
+        hint = parse_retry_delay(error)
+        if hint is not None:
+            delay = hint + random.uniform(0, self.retry.jitter)
+        else:
+            backoff = min(self.retry.max_delay, self.retry.base_delay * (2 ** (attempt - 1)))
+            delay = backoff / 2 + random.uniform(0, backoff / 2)
+
+        if attempt >= self.retry.max_attempts or delay >= deadline.remaining():
+            raise RateLimitError(
+                f"Rate limited after {attempt} attempt(s): {error}", retry_after=hint
+            ) from error
+        return delay
+
+    def _deadline(self, deadline: Optional[Deadline]) -> Deadline:
+        """Deadline for a request, defaulting to the configured retry budget."""
+        return deadline if deadline is not None else Deadline(self.retry.request_deadline)
+
+    def _slot_delay(self, deadline: Deadline) -> float:
+        """
+        Reserve a rate limiter slot for the next attempt.
+
+        Args:
+            deadline: Deadline by which the request must finish
+
+        Returns:
+            Seconds to wait before sending
+
+        Raises:
+            RateLimitError: If no slot frees up before the deadline
+        """
+        delay = self.rate_limiter.reserve(deadline.remaining())
+        if delay is None:
+            raise RateLimitError("Request rate limit reached; no slot before the deadline")
+        return delay
+
+    def _request_options(self, deadline: Deadline) -> Dict[str, Any]:
+        """Per-attempt HTTP options, bounded by the request timeout and the deadline."""
+        return {"timeout": max(1.0, min(config.model.timeout, deadline.remaining()))}
+
+    def generate(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                 deadline: Optional[Deadline] = None) -> str:
+        """
+        Generate a response, retrying on throttling.
+
+        Args:
+            prompt: Prompt text
+            generation_config: Gemini generation settings
+            deadline: Time limit for the request, including retries
+
+        Returns:
+            Response text
+        """
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            time.sleep(self._slot_delay(deadline))
+            try:
+                response = self.model.generate_content(
+                    prompt, generation_config=generation_config,
+                    request_options=self._request_options(deadline)
+                )
+                return response.text
+            except Exception as e:
+                time.sleep(self._next_delay(e, attempt, deadline))
+
+    def generate_stream(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                        deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Stream a response, retrying on throttling until the first chunk arrives.
+
+        Args:
+            prompt: Prompt text
+            generation_config: Gemini generation settings
+            deadline: Time limit for the request, including retries
+
+        Yields:
+            Response text chunks
+        """
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            time.sleep(self._slot_delay(deadline))
+            try:
+                chunks = iter(self.model.generate_content(
+                    prompt, generation_config=generation_config, stream=True,
+                    request_options=self._request_options(deadline)
+                ))
+                first = next(chunks, None)
+                break
+            except Exception as e:
+                time.sleep(self._next_delay(e, attempt, deadline))
+
+        text = _chunk_text(first)
+        if text:
+            yield text
+        for chunk in chunks:
+            text = _chunk_text(chunk)
+            if text:
+                yield text
+
+    async def generate_async(self, prompt: str, generation_config: Optional[Dict[str, Any]] = None,
+                             deadline: Optional[Deadline] = None) -> str:
+        """
+        Generate a response with the async client, retrying on throttling.
+
+        Args:
+            prompt: Prompt text
+            generation_config: Gemini generation settings
+            deadline: Time limit for the request, including retries
+
+        Returns:
+            Response text
+        """
+        deadline = self._deadline(deadline)
+        attempt = 0
+        while True:
+            attempt += 1
+            await asyncio.sleep(self._slot_delay(deadline))
+            try:
+                response = await self.model.generate_content_async(
+                    prompt, generation_config=generation_config,
+                    request_options=self._request_options(deadline)
+                )
+                return response.text
+            except Exception as e:
+                await asyncio.sleep(self._next_delay(e, attempt, deadline))
@@ -0,0 +1,393 @@
+"""
+Persona module for CV RAG Chatbot.
+Serves several people's chatbots from one process. Each persona has its
+own names, prompt, profile and knowledge base; its index is loaded on
+first use and unloaded least recently used first under a memory budget.
+Embeddings, model clients and the request rate limiter stay shared.
+"""
+
+import json
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+
+from configs.app_config import config, CHAT_PROMPT_TEMPLATE, PERSONA_PROMPT_TEMPLATE
+from src.core.embeddings import get_embeddings
+from src.core.knowledge_base import KnowledgeBaseIndexer, get_knowledge_base_indexer
+from src.core.pipeline_builder import get_pipeline_build_manager
+from src.core.pipeline_registry import get_pipeline_registry
+from src.utils.content_store import PROJECT_ROOT
+from src.utils.fingerprint import KnowledgeBaseWatcher, get_knowledge_base_watcher
+from src.utils.name_validation import NameMatcher, get_name_matcher
+
+# Persona ids end up in URLs and cache keys
+_PERSONA_ID = re.compile(r"^[A-Za-z0-9_-]+$")
+
+
+@dataclass
+class Persona:
+    """Definition of one persona: who it speaks for and where its documents are."""
+    persona_id: str
+    display_name: str
+    name_variations: List[str]
+    prompt_template: str
+    knowledge_base_directory: Optional[str] = None  # None: the configured knowledge base
+    tags: List[str] = field(default_factory=list)  # Profile skill tags
+    summary: str = ""  # Profile paragraph
+    refusal_message: Optional[str] = None  # Out-of-scope answer (None: the guardrail's)
+    social_links: Optional[Dict[str, str]] = None  # Defaults to config.ui.social_links
+
+    @property
+    def is_default(self) -> bool:
+        """Whether this is the persona built from the app config."""
+        return self.persona_id == config.personas.default_persona
+
+
+def default_persona() -> Persona:
+    """
+    The persona described by the app config (the original single persona).
+
+    Returns:
+        Persona using config.name_variations, CHAT_PROMPT_TEMPLATE and the
+        configured knowledge base
+    """
+    names = config.name_variations or []
+    return Persona(
+        persona_id=config.personas.default_persona,
+        display_name=names[0] if names else config.server.page_title,
+        name_variations=list(names),
+        prompt_template=CHAT_PROMPT_TEMPLATE,
+    )
+
+
+def load_persona(directory: str) -> Persona:
+    """
+    Read a persona folder.
+
+    The folder holds a persona.json (display_name, and optionally
+    short_name, name_variations, tags, summary, refusal_message,
+    social_links), an optional prompt.txt with {context} and {question}
+    placeholders, and a knowledge_base folder of documents.
+
+    Args:
+        directory: Persona folder; its name is the persona id
+
+    Returns:
+        Persona definition
+
+    Raises:
+        ValueError: If the folder name or persona.json is invalid
+    """
+    persona_id = os.path.basename(os.path.normpath(directory))
+    if not _PERSONA_ID.match(persona_id):
+        raise ValueError(f"Invalid persona id '{persona_id}'")
+    with open(os.path.join(directory, "persona.json"), "r", encoding="utf-8") as f:
+        settings: Dict[str, Any] = json.load(f)
+
+    display_name = settings.get("display_name")
+    if not display_name:
+        raise ValueError(f"Persona '{persona_id}' has no display_name")
+    short_name = settings.get("short_name") or display_name.split()[0]
+
+    prompt_path = os.path.join(directory, "prompt.txt")
+    if os.path.exists(prompt_path):
+        with open(prompt_path, "r", encoding="utf-8") as f:
+            prompt_template = f.read()
+    else:
+        # replace(), not format(): the request placeholders must survive
+        prompt_template = PERSONA_PROMPT_TEMPLATE.replace("{name}", display_name).replace("{short_name}", short_name)
+
+    return Persona(
+        persona_id=persona_id,
+        display_name=display_name,
+        name_variations=settings.get("name_variations") or [display_name, short_name],
+        prompt_template=prompt_template,
+        knowledge_base_directory=os.path.join(directory, settings.get("knowledge_base", "knowledge_base")),
+        tags=list(settings.get("tags", [])),
+        summary=settings.get("summary", ""),
+        refusal_message=settings.get("refusal_message") or (
+            f"I do not have information on that topic. "
+            f"For details, it would be best to speak with {short_name} directly."
+        ),
+        social_links=settings.get("social_links"),
+    )
+
+
+def load_persona_definitions(directory: Optional[str] = None) -> "OrderedDict[str, Persona]":
+    """
+    Collect the default persona and every persona folder.
+
+    Args:
+        directory: Folder of persona folders (defaults to config)
+
+    Returns:
+        Personas by id, the default first and the rest sorted by id
+    """
+    directory = directory or config.personas.directory
+    if not os.path.isabs(directory):
+        directory = os.path.join(PROJECT_ROOT, directory)
+
+    definitions: "OrderedDict[str, Persona]" = OrderedDict()
+    default = default_persona()
+    definitions[default.persona_id] = default
+    try:
+        names = sorted(os.listdir(directory))
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        path = os.path.join(directory, name)
+        if name in definitions or not os.path.isfile(os.path.join(path, "persona.json")):
+            continue
+        try:
+            definitions[name] = load_persona(path)
+        except (OSError, ValueError) as e:
+            print(f"Skipping persona '{name}': {e}")
+    return definitions
+
+
+class PersonaRuntime:
+    """
+    A loaded persona: its knowledge base indexer and watcher.
+
+    The default persona uses the process-wide indexer and background
+    watcher; other personas get their own indexer, and a watcher that
+    checks file stats when read instead of running a thread each.
+    """
+
+    def __init__(self, persona: Persona):
+        """
+        Set up the persona's knowledge base (nothing is indexed until a build).
+
+        Args:
+            persona: Persona definition
+        """
+        self.persona = persona
+        if persona.knowledge_base_directory is None:
+            self.indexer = get_knowledge_base_indexer()
+            self.watcher = get_knowledge_base_watcher()
+        else:
+            self.indexer = KnowledgeBaseIndexer(get_embeddings(), persona.knowledge_base_directory)
+            self.watcher = KnowledgeBaseWatcher(self.indexer.documents)
+
+    @property
+    def name_matcher(self) -> NameMatcher:
+        """Matcher for the persona's name variations."""
+        return get_name_matcher(self.persona.name_variations)
+
+    def nbytes(self) -> int:
+        """Approximate memory held by the persona's indexes."""
+        return self.indexer.nbytes()
+
+
+class PersonaRegistry:
+    """
+    Lazily loaded personas with LRU unloading.
+
+    Definitions are read up front; a persona's indexes are created on
+    first use. Once more than max_loaded personas are loaded, or their
+    indexes exceed max_bytes, the least recently used are unloaded along
+    with their cached pipelines. The default persona stays loaded.
+    """
+
+    def __init__(self, max_loaded: Optional[int] = None, max_bytes: Optional[int] = None,
+                 directory: Optional[str] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            max_loaded: Maximum loaded personas (defaults to config)
+            max_bytes: Index memory budget in bytes (defaults to config)
+            directory: Folder of persona folders (defaults to config)
+        """
+        self.max_loaded = max_loaded or config.personas.max_loaded
+        self.max_bytes = max_bytes or config.personas.max_bytes
+        self.directory = directory
+        self._lock = threading.Lock()
+        self._definitions = load_persona_definitions(directory)
+        self._loaded: "OrderedDict[str, PersonaRuntime]" = OrderedDict()
+        self._listeners: List[Callable[[str], None]] = []
+        self._stats = {"loads": 0, "unloads": 0}
+
+    def reload(self):
+        """Re-read the persona folders (loaded personas keep serving until unloaded)."""
+        definitions = load_persona_definitions(self.directory)
+        with self._lock:
+            self._definitions = definitions
+
+    def personas(self) -> List[Persona]:
+        """All persona definitions, the default first."""
+        with self._lock:
+            return list(self._definitions.values())
+
+    def resolve(self, persona_id: Optional[str] = None) -> Persona:
+        """
+        Get a persona definition.
+
+        Args:
+            persona_id: Persona id (defaults to the default persona)
+
+        Returns:
+            Persona definition
+
+        Raises:
+            KeyError: If there is no such persona
+        """
+        persona_id = persona_id or config.personas.default_persona
+        with self._lock:
+            persona = self._definitions.get(persona_id)
+        if persona is None:
+            raise KeyError(f"Unknown persona '{persona_id}'")
+        return persona
+
+    def load(self, persona_id: Optional[str] = None) -> PersonaRuntime:
+        """
+        Get a loaded persona, loading it on first use.
+
+        Args:
+            persona_id: Persona id (defaults to the default persona)
+
+        Returns:
+            PersonaRuntime, marked most recently used
+
+        Raises:
+            KeyError: If there is no such persona
+        """
+        persona = self.resolve(persona_id)
+        with self._lock:
+            runtime = self._loaded.get(persona.persona_id)
+            if runtime is not None:
+                self._loaded.move_to_end(persona.persona_id)
+                return runtime
+        created = PersonaRuntime(persona)
+        with self._lock:
+            # Another thread may have loaded it meanwhile; keep the first
+            runtime = self._loaded.setdefault(persona.persona_id, created)
+            self._loaded.move_to_end(persona.persona_id)
+            if runtime is created:
+                self._stats["loads"] += 1
+        self.trim(keep=persona.persona_id)
+        return runtime
+
+    def trim(self, keep: Optional[str] = None) -> List[str]:
+        """
+        Unload least recently used personas until within the limits.
+
+        Called after loads and after builds (when indexes have grown).
+
+        Args:
+            keep: Persona that must stay loaded (the one being served)
+
+        Returns:
+            Ids of the unloaded personas
+        """
+        with self._lock:
+            loaded = list(self._loaded.items())
+        total = sum(runtime.nbytes() for _, runtime in loaded)
+        count = len(loaded)
+
+        unloaded = []
+        for persona_id, runtime in loaded:
+            if total <= self.max_bytes and count <= self.max_loaded:
+                break
+            if persona_id == keep or runtime.persona.is_default:
+                continue
+            if self.unload(persona_id):
+                total -= runtime.nbytes()
+                count -= 1
+                unloaded.append(persona_id)
+        return unloaded
+
+    def unload(self, persona_id: str) -> bool:
+        """
+        Drop a persona's indexes and cached pipelines (it reloads on next use).
+
+        Args:
+            persona_id: Persona id
+
+        Returns:
+            True if the persona was loaded
+        """
+        with self._lock:
+            runtime = self._loaded.pop(persona_id, None)
+            if runtime is not None:
+                self._stats["unloads"] += 1
+        if runtime is None:
+            return False
+
+        manager = get_pipeline_build_manager()
+        for key in get_pipeline_registry().invalidate(persona_id=persona_id):
+            manager.forget(key)
+        print(f"Unloaded persona {persona_id}")
+        for callback in list(self._listeners):
+            try:
+                callback(persona_id)
+            except Exception as e:
+                print(f"Persona unload listener failed: {e}")
+        return True
+
+    def add_unload_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked with the id of each unloaded persona."""
+        self._listeners.append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get registry statistics.
+
+        Returns:
+            Dict with defined and loaded personas, index bytes, budget, loads and unloads
+        """
+        with self._lock:
+            loaded = list(self._loaded.values())
+            defined = len(self._definitions)
+        return {
+            "personas": defined,
+            "loaded": len(loaded),
+            "bytes": sum(runtime.nbytes() for runtime in loaded),
+            "max_bytes": self.max_bytes,
+            "max_loaded": self.max_loaded,
+            **self._stats
+        }
+
+
+def pipeline_cache_key(content_hash: str, use_uploaded: bool = False,
+                       persona_id: Optional[str] = None) -> str:
+    """
+    Cache key of a pipeline (the default persona keeps the original key format).
+
+    Args:
+        content_hash: Hash of the indexed content
+        use_uploaded: Whether the content is an upload
+        persona_id: Persona the pipeline serves (defaults to the default persona)
+
+    Returns:
+        Pipeline registry and build manager key
+    """
+    key = f"{content_hash}_{use_uploaded}"
+    if persona_id and persona_id != config.personas.default_persona:
+        return f"persona:{persona_id}:{key}"
+    return key
+
+
+_persona_registry: Optional[PersonaRegistry] = None
+_persona_registry_lock = threading.Lock()
+
+
+def get_persona_registry() -> PersonaRegistry:
+    """
+    Get the process-wide persona registry.
+
+    Returns:
+        Shared PersonaRegistry instance
+    """
+    global _persona_registry
+    with _persona_registry_lock:
+        if _persona_registry is None:
+            _persona_registry = PersonaRegistry()
+    return _persona_registry
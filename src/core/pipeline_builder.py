@@ -0,0 +1,184 @@
+"""
+Background pipeline builder for CV RAG Chatbot.
+Builds RAG pipelines in a worker pool so Streamlit sessions render
+immediately, and keeps serving the previous pipeline until the new one
+is ready.
+"""
+
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Set
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+from src.core.pipeline_registry import get_pipeline_registry
+
+
+@dataclass
+class BuildJob:
+    """State of one background pipeline build."""
+    key: str
+    slots: Set[str] = field(default_factory=set)
+    state: str = "pending"  # pending, running, ready, failed
+    submitted_at: float = field(default_factory=time.monotonic)
+    finished_at: Optional[float] = None
+    error: Optional[BaseException] = None
+
+    @property
+    def elapsed(self) -> float:
+        """Seconds since the job was submitted (or until it finished)."""
+        return (self.finished_at or time.monotonic()) - self.submitted_at
+
+    @property
+    def in_progress(self) -> bool:
+        """Whether the build is still queued or running."""
+        return self.state in ("pending", "running")
+
+
+class PipelineBuildManager:
+    """
+    Runs pipeline builds as background jobs.
+
+    Each slot (e.g. the shared knowledge base, or one session's upload)
+    serves its last ready pipeline. Requesting a new key for a slot starts a
+    build and keeps returning the previous pipeline until it completes.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize the manager.
+
+        Args:
+            max_workers: Concurrent builds (defaults to config)
+        """
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers or config.build.max_workers,
+            thread_name_prefix="rag-build"
+        )
+        self._lock = threading.Lock()
+        self._ready: Dict[str, Dict[str, Any]] = {}
+        self._jobs: Dict[str, BuildJob] = {}
+
+    def _run(self, job: BuildJob, build_fn: Callable[[], Optional[Dict[str, Any]]]):
+        """Run one build and publish the result to every slot waiting on it."""
+        with self._lock:
+            job.state = "running"
+        try:
+            result = build_fn()
+            error = None if result else RuntimeError("Pipeline build returned no result")
+        except BaseException as e:
+            result, error = None, e
+
+        with self._lock:
+            job.finished_at = time.monotonic()
+            if error is None:
+                job.state = "ready"
+                for slot in job.slots:
+                    self._ready[slot] = {"key": job.key, "data": result, "stale": False}
+                if self._jobs.get(job.key) is job:
+                    del self._jobs[job.key]
+            else:
+                job.state = "failed"
+                job.error = error
+                print(f"Pipeline build {job.key[:12]} failed: {error}")
+
+    def request(self, slot: str, key: str,
+                build_fn: Callable[[], Optional[Dict[str, Any]]]) -> Optional[Dict[str, Any]]:
+        """
+        Get the pipeline for a slot, starting a background build if needed.
+
+        Args:
+            slot: Serving slot (e.g. "knowledge_base")
+            key: Cache key of the wanted pipeline version
+            build_fn: Builds the pipeline; runs on a worker thread
+
+        Returns:
+            The wanted pipeline if ready, otherwise the slot's previous
+            pipeline (None if the slot has never been built)
+        """
+        with self._lock:
+            ready = self._ready.get(slot)
+            if ready and ready["key"] == key and not ready["stale"]:
+                return ready["data"]
+
+            job = self._jobs.get(key)
+            retry_failed = (
+                job is not None and job.state == "failed"
+                and job.elapsed >= config.build.failure_retry_after
+            )
+            if job is None or retry_failed:
+                job = BuildJob(key=key, slots={slot})
+                self._jobs[key] = job
+                self._executor.submit(self._run, job, build_fn)
+            else:
+                job.slots.add(slot)
+
+            return ready["data"] if ready else None
+
+    def forget(self, key: str):
+        """
+        Stop serving a pipeline version, e.g. after it was evicted from memory.
+
+        Slots that were serving it rebuild on their next request.
+
+        Args:
+            key: Cache key of the pipeline version
+        """
+        with self._lock:
+            for slot in [s for s, ready in self._ready.items() if ready["key"] == key]:
+                del self._ready[slot]
+
+    def status(self, key: str) -> Optional[BuildJob]:
+        """
+        Get the build job for a key.
+
+        Args:
+            key: Cache key of the pipeline version
+
+        Returns:
+            BuildJob if a build is pending, running or recently failed, else None
+        """
+        with self._lock:
+            return self._jobs.get(key)
+
+    def invalidate(self, key: Optional[str] = None):
+        """
+        Mark ready pipelines stale so the next request rebuilds them.
+
+        Stale pipelines keep serving until their rebuild completes.
+
+        Args:
+            key: Only invalidate pipelines with this key (all if None)
+        """
+        with self._lock:
+            for ready in self._ready.values():
+                if key is None or ready["key"] == key:
+                    ready["stale"] = True
+            for job_key in [k for k, job in self._jobs.items() if job.state == "failed"]:
+                if key is None or job_key == key:
+                    del self._jobs[job_key]
+
+
+_build_manager: Optional[PipelineBuildManager] = None
+_build_manager_lock = threading.Lock()
+
+
+def get_pipeline_build_manager() -> PipelineBuildManager:
+    """
+    Get the process-wide pipeline build manager.
+
+    Returns:
+        Shared PipelineBuildManager instance
+    """
+    global _build_manager
+    with _build_manager_lock:
+        if _build_manager is None:
+            _build_manager = PipelineBuildManager()
+            # Evicted pipelines must not stay alive through serving slots
+            get_pipeline_registry().add_eviction_listener(_build_manager.forget)
+    return _build_manager
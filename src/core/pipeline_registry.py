@@ -0,0 +1,278 @@
+"""
+Pipeline registry module for CV RAG Chatbot.
+Single process-wide store of built pipelines with a memory budget and LRU
+eviction, so distinct uploads cannot grow memory without bound.
+"""
+
+import os
+import sys
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+# Rough per-chunk overhead of a LangChain Document plus its docstore entry
+_DOCUMENT_OVERHEAD_BYTES = 600
+
+
+@dataclass
+class RegistryEntry:
+    """One cached pipeline and its estimated memory footprint."""
+    data: Dict[str, Any]
+    size_bytes: int
+    protected: bool = False
+    content_hash: Optional[str] = None
+    resource_type: Optional[str] = None
+    persona_id: Optional[str] = None
+    stale: bool = False  # Invalidated, but still serving (and counted) until replaced
+
+
+def estimate_pipeline_bytes(pipeline_data: Dict[str, Any]) -> int:
+    """
+    Estimate the memory held by a built pipeline.
+
+    Counts the FAISS vectors (float32) and the docstore: the arrays and
+    source text of a chunk table, or the Documents of a LangChain docstore.
+
+    Args:
+        pipeline_data: Pipeline dict as returned by build_pipeline
+
+    Returns:
+        Estimated size in bytes
+    """
+    vectorstore = pipeline_data.get("vectorstore")
+    size = 0
+
+    index = getattr(vectorstore, "index", None)
+    if index is not None:
+        size += int(getattr(index, "ntotal", 0)) * int(getattr(index, "d", 0)) * 4
+
+    docstore = getattr(vectorstore, "docstore", None)
+    if hasattr(docstore, "nbytes"):
+        size += docstore.nbytes()
+    else:
+        documents = getattr(docstore, "_dict", None) or {}
+        for document in documents.values():
+            size += len(getattr(document, "page_content", "")) + _DOCUMENT_OVERHEAD_BYTES
+
+    # Vector stores we cannot inspect are charged by their source content
+    return size or int(pipeline_data.get("content_length", 0)) * 2 or 1
+
+
+class PipelineRegistry:
+    """
+    LRU cache of built pipelines bounded by an estimated memory budget.
+
+    Least recently used entries are evicted once the budget or entry limit
+    is exceeded. The protected entry (the current knowledge base pipeline)
+    is never evicted; protecting a new entry releases the previous one.
+    """
+
+    def __init__(self, max_bytes: Optional[int] = None, max_entries: Optional[int] = None):
+        """
+        Initialize the registry.
+
+        Args:
+            max_bytes: Memory budget in bytes (defaults to config)
+            max_entries: Maximum number of pipelines (defaults to config)
+        """
+        self.max_bytes = max_bytes or config.pipeline_cache.max_bytes
+        self.max_entries = max_entries or config.pipeline_cache.max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[str, RegistryEntry]" = OrderedDict()
+        self._bytes = 0
+        self._listeners: List[Callable[[str], None]] = []
+        self._stats = {"hits": 0, "misses": 0, "evictions": 0, "evicted_bytes": 0}
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a pipeline and mark it most recently used.
+
+        Args:
+            key: Pipeline cache key
+
+        Returns:
+            Pipeline data, or None if not cached
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry.stale:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.data
+
+    def put(self, key: str, data: Dict[str, Any], protected: bool = False,
+            size_bytes: Optional[int] = None, content_hash: Optional[str] = None,
+            resource_type: Optional[str] = None, persona_id: Optional[str] = None):
+        """
+        Store a pipeline, evicting least recently used ones over the budget.
+
+        Args:
+            key: Pipeline cache key
+            data: Pipeline data
+            protected: Never evict this entry (replaces any previously protected one)
+            size_bytes: Size of the pipeline (estimated if not given)
+            content_hash: Hash of the indexed content, for scoped invalidation
+            resource_type: Kind of pipeline (e.g. "simple", "chain"), for scoped invalidation
+            persona_id: Persona the pipeline serves, for dropping it with the persona
+        """
+        size = size_bytes if size_bytes is not None else estimate_pipeline_bytes(data)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous.size_bytes
+            if protected:
+                for entry in self._entries.values():
+                    entry.protected = False
+            self._entries[key] = RegistryEntry(
+                data=data, size_bytes=size, protected=protected,
+                content_hash=content_hash, resource_type=resource_type,
+                persona_id=persona_id
+            )
+            self._bytes += size
+            evicted = self._evict_over_budget(keep=key)
+
+        for evicted_key in evicted:
+            print(f"Evicted pipeline {evicted_key[:12]} from cache")
+            for callback in list(self._listeners):
+                try:
+                    callback(evicted_key)
+                except Exception as e:
+                    print(f"Pipeline eviction listener failed: {e}")
+
+    def _evict_over_budget(self, keep: str) -> List[str]:
+        """Evict LRU unprotected entries until within budget (lock held)."""
+        evicted = []
+        for key in list(self._entries):
+            if self._bytes <= self.max_bytes and len(self._entries) <= self.max_entries:
+                break
+            entry = self._entries[key]
+            if entry.protected or key == keep:
+                continue
+            del self._entries[key]
+            self._bytes -= entry.size_bytes
+            self._stats["evictions"] += 1
+            self._stats["evicted_bytes"] += entry.size_bytes
+            evicted.append(key)
+        return evicted
+
+    def remove(self, key: str) -> bool:
+        """
+        Drop a pipeline without notifying eviction listeners.
+
+        Args:
+            key: Pipeline cache key
+
+        Returns:
+            True if the key was cached
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry.size_bytes
+            return entry is not None
+
+    def invalidate(self, content_hash: Optional[str] = None,
+                   resource_type: Optional[str] = None,
+                   persona_id: Optional[str] = None) -> List[str]:
+        """
+        Drop the pipelines built from one content version, of one type and/or of one persona.
+
+        Unlike clear(), other users' pipelines (and the shared knowledge
+        base index) stay cached.
+
+        Args:
+            content_hash: Only drop pipelines built from this content
+            resource_type: Only drop pipelines of this type
+            persona_id: Only drop pipelines serving this persona
+
+        Returns:
+            Keys of the dropped pipelines
+        """
+        with self._lock:
+            removed = [
+                key for key, entry in self._entries.items()
+                if (content_hash is None or entry.content_hash == content_hash)
+                and (resource_type is None or entry.resource_type == resource_type)
+                and (persona_id is None or entry.persona_id == persona_id)
+            ]
+            for key in removed:
+                self._bytes -= self._entries.pop(key).size_bytes
+        return removed
+
+    def mark_stale(self, key: Optional[str] = None,
+                   resource_type: Optional[str] = None) -> List[str]:
+        """
+        Make pipelines rebuild on their next request while they keep serving.
+
+        Stale entries miss on get() but stay registered, and counted against
+        the budget, until the rebuild replaces them under the same key or
+        they are evicted. This matches the build manager, which keeps
+        serving a stale pipeline until its rebuild is ready.
+
+        Args:
+            key: Only mark this pipeline
+            resource_type: Only mark pipelines of this type
+
+        Returns:
+            Keys of the marked pipelines
+        """
+        with self._lock:
+            marked = [
+                entry_key for entry_key, entry in self._entries.items()
+                if (key is None or entry_key == key)
+                and (resource_type is None or entry.resource_type == resource_type)
+            ]
+            for entry_key in marked:
+                self._entries[entry_key].stale = True
+        return marked
+
+    def clear(self):
+        """Drop all pipelines, including the protected one."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def add_eviction_listener(self, callback: Callable[[str], None]):
+        """Register a callback invoked with the key of each evicted pipeline."""
+        self._listeners.append(callback)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict with entries, bytes, budget, hits, misses and evictions
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "max_entries": self.max_entries,
+                **self._stats
+            }
+
+
+_registry: Optional[PipelineRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_pipeline_registry() -> PipelineRegistry:
+    """
+    Get the process-wide pipeline registry.
+
+    Returns:
+        Shared PipelineRegistry instance
+    """
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = PipelineRegistry()
+    return _registry
@@ -13,7 +13,6 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 
 import google.generativeai as genai
 from langchain_google_genai import GoogleGenerativeAI
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 from langchain.chains import RetrievalQA
 from langchain.prompts import PromptTemplate
@@ -21,6 +20,9 @@ import streamlit as st
 
 from configs.app_config import config, get_google_api_key, CHAT_PROMPT_TEMPLATE
 from src.core.embeddings import get_embeddings
+from src.core.guardrails import get_guardrail
+from src.core.ingestion import ingest, iter_text_segments
+from src.core.pipeline_registry import get_pipeline_registry
 from src.utils.file_processing import load_knowledge_base, load_uploaded_content
 
 
@@ -82,20 +84,13 @@ class RAGPipeline:
         Returns:
             FAISS vector store
         """
-        # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.vector_store.chunk_size,
-            chunk_overlap=config.vector_store.chunk_overlap,
-            length_function=len
-        )
-        chunks = text_splitter.split_text(content)
-        
         # Create embeddings if not already initialized
         if self.embeddings is None:
             self.embeddings = get_embeddings()
         
-        # Create vector store
-        return FAISS.from_texts(chunks, self.embeddings)
+        # Chunk, embed and index in streamed batches
+        vectorstore, _ = ingest(iter_text_segments(content), self.embeddings)
+        return vectorstore
     
     def _create_qa_chain(self) -> RetrievalQA:
         """
@@ -176,6 +171,11 @@ class RAGPipeline:
         Returns:
             Generated response
         """
+        # Refuse out-of-scope questions locally, without retrieval or an API call
+        refusal = get_guardrail().check(question)
+        if refusal:
+            return refusal
+        
         if not self.qa_chain:
             return "❌ RAG pipeline not initialized. Please rebuild the pipeline."
         
@@ -198,14 +198,9 @@ class RAGPipeline:
                 return f"❌ Error: {str(e)}"
 
 
-# Global pipeline instance for caching
-_pipeline_cache = {}
-
-
-@st.cache_resource
 def get_rag_pipeline(content_hash: str, use_uploaded: bool = False) -> Optional[Dict[str, Any]]:
     """
-    Get or create cached RAG pipeline.
+    Get or create a RAG pipeline from the shared pipeline registry.
     
     Args:
         content_hash: Hash of the content being used
@@ -214,22 +209,28 @@ def get_rag_pipeline(content_hash: str, use_uploaded: bool = False) -> Optional[
     Returns:
         RAG pipeline dictionary or None if failed
     """
-    cache_key = f"{content_hash}_{use_uploaded}"
+    registry = get_pipeline_registry()
+    cache_key = f"chain:{content_hash}_{use_uploaded}"
     
-    if cache_key not in _pipeline_cache:
-        pipeline = RAGPipeline()
-        result = pipeline.build_pipeline(use_uploaded=use_uploaded)
-        if result:
-            result["pipeline"] = pipeline
-            _pipeline_cache[cache_key] = result
-        else:
-            return None
+    cached = registry.get(cache_key)
+    if cached is not None:
+        return cached
     
-    return _pipeline_cache[cache_key]
+    pipeline = RAGPipeline()
+    result = pipeline.build_pipeline(use_uploaded=use_uploaded)
+    if not result:
+        return None
+    result["pipeline"] = pipeline
+    registry.put(cache_key, result, protected=not use_uploaded,
+                 content_hash=content_hash, resource_type="chain")
+    return result
 
 
-def clear_pipeline_cache():
-    """Clear the pipeline cache."""
-    global _pipeline_cache
-    _pipeline_cache.clear()
-    st.cache_resource.clear()
+def clear_pipeline_cache(content_hash: Optional[str] = None):
+    """
+    Invalidate cached RAG pipelines.
+    
+    Args:
+        content_hash: Only invalidate pipelines built from this content (all if None)
+    """
+    get_pipeline_registry().invalidate(content_hash=content_hash, resource_type="chain")
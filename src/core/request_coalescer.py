@@ -0,0 +1,168 @@
+"""
+Request coalescing module for CV RAG Chatbot.
+Collapses identical in-flight questions from different sessions into a
+single generation, shared by every caller while it streams.
+"""
+
+import hashlib
+import threading
+from typing import Callable, Dict, Iterable, Iterator, List, Optional
+
+from src.core.deadline import Deadline
+
+
+class _Flight:
+    """Shared state of one in-flight generation."""
+
+    def __init__(self):
+        self.chunks: List[str] = []
+        self.done = False
+        self.error: Optional[BaseException] = None
+        self.callers = 1
+        self.condition = threading.Condition()
+
+
+class RequestCoalescer:
+    """
+    Process-wide single-flight coalescer for text generations.
+
+    The first caller for a key starts the producer in a worker thread; every
+    concurrent caller with the same key, including the first, reads from the
+    same chunk buffer. Once the generation finishes the key is released, so
+    later identical questions start a fresh generation.
+    """
+
+    def __init__(self, wait_timeout: float = 120.0):
+        """
+        Initialize the coalescer.
+
+        Args:
+            wait_timeout: Longest a caller waits for the next chunk before giving
+                up (a caller's deadline shortens it)
+        """
+        self.wait_timeout = wait_timeout
+        self._lock = threading.Lock()
+        self._flights: Dict[str, _Flight] = {}
+        self.stats = {"generations": 0, "coalesced": 0}
+
+    @staticmethod
+    def make_key(content_hash: str, question: str) -> str:
+        """
+        Build a coalescing key from the content hash and normalized question.
+
+        Args:
+            content_hash: Hash of the content the pipeline was built from
+            question: User question
+
+        Returns:
+            Key string shared by identical questions against the same content
+        """
+        normalized = " ".join(question.lower().split()).rstrip("?!. ")
+        return hashlib.sha1(f"{content_hash}\x00{normalized}".encode()).hexdigest()
+
+    def _produce(self, key: str, flight: _Flight, producer: Callable[[], Iterable[str]]):
+        """Run the producer and publish its chunks to all waiting callers."""
+        try:
+            for chunk in producer():
+                with flight.condition:
+                    flight.chunks.append(chunk)
+                    flight.condition.notify_all()
+        except BaseException as e:
+            flight.error = e
+        finally:
+            with self._lock:
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+            with flight.condition:
+                flight.done = True
+                flight.condition.notify_all()
+
+    def stream(self, key: str, producer: Callable[[], Iterable[str]],
+               deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Stream the chunks of a generation, sharing it with identical callers.
+
+        Args:
+            key: Coalescing key (see make_key)
+            producer: Callable returning an iterable of text chunks; only called
+                if no identical generation is already in flight
+            deadline: This caller's request deadline; waiting stops when it
+                expires, even if the shared generation goes on for others
+
+        Yields:
+            Text chunks in order, from the start of the generation
+
+        Raises:
+            TimeoutError: If no chunk arrives within wait_timeout or before the deadline
+            Exception: Whatever the producer raised
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            if flight is None:
+                flight = _Flight()
+                self._flights[key] = flight
+                self.stats["generations"] += 1
+                threading.Thread(
+                    target=self._produce,
+                    args=(key, flight, producer),
+                    name="rag-coalesced-generation",
+                    daemon=True
+                ).start()
+            else:
+                flight.callers += 1
+                self.stats["coalesced"] += 1
+
+        index = 0
+        while True:
+            with flight.condition:
+                while index >= len(flight.chunks) and not flight.done:
+                    timeout = self.wait_timeout if deadline is None else min(self.wait_timeout, deadline.remaining())
+                    if timeout <= 0 or not flight.condition.wait(timeout=timeout):
+                        raise TimeoutError("Timed out waiting for a shared response")
+                pending = flight.chunks[index:]
+                finished = flight.done
+            for chunk in pending:
+                yield chunk
+            index += len(pending)
+            if finished and index >= len(flight.chunks):
+                break
+
+        if flight.error is not None:
+            raise flight.error
+
+    def run(self, key: str, fn: Callable[[], str], deadline: Optional[Deadline] = None) -> str:
+        """
+        Run a non-streaming generation, sharing it with identical callers.
+
+        Args:
+            key: Coalescing key (see make_key)
+            fn: Callable returning the full response text
+            deadline: This caller's request deadline (see stream)
+
+        Returns:
+            The response text
+        """
+        return "".join(self.stream(key, lambda: [fn()], deadline))
+
+    def in_flight(self) -> int:
+        """Number of generations currently in flight."""
+        with self._lock:
+            return len(self._flights)
+
+
+_coalescer: Optional[RequestCoalescer] = None
+_coalescer_lock = threading.Lock()
+
+
+def get_request_coalescer() -> RequestCoalescer:
+    """
+    Get the process-wide request coalescer.
+
+    Returns:
+        Shared RequestCoalescer instance
+    """
+    global _coalescer
+    with _coalescer_lock:
+        if _coalescer is None:
+            _coalescer = RequestCoalescer()
+    return _coalescer
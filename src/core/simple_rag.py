@@ -3,97 +3,133 @@ Simplified RAG Pipeline that works directly with Google Generative AI
 without LangChain compatibility issues.
 """
 
+import asyncio
 import os
+import re
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Iterable, Iterator, List, Tuple
 
 # Add the parent directory to sys.path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import google.generativeai as genai
-from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.vectorstores import FAISS
 import streamlit as st
 
-from configs.app_config import config, get_google_api_key, CHAT_PROMPT_TEMPLATE
+from configs.app_config import config, get_google_api_key
 from src.core.embeddings import get_embeddings
-from src.utils.file_processing import load_knowledge_base, load_uploaded_content
+from src.core.cv_sections import section_for_question
+from src.core.guardrails import get_guardrail
+from src.core.ingestion import ingest, iter_text_segments
+from src.core.deadline import Deadline
+from src.core.llm_client import GeminiClient, QuotaExhaustedError, RateLimitError
+from src.core.pipeline_builder import get_pipeline_build_manager
+from src.core.personas import Persona, get_persona_registry, pipeline_cache_key
+from src.core.pipeline_registry import get_pipeline_registry
+from src.utils.content_store import get_content_store
+from src.utils.file_processing import load_uploaded_content
+from src.utils.fingerprint import KnowledgeBaseFingerprint, KnowledgeBaseWatcher, get_knowledge_base_watcher
+
+
+def _on_script_thread() -> bool:
+    """Whether this thread runs a Streamlit script, so st.* output reaches a page."""
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return False
+    try:
+        return get_script_run_ctx(suppress_warning=True) is not None
+    except TypeError:
+        # Streamlit releases without the suppress_warning argument
+        return get_script_run_ctx() is not None
 
 
 class SimpleRAGPipeline:
     """
     Simplified RAG pipeline using direct Google AI integration.
+    
+    Each pipeline answers as one persona, with that persona's prompt and
+    knowledge base; model clients and embeddings are shared by all.
     """
     
-    def __init__(self):
-        """Initialize the RAG pipeline."""
+    def __init__(self, persona_id: Optional[str] = None):
+        """
+        Initialize the RAG pipeline.
+        
+        Args:
+            persona_id: Persona to answer as (defaults to the default persona)
+        """
+        self.persona_id = persona_id
+        self.persona: Optional[Persona] = None
         self.model = None
         self.vectorstore = None
         self.embeddings = None
         self.content_hash = None
         self.built_at = None
+        self.ingestion_stats = None
     
-    def _initialize_model(self):
-        """Initialize the Google Gemini model directly."""
-        api_key = get_google_api_key()
-        genai.configure(api_key=api_key)
-        
-        # Try models in order of preference
-        models_to_try = [config.model.model_name] + config.model.fallback_models
-        
-        for model_name in models_to_try:
-            try:
-                model = genai.GenerativeModel(model_name)
-                # Test with a minimal request
-                response = model.generate_content(
-                    "Hi", 
-                    generation_config={'max_output_tokens': 5}
-                )
-                print(f"Successfully initialized model: {model_name}")
-                return model
-            except Exception as e:
-                print(f"Failed to initialize {model_name}: {str(e)}")
-                continue
-        
-        raise Exception("All models failed to initialize")
+    def _initialize_model(self) -> GeminiClient:
+        """Get the shared Gemini client, initializing it on first use."""
+        return get_model_client()
     
-    def _create_vector_store(self, content: str) -> FAISS:
-        """Create FAISS vector store from content."""
-        # Split text into chunks
-        text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=config.vector_store.chunk_size,
-            chunk_overlap=config.vector_store.chunk_overlap,
-            length_function=len
-        )
-        chunks = text_splitter.split_text(content)
-        
+    def _create_vector_store(self, segments: Iterable[str]) -> FAISS:
+        """Stream text through chunking and embedding into a FAISS vector store."""
         # Create embeddings if not already initialized
         if self.embeddings is None:
             self.embeddings = get_embeddings()
         
-        # Create vector store
-        return FAISS.from_texts(chunks, self.embeddings)
+        self.vectorstore, self.ingestion_stats = ingest(segments, self.embeddings)
+        return self.vectorstore
+    
+    def _load_knowledge_base_index(self) -> FAISS:
+        """Merge the per-document knowledge base indexes, embedding only changed documents."""
+        if self.embeddings is None:
+            self.embeddings = get_embeddings()
+        
+        indexer = get_persona_registry().load(self.persona_id).indexer
+        if indexer.embeddings is None:
+            indexer.embeddings = self.embeddings
+        self.vectorstore, self.ingestion_stats = indexer.build()
+        return self.vectorstore
     
-    def build_pipeline(self, use_uploaded: bool = False) -> Dict[str, Any]:
-        """Build the complete RAG pipeline."""
+    def build_pipeline(self, use_uploaded: bool = False, content: Optional[str] = None,
+                       content_hash: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Build the complete RAG pipeline.
+        
+        Args:
+            use_uploaded: Prefer uploaded content over the knowledge base
+            content: Content to index; when given, nothing is loaded from disk
+            content_hash: Hash of uploaded content in the shared content store
+                (how builds on worker threads without session state find it)
+        """
         try:
-            # Load content
-            base_content = load_knowledge_base()
-            content_to_use = base_content
+            self.persona = get_persona_registry().resolve(self.persona_id)
             
-            if use_uploaded:
-                uploaded_content = load_uploaded_content()
-                if uploaded_content:
-                    content_to_use = uploaded_content
+            # Choose the content source; stored text and files are streamed, not copied whole
+            segments = None
+            if content is not None:
+                segments = iter_text_segments(content)
+            elif use_uploaded and content_hash is not None:
+                segments = get_content_store().segments(content_hash)
+            if segments is None and use_uploaded:
+                content = load_uploaded_content()
+                if content is not None:
+                    segments = iter_text_segments(content)
             
-            # Generate content hash for caching
-            from src.utils.file_processing import get_content_hash
-            self.content_hash = get_content_hash(content_to_use)
+            # Initialize components; queries resolve the shared client themselves
+            self.model = self._initialize_model().model
+            if segments is not None:
+                self._create_vector_store(segments)
+            else:
+                # Knowledge base documents are indexed one by one and merged
+                self._load_knowledge_base_index()
             
-            # Initialize components
-            self.model = self._initialize_model()
-            self.vectorstore = self._create_vector_store(content_to_use)
+            # Content hash for caching, computed while indexing
+            self.content_hash = self.ingestion_stats.content_hash
             
             # Record build time
             self.built_at = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -103,74 +139,556 @@ class SimpleRAGPipeline:
                 "vectorstore": self.vectorstore,
                 "content_hash": self.content_hash,
                 "built_at": self.built_at,
-                "content_length": len(content_to_use),
-                "use_uploaded": use_uploaded
+                "content_length": self.ingestion_stats.characters,
+                "use_uploaded": use_uploaded,
+                "persona_id": self.persona.persona_id
             }
             
+        except QuotaExhaustedError:
+            # Let callers switch to quota-safe mode
+            raise
         except Exception as e:
+            if not _on_script_thread():
+                # st.error would go nowhere on a build worker; the build job records it
+                raise
             st.error(f"❌ Error building RAG pipeline: {str(e)}")
             return None
     
-    def query(self, question: str) -> str:
-        """Query the RAG pipeline."""
+    def _retrieve(self, question: str, k: int, section: Optional[str] = None) -> List[Any]:
+        """
+        Retrieve the k most relevant chunks for a question.
+        
+        Chunks from the question's CV section come first; the remaining
+        slots are filled from the whole index, so a question whose answer
+        sits in another section still finds it.
+        
+        Args:
+            question: User question
+            k: Number of chunks
+            section: Section to search first (defaults to section_for_question)
+            
+        Returns:
+            Retrieved documents, section matches first
+        """
+        section = section or section_for_question(question)
+        if section is None:
+            return self.vectorstore.similarity_search(question, k=k)
+        
+        # Representatives of merged near-duplicates list every section they cover
+        docs = self.vectorstore.similarity_search(
+            question, k=k, filter=lambda m: section in m.get("sections", [m.get("section")])
+        )
+        if len(docs) < k:
+            seen = {doc.metadata.get("hash", doc.page_content) for doc in docs}
+            for doc in self.vectorstore.similarity_search(question, k=k + len(docs)):
+                if len(docs) >= k:
+                    break
+                if doc.metadata.get("hash", doc.page_content) not in seen:
+                    docs.append(doc)
+        return docs
+    
+    def _get_fast_client(self) -> GeminiClient:
+        """Client for the fast fallback model used when time runs short."""
+        client = get_model_client()
+        if client.model_name.endswith(config.latency.fast_model):
+            return client
+        return get_fast_client()
+    
+    def _check_scope(self, question: str) -> Optional[str]:
+        """Refusal for an out-of-scope question, in the persona's words, or None."""
+        if self.persona is None:
+            return get_guardrail().check(question)
+        return get_guardrail(self.persona.name_variations, self.persona.refusal_message).check(question)
+    
+    def _prepare(self, question: str, deadline: Deadline) -> Tuple[str, List[Any], Optional[GeminiClient]]:
+        """
+        Run retrieval and context building within their budgets and choose a model.
+        
+        Each stage degrades when time runs short: fewer chunks, a compressed
+        context, the fast fallback model, or no model call at all.
+        
+        Args:
+            question: User question
+            deadline: Deadline for the whole request
+            
+        Returns:
+            Tuple of (prompt, retrieved documents, client to generate with,
+            or None when only an extractive answer fits in the time left)
+        """
+        budgets = config.latency
+        
+        with deadline.stage("retrieval", budgets.retrieval):
+            k = config.vector_store.search_k
+            if deadline.remaining() < budgets.retrieval + budgets.context + budgets.generation:
+                k = min(k, budgets.reduced_k)
+            docs = self._retrieve(question, k)
+        
+        with deadline.stage("context", budgets.context):
+            if deadline.remaining() < budgets.context + budgets.generation:
+                context = _compress_context(docs, budgets.compressed_context_chars)
+            else:
+                context = "\n\n".join(_format_document(doc) for doc in docs)
+            prompt = self.persona.prompt_template.format(context=context, question=question)
+        
+        remaining = deadline.remaining()
+        if remaining < budgets.min_generation_time:
+            return prompt, docs, None
+        if remaining < budgets.fast_model_threshold:
+            return prompt, docs, self._get_fast_client()
+        # Resolved per query, so a reset_model_client() reaches cached pipelines too
+        return prompt, docs, get_model_client()
+    
+    @staticmethod
+    def _generation_config() -> Dict[str, Any]:
+        """Generation settings shared by the sync and async query paths."""
+        return {
+            'temperature': config.model.temperature,
+            'max_output_tokens': 1000
+        }
+    
+    @staticmethod
+    def _error_response(e: Exception) -> str:
+        """
+        Map a generation error to the message shown to the user.
+        
+        Daily quota exhaustion is re-raised so the app can switch to quota-safe mode.
+        """
+        if isinstance(e, QuotaExhaustedError):
+            # Probe the models again on the next build; a fallback may still have quota
+            reset_model_client()
+            raise e
+        if isinstance(e, RateLimitError):
+            return "⏳ The AI service is busy right now. Please try again in a few seconds."
+        return f"❌ Error: {str(e)}"
+    
+    def query(self, question: str, deadline: Optional[Deadline] = None) -> str:
+        """
+        Query the RAG pipeline.
+        
+        Throttled requests are retried by the client; QuotaExhaustedError is
+        raised when the daily quota is exhausted.
+        
+        Args:
+            question: User question
+            deadline: Time limit for the request (defaults to config.latency.total)
+            
+        Returns:
+            Generated response
+        """
+        # Refuse out-of-scope questions locally, without retrieval or an API call
+        refusal = self._check_scope(question)
+        if refusal:
+            return refusal
+        
         if not self.model or not self.vectorstore:
             return "❌ RAG pipeline not initialized. Please rebuild the pipeline."
         
+        deadline = deadline or Deadline(config.latency.total)
         try:
-            # Retrieve relevant documents
-            retriever = self.vectorstore.as_retriever(
-                search_kwargs={"k": config.vector_store.search_k}
-            )
-            docs = retriever.get_relevant_documents(question)
+            prompt, docs, client = self._prepare(question, deadline)
+            if client is None:
+                return _extractive_answer(question, docs)
+            with deadline.stage("generation", config.latency.generation) as stage:
+                return client.generate(prompt, generation_config=self._generation_config(), deadline=stage)
             
-            # Prepare context
-            context = "\n\n".join([doc.page_content for doc in docs])
+        except Exception as e:
+            return self._error_response(e)
+    
+    def query_stream(self, question: str, deadline: Optional[Deadline] = None) -> Iterator[str]:
+        """
+        Query the RAG pipeline, yielding the response as it is generated.
+        
+        Args:
+            question: User question
+            deadline: Time limit for the request (defaults to config.latency.total)
             
-            # Create prompt
-            prompt = CHAT_PROMPT_TEMPLATE.format(context=context, question=question)
+        Yields:
+            Response text chunks; errors before the first chunk are yielded
+            as the response
             
-            # Generate response
-            response = self.model.generate_content(
-                prompt,
-                generation_config={
-                    'temperature': config.model.temperature,
-                    'max_output_tokens': 1000
-                }
-            )
+        Raises:
+            Exception: An error after part of the response was yielded
+        """
+        refusal = self._check_scope(question)
+        if refusal:
+            yield refusal
+            return
+        
+        if not self.model or not self.vectorstore:
+            yield "❌ RAG pipeline not initialized. Please rebuild the pipeline."
+            return
+        
+        deadline = deadline or Deadline(config.latency.total)
+        started = False
+        try:
+            prompt, docs, client = self._prepare(question, deadline)
+            if client is None:
+                yield _extractive_answer(question, docs)
+                return
+            with deadline.stage("generation", config.latency.generation) as stage:
+                for chunk in client.generate_stream(prompt, generation_config=self._generation_config(), deadline=stage):
+                    started = True
+                    yield chunk
             
-            return response.text
+        except Exception as e:
+            if started:
+                # Never append error text to a partial answer; callers report it
+                raise
+            yield self._error_response(e)
+    
+    async def aquery(self, question: str, deadline: Optional[Deadline] = None) -> str:
+        """
+        Query the RAG pipeline without blocking the event loop.
+        
+        Retrieval runs in a worker thread; generation uses Gemini's async client.
+        
+        Args:
+            question: User question
+            deadline: Time limit for the request (defaults to config.latency.total)
+            
+        Returns:
+            Generated response
+        """
+        refusal = self._check_scope(question)
+        if refusal:
+            return refusal
+        
+        if not self.model or not self.vectorstore:
+            return "❌ RAG pipeline not initialized. Please rebuild the pipeline."
+        
+        deadline = deadline or Deadline(config.latency.total)
+        try:
+            loop = asyncio.get_running_loop()
+            prompt, docs, client = await loop.run_in_executor(
+                _get_retrieval_executor(), self._prepare, question, deadline
+            )
+            if client is None:
+                return _extractive_answer(question, docs)
+            with deadline.stage("generation", config.latency.generation) as stage:
+                return await client.generate_async(
+                    prompt, generation_config=self._generation_config(), deadline=stage
+                )
             
         except Exception as e:
-            error_msg = str(e).lower()
-            if "quota" in error_msg or "limit" in error_msg or "429" in error_msg:
-                return "⚠️ API quota exceeded. The free tier has daily limits. Please try again later or upgrade your API plan."
-            else:
-                return f"❌ Error: {str(e)}"
+            return self._error_response(e)
+    
+    async def abatch(self, questions: List[str], max_concurrency: Optional[int] = None) -> List[str]:
+        """
+        Answer many questions concurrently under a concurrency limit.
+        
+        Args:
+            questions: User questions
+            max_concurrency: Maximum in-flight questions (defaults to config)
+            
+        Returns:
+            Responses in the same order as the questions
+        """
+        semaphore = asyncio.Semaphore(max_concurrency or config.serving.max_concurrency)
+        
+        async def _bounded_query(question: str) -> str:
+            async with semaphore:
+                return await self.aquery(question)
+        
+        return list(await asyncio.gather(*(_bounded_query(q) for q in questions)))
+
+
+def _format_document(doc: Any) -> str:
+    """Chunk text for the prompt, labelled with its knowledge base document if known."""
+    source = doc.metadata.get("source")
+    return f"[Source: {source}]\n{doc.page_content}" if source else doc.page_content
 
 
-# Global pipeline instance for caching
-_simple_pipeline_cache = {}
+def _split_sentences(text: str) -> List[str]:
+    """Split text into sentences and list items."""
+    return [s.strip() for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
 
 
-@st.cache_resource
-def get_simple_rag_pipeline(content_hash: str, use_uploaded: bool = False) -> Optional[Dict[str, Any]]:
-    """Get or create cached simple RAG pipeline."""
-    cache_key = f"{content_hash}_{use_uploaded}"
+def _compress_context(docs: List[Any], max_chars: int) -> str:
+    """
+    Shrink retrieved chunks to fit a character budget, keeping leading sentences.
     
-    if cache_key not in _simple_pipeline_cache:
-        pipeline = SimpleRAGPipeline()
-        result = pipeline.build_pipeline(use_uploaded=use_uploaded)
-        if result:
-            result["pipeline"] = pipeline
-            _simple_pipeline_cache[cache_key] = result
-        else:
-            return None
+    Args:
+        docs: Retrieved documents, most relevant first
+        max_chars: Total character budget for the context
+        
+    Returns:
+        Compressed context block
+    """
+    if not docs:
+        return ""
+    share = max(1, max_chars // len(docs))
+    parts = []
+    for doc in docs:
+        kept, used = [], 0
+        for sentence in _split_sentences(doc.page_content):
+            if used + len(sentence) > share and kept:
+                break
+            kept.append(sentence[:share])
+            used += len(sentence) + 1
+        parts.append(" ".join(kept))
+    return "\n\n".join(parts)
+
+
+def _extractive_answer(question: str, docs: List[Any], max_sentences: int = 3) -> str:
+    """
+    Answer without the LLM by quoting the retrieved sentences closest to the question.
+    
+    Args:
+        question: User question
+        docs: Retrieved documents
+        max_sentences: Number of sentences to quote
+        
+    Returns:
+        Extractive answer text
+    """
+    terms = {w for w in re.findall(r'\w+', question.lower()) if len(w) > 3}
+    candidates = []
+    for doc in docs:
+        for sentence in _split_sentences(doc.page_content):
+            overlap = len(terms & set(re.findall(r'\w+', sentence.lower())))
+            if overlap:
+                candidates.append((overlap, len(candidates), sentence))
+    
+    if not candidates:
+        return "I do not have that information in the current context."
+    
+    best = sorted(candidates, key=lambda c: (-c[0], c[1]))[:max_sentences]
+    bullets = "\n".join(f"- {sentence}" for _, _, sentence in sorted(best, key=lambda c: c[1]))
+    return f"Here is the most relevant information from the knowledge base:\n\n{bullets}"
+
+
+# Shared worker pool for retrieval on the async path
+_retrieval_executor: Optional[ThreadPoolExecutor] = None
+_retrieval_executor_lock = threading.Lock()
+
+
+def _get_retrieval_executor() -> ThreadPoolExecutor:
+    """Get the retrieval thread pool, creating it on first use."""
+    global _retrieval_executor
+    with _retrieval_executor_lock:
+        if _retrieval_executor is None:
+            _retrieval_executor = ThreadPoolExecutor(
+                max_workers=config.serving.retrieval_workers,
+                thread_name_prefix="rag-retrieval"
+            )
+    return _retrieval_executor
+
+
+_model_client: Optional[GeminiClient] = None
+_fast_client: Optional[GeminiClient] = None
+_model_client_lock = threading.Lock()
+_model_probe_lock = threading.Lock()  # One probe at a time; readers never wait on it
+_fast_client_lock = threading.Lock()
+
+
+def get_model_client() -> GeminiClient:
+    """
+    Get the Gemini client shared by all pipelines and personas.
+    
+    The first call tries the configured models in order of preference
+    with a minimal test request; later calls reuse the working client.
+    The probe runs outside the lock that guards the shared client, so
+    queries holding a working client never wait on it.
+    
+    Returns:
+        Shared GeminiClient
+        
+    Raises:
+        QuotaExhaustedError: If every model's daily quota is exhausted
+    """
+    global _model_client
+    with _model_client_lock:
+        if _model_client is not None:
+            return _model_client
+    
+    with _model_probe_lock:
+        # Another thread may have finished a probe while this one waited
+        with _model_client_lock:
+            if _model_client is not None:
+                return _model_client
+        
+        api_key = get_google_api_key()
+        genai.configure(api_key=api_key)
+        
+        # Try models in order of preference
+        models_to_try = [config.model.model_name] + config.model.fallback_models
+        quota_failures = 0
+        
+        for model_name in models_to_try:
+            try:
+                client = GeminiClient(genai.GenerativeModel(model_name))
+                # Test with a minimal request
+                client.generate("Hi", generation_config={'max_output_tokens': 5})
+                print(f"Successfully initialized model: {model_name}")
+                with _model_client_lock:
+                    _model_client = client
+                return client
+            except QuotaExhaustedError as e:
+                quota_failures += 1
+                print(f"Daily quota exhausted for {model_name}: {str(e)}")
+                continue
+            except Exception as e:
+                print(f"Failed to initialize {model_name}: {str(e)}")
+                continue
+        
+        if quota_failures == len(models_to_try):
+            raise QuotaExhaustedError("Daily quota exhausted for all models")
+        raise Exception("All models failed to initialize")
+
+
+def get_fast_client() -> GeminiClient:
+    """
+    Get the shared client of the fast fallback model used when time runs short.
     
-    return _simple_pipeline_cache[cache_key]
+    Returns:
+        Shared GeminiClient for config.latency.fast_model
+    """
+    global _fast_client
+    with _fast_client_lock:
+        if _fast_client is None:
+            _fast_client = GeminiClient(genai.GenerativeModel(config.latency.fast_model))
+        return _fast_client
+
 
+def reset_model_client():
+    """Forget the shared client so the next build probes the models again."""
+    global _model_client
+    with _model_client_lock:
+        _model_client = None
 
-def clear_simple_pipeline_cache():
-    """Clear the simple pipeline cache."""
-    global _simple_pipeline_cache
-    _simple_pipeline_cache.clear()
-    st.cache_resource.clear()
+
+def get_simple_rag_pipeline(content_hash: str, use_uploaded: bool = False,
+                            _content: Optional[str] = None,
+                            persona_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+    """
+    Get or create a simple RAG pipeline from the shared pipeline registry.
+    
+    The default persona's knowledge base pipeline is protected from
+    eviction; other pipelines are evicted least recently used first once
+    the memory budget is exceeded.
+    
+    Args:
+        content_hash: Hash of the content (cache key)
+        use_uploaded: Whether the content is an upload
+        _content: Content to index, if already loaded (not part of the cache key)
+        persona_id: Persona to answer as (defaults to the default persona)
+    """
+    registry = get_pipeline_registry()
+    cache_key = pipeline_cache_key(content_hash, use_uploaded, persona_id)
+    
+    cached = registry.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    pipeline = SimpleRAGPipeline(persona_id)
+    result = pipeline.build_pipeline(use_uploaded=use_uploaded, content=_content, content_hash=content_hash)
+    if not result:
+        return None
+    result["pipeline"] = pipeline
+    registry.put(cache_key, result, protected=not use_uploaded and pipeline.persona.is_default,
+                 content_hash=content_hash, resource_type="simple",
+                 persona_id=pipeline.persona.persona_id)
+    # The persona's indexes have grown; unload others if over budget
+    get_persona_registry().trim(keep=pipeline.persona.persona_id)
+    return result
+
+
+_watch_lock = threading.Lock()
+_watch_registered = False
+
+
+def request_simple_rag_pipeline(slot: str, content_hash: str, use_uploaded: bool = False,
+                                content: Optional[str] = None,
+                                persona_id: Optional[str] = None) -> Tuple[Optional[Dict[str, Any]], Any]:
+    """
+    Get a pipeline without blocking, building it in the background if needed.
+    
+    Args:
+        slot: Serving slot ("knowledge_base", or one per session for uploads)
+        content_hash: Hash of the content to serve
+        use_uploaded: Whether the content is an upload
+        content: Content to index, if already loaded
+        persona_id: Persona to answer as (defaults to the default persona)
+        
+    Returns:
+        Tuple of (pipeline data, build job). The data is for this hash if
+        ready, otherwise the slot's previous pipeline (None before its first
+        build completes); the job is None unless a build is pending or failed.
+    """
+    manager = get_pipeline_build_manager()
+    cache_key = pipeline_cache_key(content_hash, use_uploaded, persona_id)
+    pipeline_data = manager.request(
+        slot, cache_key,
+        lambda: get_simple_rag_pipeline(content_hash, use_uploaded, _content=content, persona_id=persona_id)
+    )
+    return pipeline_data, manager.status(cache_key)
+
+
+def _rebuild_on_change(fingerprint: Optional[KnowledgeBaseFingerprint]):
+    """Build the knowledge base pipeline for a new knowledge base version ahead of the next request."""
+    if fingerprint is not None:
+        print(f"Knowledge base changed ({fingerprint.content_hash[:12]}), rebuilding pipeline")
+        request_simple_rag_pipeline("knowledge_base", fingerprint.content_hash)
+
+
+def watch_knowledge_base() -> KnowledgeBaseWatcher:
+    """
+    Get the knowledge base watcher, rebuilding the base pipeline whenever the file changes.
+    
+    Returns:
+        Shared KnowledgeBaseWatcher instance
+    """
+    global _watch_registered
+    watcher = get_knowledge_base_watcher()
+    with _watch_lock:
+        if not _watch_registered:
+            watcher.add_listener(_rebuild_on_change)
+            _watch_registered = True
+    return watcher
+
+
+def watch_persona_knowledge_base(persona_id: Optional[str] = None) -> KnowledgeBaseWatcher:
+    """
+    Get the knowledge base watcher of a persona, loading the persona if needed.
+    
+    Args:
+        persona_id: Persona id (defaults to the default persona)
+        
+    Returns:
+        The persona's KnowledgeBaseWatcher (the background one for the default persona)
+    """
+    persona = get_persona_registry().resolve(persona_id)
+    if persona.is_default:
+        return watch_knowledge_base()
+    return get_persona_registry().load(persona.persona_id).watcher
+
+
+def clear_simple_pipeline_cache(content_hash: Optional[str] = None, use_uploaded: Optional[bool] = None,
+                                persona_id: Optional[str] = None):
+    """
+    Invalidate simple pipelines so they rebuild on the next request.
+    
+    Scoped to one content version when a hash is given, so other users'
+    pipelines, the shared knowledge base index and cached embeddings stay
+    hot. The invalidated pipeline keeps serving, and stays counted against
+    the registry's memory budget, until its rebuild replaces it.
+    
+    Args:
+        content_hash: Only invalidate pipelines built from this content (all if None)
+        use_uploaded: Only invalidate the uploaded (True) or knowledge base (False) variant
+        persona_id: Only invalidate pipelines of this persona (all personas if None)
+    """
+    registry = get_pipeline_registry()
+    manager = get_pipeline_build_manager()
+    if content_hash is None:
+        registry.mark_stale(resource_type="simple")
+        manager.invalidate()
+        return
+    
+    variants = [use_uploaded] if use_uploaded is not None else [False, True]
+    persona_ids = [persona_id] if persona_id else [p.persona_id for p in get_persona_registry().personas()]
+    for persona in persona_ids:
+        for uploaded in variants:
+            cache_key = pipeline_cache_key(content_hash, uploaded, persona)
+            registry.mark_stale(cache_key)
+            manager.invalidate(cache_key)
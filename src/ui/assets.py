@@ -0,0 +1,222 @@
+"""
+Static assets module for CV RAG Chatbot.
+Publishes right-sized profile photo variants to Streamlit's static folder
+once per source image, so pages reference them by URL instead of inlining
+the original on every rerun.
+"""
+
+import base64
+import hashlib
+import io
+import mimetypes
+import os
+import sys
+from functools import lru_cache
+from typing import Dict, Optional, Tuple
+
+try:
+    from PIL import Image, ImageOps
+    PIL_AVAILABLE = True
+except ImportError:
+    PIL_AVAILABLE = False
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Streamlit serves <app dir>/static/ under this URL prefix when
+# server.enableStaticServing is on (see .streamlit/config.toml)
+STATIC_URL_PREFIX = "app/static"
+
+
+def get_static_dir() -> str:
+    """Absolute path of the Streamlit static folder."""
+    static_dir = config.ui.static_dir
+    return static_dir if os.path.isabs(static_dir) else os.path.join(PROJECT_ROOT, static_dir)
+
+
+def find_profile_photo() -> Optional[str]:
+    """
+    Find the first existing profile photo from the configured paths.
+
+    Returns:
+        Absolute path of the photo, or None if none exists
+    """
+    for profile_path in config.ui.profile_photo_paths or []:
+        absolute_path = profile_path if os.path.isabs(profile_path) else os.path.join(PROJECT_ROOT, profile_path)
+        if os.path.isfile(absolute_path):
+            return absolute_path
+    return None
+
+
+def asset_version(path: str) -> Tuple[int, int]:
+    """Stat data identifying one version of an asset file."""
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+
+def _data_uri(data: bytes, mime_type: str) -> str:
+    """Inline fallback when static serving is unavailable."""
+    return f"data:{mime_type};base64,{base64.b64encode(data).decode()}"
+
+
+def _write_static_file(file_name: str, data: bytes) -> Optional[str]:
+    """Write a file into the static folder unless it exists; return its URL."""
+    target = os.path.join(get_static_dir(), file_name)
+    try:
+        if not os.path.exists(target):
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            temp_path = f"{target}.tmp{os.getpid()}"
+            with open(temp_path, "wb") as f:
+                f.write(data)
+            os.replace(temp_path, target)
+    except OSError as e:
+        print(f"Could not publish static asset {file_name}: {e}")
+        return None
+    return f"{STATIC_URL_PREFIX}/{file_name}"
+
+
+def publish_static_file(data: bytes, name: str, extension: str) -> Optional[str]:
+    """
+    Write bytes into the static folder under a content-hashed file name.
+
+    The name changes whenever the content does, so browsers can cache the
+    file without serving a stale version.
+
+    Args:
+        data: File content
+        name: Base name (e.g. "profile")
+        extension: File extension including the dot
+
+    Returns:
+        URL of the published file, or None if it could not be written
+    """
+    digest = hashlib.sha1(data).hexdigest()[:12]
+    return _write_static_file(f"{name}-{digest}{extension}", data)
+
+
+def resize_avatar(data: bytes, size: int, quality: int) -> bytes:
+    """
+    Crop an image to a square and resize it for a circular avatar.
+
+    The crop keeps the top of the image, matching the "center top" CSS
+    background position used for the avatar.
+
+    Args:
+        data: Source image bytes
+        size: Output width and height in pixels
+        quality: JPEG quality (1-95)
+
+    Returns:
+        Progressive JPEG bytes
+    """
+    with Image.open(io.BytesIO(data)) as source:
+        image = ImageOps.exif_transpose(source).convert("RGB")
+    side = min(image.size)
+    left = (image.width - side) // 2
+    image = image.crop((left, 0, left + side, side))
+    if side > size:
+        image = image.resize((size, size), Image.LANCZOS)
+
+    output = io.BytesIO()
+    image.save(output, format="JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue()
+
+
+@lru_cache(maxsize=8)
+def build_profile_photo_variants(path: str, version: Tuple[int, int]) -> Dict[str, str]:
+    """
+    Generate and publish the 1x/2x profile photo variants for one file version.
+
+    Variants are named by the source image hash and size, so each one is
+    generated once per image, even across restarts. Without Pillow, or if
+    resizing fails, the original image is served for both densities.
+
+    Args:
+        path: Source image path
+        version: Stat version of the source (see asset_version); only part
+            of the cache key
+
+    Returns:
+        Mapping of pixel density ("1x", "2x") to static URL or data URI
+    """
+    with open(path, "rb") as f:
+        data = f.read()
+    source_hash = hashlib.sha1(data).hexdigest()[:12]
+    serve_static = config.ui.serve_static
+
+    urls: Dict[str, str] = {}
+    if PIL_AVAILABLE:
+        try:
+            for density in (1, 2):
+                size = config.ui.profile_photo_size * density
+                file_name = f"profile-{source_hash}-{size}.jpg"
+                if serve_static and os.path.exists(os.path.join(get_static_dir(), file_name)):
+                    urls[f"{density}x"] = f"{STATIC_URL_PREFIX}/{file_name}"
+                    continue
+                variant = resize_avatar(data, size, config.ui.profile_photo_quality)
+                url = _write_static_file(file_name, variant) if serve_static else None
+                # Inline fallback uses the 2x variant for both densities
+                urls[f"{density}x"] = url or _data_uri(variant, "image/jpeg")
+            if not urls["1x"].startswith("data:") or not urls["2x"].startswith("data:"):
+                return urls
+            return {"1x": urls["2x"], "2x": urls["2x"]}
+        except Exception as e:
+            print(f"Could not resize profile photo {path}: {e}")
+
+    extension = os.path.splitext(path)[1].lower() or ".jpg"
+    url = publish_static_file(data, "profile", extension) if serve_static else None
+    url = url or _data_uri(data, mimetypes.guess_type(path)[0] or "image/jpeg")
+    return {"1x": url, "2x": url}
+
+
+def get_profile_photo_variants() -> Dict[str, str]:
+    """
+    Get the URLs of the profile photo variants for use in CSS and HTML.
+
+    Only a stat call per rerun: variants are generated and published once
+    per file version. Falls back to a data URI if static serving is disabled
+    or the static folder is not writable.
+
+    Returns:
+        Mapping of pixel density ("1x", "2x") to URL, or {} if no photo exists
+    """
+    path = find_profile_photo()
+    if path is None:
+        return {}
+    try:
+        return build_profile_photo_variants(path, asset_version(path))
+    except OSError as e:
+        print(f"Failed to load image from {path}: {e}")
+        return {}
+
+
+def get_profile_photo_background(position: str = "center top") -> str:
+    """
+    CSS declarations that show the profile photo as a cover background.
+
+    Browsers pick the 1x or 2x variant with image-set(); browsers without
+    image-set() support keep the plain 1x background.
+
+    Args:
+        position: CSS background position
+
+    Returns:
+        CSS declarations (without selector), or "" if no photo exists
+    """
+    variants = get_profile_photo_variants()
+    if not variants:
+        return ""
+    photo_1x, photo_2x = variants["1x"], variants["2x"]
+    declarations = f"background: url('{photo_1x}') {position}/cover no-repeat;"
+    if photo_2x != photo_1x:
+        declarations += f" background-image: image-set(url('{photo_1x}') 1x, url('{photo_2x}') 2x);"
+    return declarations
+
+
+if __name__ == "__main__":
+    # Build-time asset step: pre-generate the profile photo variants
+    for density, url in get_profile_photo_variants().items():
+        print(f"{density}: {url if not url.startswith('data:') else 'inline data URI'}")
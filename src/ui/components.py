@@ -3,53 +3,70 @@ UI Components module for CV RAG Chatbot.
 Contains all UI-related functions and styling.
 """
 
-import base64
+import html
 import os
 import sys
-from typing import Optional
+from functools import lru_cache
+from typing import Dict, Optional
 
 # Add the parent directory to sys.path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 
 import streamlit as st
 from configs.app_config import config
+from src.ui.assets import get_profile_photo_background, get_profile_photo_variants
+
+# st.fragment graduated from st.experimental_fragment; older Streamlit has neither
+_fragment_decorator = getattr(st, "fragment", None) or getattr(st, "experimental_fragment", None)
+FRAGMENTS_SUPPORTED = _fragment_decorator is not None
+
+
+def fragment(func=None, *, run_every=None):
+    """
+    Decorate a function as a Streamlit fragment when supported.
+    
+    Fragments rerun on their own (and every run_every seconds if given)
+    without rerunning the whole script. On Streamlit versions without
+    fragments the function is returned unchanged.
+    
+    Args:
+        func: Function to decorate
+        run_every: Seconds between automatic fragment reruns
+    """
+    def decorate(f):
+        if _fragment_decorator is None:
+            return f
+        return _fragment_decorator(f, run_every=run_every)
+    
+    return decorate(func) if func is not None else decorate
 
 
 def load_profile_image() -> str:
     """
-    Load profile image and convert to base64.
+    Get the profile image URL for use in CSS.
     
     Returns:
-        Base64 encoded image string
+        URL of the 1x avatar variant (a data URI if static serving is unavailable)
     """
-    import os
-    
-    # Get the project root directory (assuming we're in src/ui/)
-    project_root = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
-    
-    profile_paths = config.ui.profile_photo_paths or []
-    for profile_path in profile_paths:
-        absolute_path = profile_path  # Initialize with original path
-        try:
-            # Convert relative path to absolute path
-            if not os.path.isabs(profile_path):
-                absolute_path = os.path.join(project_root, profile_path)
-            else:
-                absolute_path = profile_path
-                
-            with open(absolute_path, "rb") as f:
-                return base64.b64encode(f.read()).decode()
-        except Exception as e:
-            print(f"Failed to load image from {absolute_path}: {e}")
-            continue
-    return ""
+    return get_profile_photo_variants().get("1x", "")
 
 
 def inject_custom_css():
     """Inject custom CSS styling for the application."""
+    st.markdown(render_custom_css(get_profile_photo_background("center top 1px")), unsafe_allow_html=True)
+
+
+@lru_cache(maxsize=4)
+def render_custom_css(photo_background: str) -> str:
+    """
+    Render the application CSS once per profile photo version.
     
-    banner_b64 = load_profile_image()
-    
+    Args:
+        photo_background: CSS background declarations for the profile photo
+        
+    Returns:
+        CSS wrapped in a style tag
+    """
     css = f"""
 <style>
 @import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600;700;800&family=Poppins:wght@300;400;500;600;700&display=swap');
@@ -209,7 +226,7 @@ footer {{ visibility: hidden !important; }}
     height: 160px;
     border-radius: 50%;
     margin: 0 auto 1.5rem auto;
-    background: url(data:image/jpeg;base64,{banner_b64}) center top 1px/cover no-repeat;
+    {photo_background}
     border: 5px solid rgba(255,255,255,0.9);
     box-shadow: 0 15px 35px rgba(0,0,0,0.3), 0 5px 15px rgba(0,0,0,0.2);
     transition: all 0.4s cubic-bezier(0.175, 0.885, 0.32, 1.275);
@@ -636,11 +653,19 @@ div[data-testid="stChatMessage"].user-msg::before {{
 }}
 </style>
 """
-    st.markdown(css, unsafe_allow_html=True)
+    return css
 
 
-def render_profile_section():
-    """Render the enhanced profile section with photo and animated information."""
+def render_profile_section(persona=None):
+    """
+    Render the enhanced profile section with photo and animated information.
+    
+    Args:
+        persona: Persona to present (the default persona's profile if None)
+    """
+    if persona is not None and not persona.is_default:
+        render_persona_profile(persona)
+        return
     st.markdown(f"""
     <div class='profile-container'>
         <div class='profile-photo'></div>
@@ -665,8 +690,49 @@ def render_profile_section():
     """, unsafe_allow_html=True)
 
 
-def render_social_links():
-    """Render professional social media links with real platform icons."""
+def render_persona_profile(persona):
+    """
+    Render the profile of a persona defined in a persona folder.
+    
+    The profile photo is the default persona's, so it is left out.
+    
+    Args:
+        persona: Persona with display name, tags and summary
+    """
+    tags = "".join(f"<span class='skill-tag'> {html.escape(tag)}</span>" for tag in persona.tags)
+    summary = html.escape(persona.summary)
+    st.markdown(f"""
+    <div class='profile-container'>
+        <h1 style='font-size: 2rem; margin-bottom: 0.5rem; font-weight: 700; text-shadow: 0 2px 4px rgba(0,0,0,0.1);'>
+            {html.escape(persona.display_name)}
+        </h1>
+        <div style='margin-bottom: 1.5rem;'>
+            {tags}
+        </div>
+        <p style='font-size: 1rem; line-height: 1.6; opacity: 0.95; max-width: 600px; margin: 0 auto; text-shadow: 0 1px 2px rgba(0,0,0,0.1);'>
+            {summary}
+        </p>
+        <div style='margin-top: 1.5rem; font-size: 0.9rem; opacity: 0.8;'>
+            💬 Ask about experience, skills, projects, education or measurable impact
+        </div>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_social_links(persona=None):
+    """
+    Render professional social media links with real platform icons.
+    
+    Args:
+        persona: Persona whose links to show (config.ui.social_links for the
+            default persona)
+    """
+    social_links = config.ui.social_links
+    if persona is not None and not persona.is_default:
+        social_links = persona.social_links
+        if not social_links:
+            return
+    
     st.markdown("""
     <div class='social-links-container'>
         <h3 style='color: #003147; font-weight: 600; margin-bottom: 1rem; display: flex; align-items: center;'>
@@ -675,7 +741,6 @@ def render_social_links():
     </div>
     """, unsafe_allow_html=True)
     
-    social_links = config.ui.social_links
     if social_links:
         cols = st.columns(len(social_links))
         for i, (platform, url) in enumerate(social_links.items()):
@@ -980,3 +1045,56 @@ def render_chat_header():
         </p>
     </div>
     """, unsafe_allow_html=True)
+
+
+def render_build_status(job, serving_previous: bool = False):
+    """
+    Show the progress of a background pipeline build.
+    
+    Args:
+        job: BuildJob from the pipeline build manager
+        serving_previous: Whether an older pipeline answers questions meanwhile
+    """
+    if job.in_progress:
+        state = "Queued" if job.state == "pending" else "Building"
+        st.info(f"⏳ {state} AI pipeline... ({job.elapsed:.0f}s)")
+        if serving_previous:
+            st.caption("Answering from the previous version of the content until the new index is ready.")
+    elif job.state == "failed":
+        st.warning(f"⚠️ Pipeline build failed: {job.error}")
+
+
+def _show_earlier_messages():
+    """Extend the rendered chat window by one page."""
+    st.session_state.chat_visible = st.session_state.get("chat_visible", config.chat.render_window) + config.chat.render_window
+
+
+def reset_chat_window():
+    """Render only the newest page of messages again, e.g. after the history is cleared."""
+    st.session_state.pop("chat_visible", None)
+
+
+def render_chat_history(history, avatars: Optional[Dict[str, str]] = None):
+    """
+    Render the newest chat messages with a control to load earlier ones.
+    
+    Only a fixed window of messages is rendered per rerun, so rerun cost
+    does not grow with the length of the session.
+    
+    Args:
+        history: ChatHistory of the session
+        avatars: Optional avatar per role
+    """
+    visible = st.session_state.get("chat_visible", config.chat.render_window)
+    hidden = len(history) - visible
+    if hidden > 0:
+        st.button(
+            f"⬆️ Load earlier messages ({hidden} more)",
+            key="load_earlier_messages",
+            on_click=_show_earlier_messages
+        )
+    
+    for message in history.tail(visible):
+        avatar = avatars.get(message["role"]) if avatars else None
+        with st.chat_message(message["role"], avatar=avatar):
+            st.markdown(message["content"])
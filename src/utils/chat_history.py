@@ -0,0 +1,191 @@
+"""
+Chat history module for CV RAG Chatbot.
+Keeps a bounded window of recent messages in memory per session and spills
+older ones to an on-disk log, so long sessions cost the same per rerun.
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+from collections import deque
+from typing import Deque, Dict, List, Optional
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+import streamlit as st
+
+Message = Dict[str, str]
+
+_cleanup_lock = threading.Lock()
+_last_cleanup: Dict[str, float] = {}
+
+
+def get_spill_directory() -> str:
+    """Directory holding spilled chat logs."""
+    return config.chat.spill_directory or os.path.join(tempfile.gettempdir(), "cv-rag-chat")
+
+
+def _ensure_private_directory(directory: str):
+    """Create the spill directory readable by this user only (logs hold chat text)."""
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    try:
+        os.chmod(directory, 0o700)
+    except OSError as e:
+        print(f"Could not restrict permissions of {directory}: {e}")
+
+
+def _remove_stale_logs(directory: str, max_age_hours: float):
+    """Delete spilled logs of sessions that ended long ago (at most once per cleanup interval)."""
+    now = time.time()
+    with _cleanup_lock:
+        if now - _last_cleanup.get(directory, 0.0) < config.chat.cleanup_interval:
+            return
+        _last_cleanup[directory] = now
+
+    cutoff = now - max_age_hours * 3600
+    try:
+        for name in os.listdir(directory):
+            path = os.path.join(directory, name)
+            if name.endswith(".jsonl") and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+    except OSError as e:
+        print(f"Could not clean up chat logs in {directory}: {e}")
+
+
+def _remove_log(path: str):
+    """Delete one session's spill log if it exists."""
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+    except OSError as e:
+        print(f"Could not remove chat log {path}: {e}")
+
+
+class ChatHistory:
+    """
+    Chat history with a bounded in-memory window.
+
+    The newest memory_window messages stay in memory. Older ones are
+    appended to a per-session JSON-lines log, with line offsets kept so any
+    earlier page can be read back without scanning the file. The log is
+    deleted when the history is garbage collected, i.e. when its session ends.
+    """
+
+    def __init__(self, session_id: str, memory_window: Optional[int] = None,
+                 spill_directory: Optional[str] = None):
+        """
+        Initialize an empty history.
+
+        Args:
+            session_id: Session identifier (names the spill log)
+            memory_window: Messages kept in memory (defaults to config)
+            spill_directory: Where spilled logs go (defaults to config)
+        """
+        self.session_id = session_id
+        self.memory_window = max(1, memory_window or config.chat.memory_window)
+        self.spill_directory = spill_directory or get_spill_directory()
+        self._recent: Deque[Message] = deque()
+        self._offsets: List[int] = []
+        self._lock = threading.Lock()
+        self._finalizer = weakref.finalize(self, _remove_log, self.log_path)
+
+    @property
+    def log_path(self) -> str:
+        """Path of this session's spill log."""
+        return os.path.join(self.spill_directory, f"{self.session_id}.jsonl")
+
+    @property
+    def spilled(self) -> int:
+        """Number of messages moved to disk."""
+        return len(self._offsets)
+
+    def __len__(self) -> int:
+        return len(self._offsets) + len(self._recent)
+
+    def append(self, role: str, content: str):
+        """
+        Add a message, spilling the oldest in-memory messages past the window.
+
+        Args:
+            role: "user" or "assistant"
+            content: Message text
+        """
+        with self._lock:
+            self._recent.append({"role": role, "content": content})
+            overflow = len(self._recent) - self.memory_window
+            if overflow > 0:
+                self._spill([self._recent.popleft() for _ in range(overflow)])
+
+    def _spill(self, messages: List[Message]):
+        """Append messages to the session log, recording their offsets."""
+        if not self._offsets:
+            _ensure_private_directory(self.spill_directory)
+        _remove_stale_logs(self.spill_directory, config.chat.log_max_age_hours)
+        try:
+            fd = os.open(self.log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o600)
+            with os.fdopen(fd, "ab") as f:
+                for message in messages:
+                    self._offsets.append(f.tell())
+                    f.write(json.dumps(message, ensure_ascii=False).encode("utf-8") + b"\n")
+        except OSError as e:
+            # Keep the session usable; drop the oldest turns instead
+            print(f"Could not spill chat history for {self.session_id}: {e}")
+
+    def _read_spilled(self, start: int, stop: int) -> List[Message]:
+        """Read spilled messages [start, stop) from the log."""
+        if start >= stop:
+            return []
+        messages = []
+        try:
+            with open(self.log_path, "rb") as f:
+                f.seek(self._offsets[start])
+                for _ in range(stop - start):
+                    messages.append(json.loads(f.readline()))
+        except (OSError, ValueError) as e:
+            print(f"Could not read chat history for {self.session_id}: {e}")
+        return messages
+
+    def tail(self, count: int) -> List[Message]:
+        """
+        Get the newest messages, reading from disk only if count exceeds the window.
+
+        Args:
+            count: Number of messages
+
+        Returns:
+            Up to count messages, oldest first
+        """
+        with self._lock:
+            recent = list(self._recent)
+            spilled = len(self._offsets)
+            from_disk = min(spilled, max(0, count - len(recent)))
+            earlier = self._read_spilled(spilled - from_disk, spilled)
+        return earlier + recent[max(0, len(recent) - count):]
+
+    def clear(self):
+        """Remove all messages, including the spill log."""
+        with self._lock:
+            self._recent.clear()
+            self._offsets.clear()
+            _remove_log(self.log_path)
+
+
+def get_session_chat_history() -> ChatHistory:
+    """
+    Get the chat history of the current Streamlit session.
+
+    Returns:
+        ChatHistory stored in session state
+    """
+    if "chat_history" not in st.session_state:
+        if "session_id" not in st.session_state:
+            st.session_state.session_id = uuid.uuid4().hex
+        st.session_state.chat_history = ChatHistory(st.session_state.session_id)
+    return st.session_state.chat_history
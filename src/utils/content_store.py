@@ -0,0 +1,469 @@
+"""
+Content store module for CV RAG Chatbot.
+One process-wide store for extracted document text, keyed by content
+hash, with in-memory, disk and mmap backends. The runtime environment is
+detected once and picks the default backend; locally that is a memory-
+mapped store in a per-process temporary folder, removed at exit, so
+uploaded text does not pile up on disk. Stored content is handed to
+the chunker as bounded blocks decoded from a zero-copy view, so each
+document is held once per process instead of once per session and code
+path.
+"""
+
+import atexit
+import codecs
+import hashlib
+import io
+import mmap
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from abc import ABC, abstractmethod
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, Optional, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@lru_cache(maxsize=1)
+def is_cloud_environment() -> bool:
+    """
+    Detect if running on Streamlit Cloud (evaluated once per process).
+
+    Returns:
+        True if running on Streamlit Cloud, False otherwise
+    """
+    base_url = os.environ.get('STREAMLIT_SERVER_BASE_URL', '')
+    runtime = os.environ.get('STREAMLIT_RUNTIME_ENVIRONMENT', '')
+    cwd = os.getcwd()
+    cloud_indicators = [
+        # Environment variables set by Streamlit Cloud
+        'STREAMLIT_CLOUD' in os.environ,
+        'GITHUB_REPOSITORY' in os.environ and 'STREAMLIT' in runtime,
+        runtime == 'cloud',
+
+        # URL-based detection
+        'streamlit.app' in base_url,
+        'share.streamlit.io' in base_url,
+        'streamlit.app' in os.environ.get('STREAMLIT_SERVER_HEADLESS', ''),
+
+        # File system indicators
+        '/mount/src' in cwd,
+        '/app' in cwd and not os.path.exists('/home'),
+    ]
+    return any(cloud_indicators)
+
+
+def _content_key(data: bytes) -> str:
+    """Store key of UTF-8 encoded content (same as get_content_hash of the text)."""
+    return hashlib.md5(data).hexdigest()
+
+
+class ContentStore(ABC):
+    """
+    Interface of the content stores: text in, content hash out.
+
+    Backends keep the UTF-8 encoding of each text once. view() exposes it
+    without copying; segments() decodes it in bounded blocks for the
+    ingestion pipeline.
+    """
+
+    backend = "base"
+
+    def __init__(self):
+        self._lock = threading.Lock()
+
+    def put(self, content: str) -> str:
+        """
+        Store text, unless identical text is already stored.
+
+        Args:
+            content: Text content
+
+        Returns:
+            Content hash (the key for get, view and segments)
+        """
+        data = content.encode()
+        content_hash = _content_key(data)
+        if content_hash not in self:
+            self._put(content_hash, data)
+        return content_hash
+
+    def put_blocks(self, blocks: Iterable[str]) -> Tuple[str, int]:
+        """
+        Store text that arrives as blocks, unless identical text is already stored.
+
+        Blocks are encoded, hashed and written one at a time, so the text is
+        never joined into one string.
+
+        Args:
+            blocks: Text blocks in order
+
+        Returns:
+            Tuple of (content hash, characters)
+        """
+        digest = hashlib.md5()  # Same key as _content_key of the joined text
+        characters = 0
+        sink = self._begin_stream()
+        keep_as = None
+        try:
+            for block in blocks:
+                data = block.encode()
+                digest.update(data)
+                sink.write(data)
+                characters += len(block)
+            content_hash = digest.hexdigest()
+            if content_hash not in self:
+                keep_as = content_hash
+        finally:
+            self._finish_stream(sink, keep_as)
+        return content_hash, characters
+
+    def get(self, content_hash: str) -> Optional[str]:
+        """
+        Decode the full stored text (a new string; prefer segments() for indexing).
+
+        Args:
+            content_hash: Content hash
+
+        Returns:
+            Text, or None if not stored
+        """
+        view = self.view(content_hash)
+        return None if view is None else str(view, "utf-8")
+
+    def segments(self, content_hash: str, block_chars: Optional[int] = None) -> Optional[Iterator[str]]:
+        """
+        Stream stored text in bounded blocks decoded from its view.
+
+        Args:
+            content_hash: Content hash
+            block_chars: Approximate characters per block (defaults to config)
+
+        Returns:
+            Iterator of text blocks, or None if not stored
+        """
+        view = self.view(content_hash)
+        if view is None:
+            return None
+        return self._decode_blocks(view, block_chars or config.vector_store.read_block_chars)
+
+    @staticmethod
+    def _decode_blocks(view: memoryview, block_bytes: int) -> Iterator[str]:
+        """Decode a UTF-8 view block by block (slices of the view are not copied)."""
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        for start in range(0, len(view), block_bytes):
+            text = decoder.decode(view[start:start + block_bytes])
+            if text:
+                yield text
+        text = decoder.decode(b"", final=True)
+        if text:
+            yield text
+
+    @abstractmethod
+    def __contains__(self, content_hash: str) -> bool:
+        """Whether content with this hash is stored."""
+
+    @abstractmethod
+    def view(self, content_hash: str) -> Optional[memoryview]:
+        """
+        Read-only view of the stored UTF-8 bytes.
+
+        Args:
+            content_hash: Content hash
+
+        Returns:
+            memoryview, or None if not stored
+        """
+
+    @abstractmethod
+    def discard(self, content_hash: str):
+        """Remove stored content if present."""
+
+    @abstractmethod
+    def _put(self, content_hash: str, data: bytes):
+        """Store encoded content under its hash."""
+
+    @abstractmethod
+    def _begin_stream(self) -> BinaryIO:
+        """Open a sink for put_blocks()."""
+
+    @abstractmethod
+    def _finish_stream(self, sink: BinaryIO, content_hash: Optional[str]):
+        """Store a put_blocks() sink under content_hash, or drop it if None."""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict with the backend name, item count and stored bytes
+        """
+
+
+class MemoryContentStore(ContentStore):
+    """Content held as bytes in process memory (nothing touches disk)."""
+
+    backend = "memory"
+
+    def __init__(self):
+        super().__init__()
+        self._items: Dict[str, Any] = {}  # bytes, or the buffer of a streamed put
+
+    def __contains__(self, content_hash: str) -> bool:
+        return content_hash in self._items
+
+    def _put(self, content_hash: str, data: bytes):
+        with self._lock:
+            self._items.setdefault(content_hash, data)
+
+    def _begin_stream(self) -> BinaryIO:
+        return io.BytesIO()
+
+    def _finish_stream(self, sink: BinaryIO, content_hash: Optional[str]):
+        if content_hash is not None:
+            with self._lock:
+                # The buffer itself, not a copy of it
+                self._items.setdefault(content_hash, sink.getbuffer())
+
+    def view(self, content_hash: str) -> Optional[memoryview]:
+        data = self._items.get(content_hash)
+        return None if data is None else memoryview(data).toreadonly()
+
+    def discard(self, content_hash: str):
+        with self._lock:
+            self._items.pop(content_hash, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "items": len(self._items),
+                "bytes": sum(len(data) for data in self._items.values())
+            }
+
+
+class DiskContentStore(ContentStore):
+    """
+    Content kept as files named by hash; costs no memory at rest.
+
+    Files survive restarts; ones not written for config.content_store.ttl
+    seconds are swept when a store is opened on the folder.
+    """
+
+    backend = "disk"
+
+    def __init__(self, directory: Optional[str] = None):
+        """
+        Initialize the store.
+
+        Args:
+            directory: Folder for content files (defaults to config)
+        """
+        super().__init__()
+        directory = directory or config.content_store.directory
+        self.directory = directory if os.path.isabs(directory) else os.path.join(PROJECT_ROOT, directory)
+        self.sweep()
+
+    def sweep(self, ttl: Optional[float] = None) -> int:
+        """
+        Remove content files, and leftovers of interrupted writes, older than the TTL.
+
+        Args:
+            ttl: Maximum age in seconds (defaults to config)
+
+        Returns:
+            Number of files removed
+        """
+        cutoff = time.time() - (ttl if ttl is not None else config.content_store.ttl)
+        removed = 0
+        try:
+            names = os.listdir(self.directory)
+        except FileNotFoundError:
+            return 0
+        for name in names:
+            if not (name.endswith(".txt") or ".tmp" in name):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                if os.path.getmtime(path) < cutoff:
+                    os.remove(path)
+                    removed += 1
+            except FileNotFoundError:
+                pass
+        return removed
+
+    def _path(self, content_hash: str) -> str:
+        return os.path.join(self.directory, f"{content_hash}.txt")
+
+    def __contains__(self, content_hash: str) -> bool:
+        return os.path.exists(self._path(content_hash))
+
+    def _put(self, content_hash: str, data: bytes):
+        path = self._path(content_hash)
+        os.makedirs(self.directory, exist_ok=True)
+        temp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+        with open(temp_path, "wb") as f:
+            f.write(data)
+        os.replace(temp_path, path)
+
+    def _begin_stream(self) -> BinaryIO:
+        os.makedirs(self.directory, exist_ok=True)
+        return tempfile.NamedTemporaryFile(dir=self.directory, prefix=".stream-", suffix=".tmp", delete=False)
+
+    def _finish_stream(self, sink: BinaryIO, content_hash: Optional[str]):
+        sink.close()
+        if content_hash is not None:
+            os.replace(sink.name, self._path(content_hash))
+        else:
+            os.remove(sink.name)
+
+    def view(self, content_hash: str) -> Optional[memoryview]:
+        # Plain disk reads copy the file; MmapContentStore maps it instead
+        try:
+            with open(self._path(content_hash), "rb") as f:
+                return memoryview(f.read())
+        except FileNotFoundError:
+            return None
+
+    def segments(self, content_hash: str, block_chars: Optional[int] = None) -> Optional[Iterator[str]]:
+        if content_hash not in self:
+            return None
+        return self._read_blocks(self._path(content_hash), block_chars or config.vector_store.read_block_chars)
+
+    @staticmethod
+    def _read_blocks(path: str, block_chars: int) -> Iterator[str]:
+        """Stream a content file without newline translation."""
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            while True:
+                block = f.read(block_chars)
+                if not block:
+                    break
+                yield block
+
+    def discard(self, content_hash: str):
+        try:
+            os.remove(self._path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def stats(self) -> Dict[str, Any]:
+        try:
+            names = [name for name in os.listdir(self.directory) if name.endswith(".txt")]
+        except FileNotFoundError:
+            names = []
+        return {
+            "backend": self.backend,
+            "items": len(names),
+            "bytes": sum(os.path.getsize(os.path.join(self.directory, name)) for name in names)
+        }
+
+
+class MmapContentStore(DiskContentStore):
+    """
+    Disk store read through memory maps.
+
+    Views are backed by the OS page cache, so content is read lazily and
+    shared between all sessions and worker processes of the app.
+    """
+
+    backend = "mmap"
+
+    def __init__(self, directory: Optional[str] = None):
+        super().__init__(directory)
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def view(self, content_hash: str) -> Optional[memoryview]:
+        with self._lock:
+            mapped = self._maps.get(content_hash)
+            if mapped is None:
+                try:
+                    with open(self._path(content_hash), "rb") as f:
+                        if os.fstat(f.fileno()).st_size == 0:
+                            return memoryview(b"")
+                        mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                except FileNotFoundError:
+                    return None
+                self._maps[content_hash] = mapped
+        return memoryview(mapped)
+
+    def segments(self, content_hash: str, block_chars: Optional[int] = None) -> Optional[Iterator[str]]:
+        # Decode from the mapping rather than streaming the file
+        return ContentStore.segments(self, content_hash, block_chars)
+
+    def discard(self, content_hash: str):
+        with self._lock:
+            mapped = self._maps.pop(content_hash, None)
+        if mapped is not None:
+            self._close_map(mapped)
+        super().discard(content_hash)
+
+    def close(self):
+        """Close every mapping (and with it the mapped file handles)."""
+        with self._lock:
+            maps, self._maps = list(self._maps.values()), {}
+        for mapped in maps:
+            self._close_map(mapped)
+
+    @staticmethod
+    def _close_map(mapped: mmap.mmap):
+        try:
+            mapped.close()
+        except BufferError:
+            # A view is still in use; the mapping is closed once it is released
+            pass
+
+
+def _temporary_store() -> MmapContentStore:
+    """Memory-mapped store in a temporary folder that is removed when the process exits."""
+    store = MmapContentStore(tempfile.mkdtemp(prefix="cv-rag-content-"))
+
+    def remove():
+        store.close()
+        shutil.rmtree(store.directory, ignore_errors=True)
+
+    atexit.register(remove)
+    return store
+
+
+_BACKENDS = {
+    "memory": MemoryContentStore,
+    "disk": DiskContentStore,
+    "mmap": MmapContentStore,
+}
+
+_content_store: Optional[ContentStore] = None
+_content_store_lock = threading.Lock()
+
+
+def get_content_store() -> ContentStore:
+    """
+    Get the process-wide content store.
+
+    The "auto" backend keeps content in memory on Streamlit Cloud (no
+    persistent disk) and locally memory-maps files in a per-process
+    temporary folder. The configured "disk" and "mmap" backends use
+    config.content_store.directory, swept by TTL on startup.
+
+    Returns:
+        Shared ContentStore instance
+    """
+    global _content_store
+    with _content_store_lock:
+        if _content_store is None:
+            backend = config.content_store.backend
+            if backend == "auto":
+                _content_store = MemoryContentStore() if is_cloud_environment() else _temporary_store()
+            elif backend in _BACKENDS:
+                _content_store = _BACKENDS[backend]()
+            else:
+                raise ValueError(f"Unknown content store backend '{backend}'")
+    return _content_store
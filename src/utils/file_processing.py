@@ -6,20 +6,29 @@ Handles PDF and text file processing, content validation.
 import os
 import hashlib
 import sys
-from typing import Optional, Any
+import time
+from typing import Any, Iterator, List, Optional
 
 # Add the parent directory to sys.path to import config
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
 from configs.app_config import config
 import streamlit as st
+from src.utils.content_store import get_content_store
+from src.utils.fingerprint import get_fingerprinter
+from src.utils.name_validation import get_name_matcher
+from src.utils.pdf_extraction import extract_pdf_pages
+from src.utils.text_decoding import count_words, iter_decoded_text, strip_blocks
+from src.utils.upload_spool import UploadSpool, UploadTooLargeError, format_throughput, spool_upload
+from src.utils.upload_store import get_upload_store
 
 
-def extract_pdf_text(uploaded_file: Any) -> str:
+def extract_pdf_text(uploaded_file: Any, spool: Optional[UploadSpool] = None) -> str:
     """
     Extract text from PDF file using pypdf.
     
     Args:
         uploaded_file: Streamlit uploaded file object
+        spool: Spooled copy of the file (made here if not given)
         
     Returns:
         Extracted text content
@@ -27,42 +36,73 @@ def extract_pdf_text(uploaded_file: Any) -> str:
     Raises:
         Exception: If PDF processing fails
     """
+    if spool is None:
+        with spool_upload(uploaded_file) as spool:
+            return extract_pdf_text(uploaded_file, spool)
+    
     try:
-        from pypdf import PdfReader
+        started = time.monotonic()
+        progress_bar = st.progress(0.0, text="📄 Extracting PDF pages...")
         
-        # Reset file pointer to beginning
-        uploaded_file.seek(0)
+        def show_progress(done: int, total: int):
+            progress_bar.progress(done / max(total, 1), text=f"📄 Extracted {done}/{total} pages")
         
-        reader = PdfReader(uploaded_file)
-        text = ""
+        # Pages are extracted in worker processes (reading large files from
+        # the spool by path); unchanged pages come from cache
+        result = extract_pdf_pages(spool.source(), progress=show_progress)
+        progress_bar.empty()
+        elapsed = time.monotonic() - started
+        page_count = len(result.pages)
+        st.caption(f"⏱️ {page_count} pages extracted in {elapsed:.1f}s ({page_count / max(elapsed, 1e-6):.1f} pages/s)")
         
-        if len(reader.pages) == 0:
-            raise Exception("PDF file contains no pages")
+        for page_number, error in sorted(result.errors.items()):
+            st.warning(f"Could not extract text from page {page_number + 1}: {error}")
+        if result.truncated:
+            st.warning(f"⚠️ Only the first {len(result.pages)} of {result.total_pages} pages were processed.")
+        if result.timed_out:
+            st.warning("⚠️ PDF extraction timed out; some pages were skipped.")
         
-        for page_num, page in enumerate(reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            except Exception as e:
-                st.warning(f"Could not extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        if not text.strip():
+        text = result.text
+        if not text:
             raise Exception("No text could be extracted from the PDF. The file might be scanned or image-based.")
         
-        return text.strip()
+        return text
             
     except Exception as e:
         raise Exception(f"PDF processing failed: {str(e)}")
 
 
-def extract_text_file(uploaded_file: Any) -> str:
+def iter_text_file(uploaded_file: Any, spool: Optional[UploadSpool] = None) -> Iterator[str]:
+    """
+    Decode a text file block by block with encoding detection.
+    
+    The encoding comes from the byte order mark or a prefix sample, and the
+    file is decoded in a single pass. Leading and trailing whitespace of the
+    whole text is stripped.
+    
+    Args:
+        uploaded_file: Streamlit uploaded file object
+        spool: Spooled copy of the file (read directly if not given)
+        
+    Returns:
+        Iterator of text blocks
+    """
+    if spool is not None:
+        stream = spool.stream()
+    else:
+        # Reset file pointer to beginning
+        uploaded_file.seek(0)
+        stream = uploaded_file
+    return strip_blocks(iter_decoded_text(stream))
+
+
+def extract_text_file(uploaded_file: Any, spool: Optional[UploadSpool] = None) -> str:
     """
-    Extract text from text file with encoding detection.
+    Extract text from text file with encoding detection (see iter_text_file).
     
     Args:
         uploaded_file: Streamlit uploaded file object
+        spool: Spooled copy of the file (read directly if not given)
         
     Returns:
         Text content
@@ -71,68 +111,113 @@ def extract_text_file(uploaded_file: Any) -> str:
         Exception: If text processing fails
     """
     try:
-        # Reset file pointer to beginning
-        uploaded_file.seek(0)
-        
-        # Try different encodings
-        encodings = ['utf-8', 'utf-16', 'iso-8859-1', 'cp1252']
-        
-        for encoding in encodings:
-            try:
-                uploaded_file.seek(0)
-                content = uploaded_file.read().decode(encoding)
-                if content.strip():
-                    return content.strip()
-            except UnicodeDecodeError:
-                continue
-        
-        raise Exception("Could not decode text file with any supported encoding")
+        content = "".join(iter_text_file(uploaded_file, spool))
+        if not content:
+            raise Exception("Text file is empty")
+        return content
         
     except Exception as e:
         raise Exception(f"Text file processing failed: {str(e)}")
-        return text.strip()
-    except Exception as e:
-        raise Exception(f"Error extracting PDF text: {str(e)}")
 
 
-def validate_name_in_content(content: str) -> bool:
+def validate_name_in_content(content: str, content_hash: Optional[str] = None) -> bool:
     """
     Check if the content contains the expected name variations.
     
     Args:
         content: Text content to validate
+        content_hash: Hash of the content, if known (results are cached by it)
         
     Returns:
         True if any name variation is found, False otherwise
     """
-    content_lower = content.lower()
-    name_variations = config.name_variations or []
-    return any(name.lower() in content_lower for name in name_variations)
+    return get_name_matcher().matches(content, content_hash)
+
+
+def get_knowledge_base_path() -> Optional[str]:
+    """
+    Resolve the knowledge base file in use.
+    
+    Returns:
+        Path of the first existing knowledge base file, or None
+    """
+    # First try the new path, then fallback to old path
+    for file_path in [config.paths.knowledge_base_file, "knowledge_base.txt"]:
+        if os.path.exists(file_path):
+            return file_path
+    return None
+
+
+def get_knowledge_base_documents(directory: Optional[str] = None) -> List[str]:
+    """
+    List the knowledge base documents in use.
+    
+    Documents are the files with a supported extension anywhere under the
+    knowledge base directory. Without any, the single legacy knowledge base
+    file is the only document of the configured knowledge base.
+    
+    Args:
+        directory: Knowledge base directory of a persona (defaults to the
+            configured one; no legacy fallback when given)
+    
+    Returns:
+        Document paths in sorted order (empty if there is no knowledge base)
+    """
+    extensions = tuple(ext.lower() for ext in config.paths.knowledge_base_extensions)
+    documents = []
+    for root, dirs, files in os.walk(directory or config.paths.knowledge_base_directory):
+        dirs[:] = sorted(d for d in dirs if not d.startswith("."))
+        documents.extend(
+            os.path.join(root, name) for name in sorted(files)
+            if not name.startswith(".") and name.lower().endswith(extensions)
+        )
+    if documents or directory is not None:
+        return documents
+    
+    legacy_path = get_knowledge_base_path()
+    return [legacy_path] if legacy_path else []
+
+
+def get_document_source(path: str, directory: Optional[str] = None) -> str:
+    """
+    Name of a knowledge base document for source attribution.
+    
+    Args:
+        path: Document path
+        directory: Knowledge base directory the path is under (defaults to the configured one)
+        
+    Returns:
+        Path relative to the knowledge base directory, or the file name
+    """
+    directory = os.path.abspath(directory or config.paths.knowledge_base_directory)
+    path = os.path.abspath(path)
+    if path.startswith(directory + os.sep):
+        return os.path.relpath(path, directory).replace(os.sep, "/")
+    return os.path.basename(path)
 
 
 def load_knowledge_base() -> str:
     """
-    Load content from the main knowledge base file.
+    Load the text of all knowledge base documents.
     
     Returns:
-        Knowledge base content
+        Knowledge base content, documents separated by blank lines
         
     Raises:
-        FileNotFoundError: If knowledge base file doesn't exist
+        FileNotFoundError: If there is no knowledge base document
     """
-    try:
-        # First try the new path, then fallback to old path
-        file_paths = [config.paths.knowledge_base_file, "knowledge_base.txt"]
-        
-        for file_path in file_paths:
-            if os.path.exists(file_path):
-                with open(file_path, "r", encoding="utf-8") as f:
-                    return f.read()
-        
-        raise FileNotFoundError(f"Knowledge base file not found in any of: {file_paths}")
-        
-    except FileNotFoundError:
+    documents = get_knowledge_base_documents()
+    if not documents:
         raise FileNotFoundError(f"Knowledge base file '{config.paths.knowledge_base_file}' not found")
+    
+    texts = []
+    for file_path in documents:
+        if file_path.lower().endswith(".pdf"):
+            texts.append(extract_pdf_pages(file_path).text)
+        else:
+            with open(file_path, "r", encoding="utf-8") as f:
+                texts.append(f.read())
+    return "\n\n".join(texts)
 
 
 def load_uploaded_content() -> Optional[str]:
@@ -151,7 +236,8 @@ def load_uploaded_content() -> Optional[str]:
                 with open(file_path, "r", encoding="utf-8") as f:
                     content = f.read()
                 
-                if validate_name_in_content(content):
+                # The fingerprint hash is cached by stat, so unchanged files skip the scan
+                if validate_name_in_content(content, get_fingerprinter().content_hash(file_path)):
                     return content
                 else:
                     st.warning("⚠️ Uploaded content doesn't contain the expected name. Using knowledge base instead.")
@@ -163,63 +249,96 @@ def load_uploaded_content() -> Optional[str]:
     return None
 
 
+def _write_uploaded_content(content_hash: str):
+    """Copy stored upload text to disk in blocks unless the file already holds it."""
+    path = config.paths.uploaded_content_file
+    if get_fingerprinter().content_hash(path) == content_hash:
+        return
+    view = get_content_store().view(content_hash)
+    if view is None:
+        return
+    
+    # Ensure directory exists
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    
+    block_bytes = config.uploads.read_block_bytes
+    with open(path, "wb") as f:
+        for start in range(0, len(view), block_bytes):
+            f.write(view[start:start + block_bytes])
+
+
 def save_uploaded_content(uploaded_file: Any) -> Optional[str]:
     """
     Process and save uploaded file content.
     
+    Text files are decoded, hashed and stored block by block, so memory use
+    stays flat however large the upload is.
+    
     Args:
         uploaded_file: Streamlit uploaded file object
         
     Returns:
-        Extracted content if successful, None otherwise
+        Content hash of the extracted text if successful, None otherwise
     """
+    spool = None
     try:
-        # Validate file size (limit to 10MB)
-        if uploaded_file.size > 10 * 1024 * 1024:
-            st.error("❌ File too large. Maximum size is 10MB.")
-            return None
+        # Copy to a spool (on disk when large), hashing and enforcing the size limit
+        spool = spool_upload(uploaded_file)
+        
+        # Identical files are extracted only once per process
+        store = get_upload_store()
+        entry = store.get(spool.digest)
+        if entry is not None:
+            _write_uploaded_content(entry.content_hash)
+            st.success(f"✅ Successfully processed **{uploaded_file.name}**")
+            st.info(f"♻️ Reusing previously extracted content • **{entry.characters:,}** characters")
+            return entry.content_hash
         
         # Extract content based on file type
-        content = None
         file_type = uploaded_file.type
         
         if file_type == "application/pdf":
             st.info("📄 Processing PDF file...")
-            content = extract_pdf_text(uploaded_file)
+            blocks = [extract_pdf_text(uploaded_file, spool)]
         elif file_type == "text/plain" or uploaded_file.name.endswith('.txt'):
             st.info("📝 Processing text file...")
-            content = extract_text_file(uploaded_file)
+            blocks = iter_text_file(uploaded_file, spool)
         else:
             st.error(f"❌ Unsupported file type: {file_type}")
             st.info("💡 Supported formats: PDF (.pdf), Text (.txt)")
             return None
         
-        if not content or not content.strip():
+        # Store the text and remember the extraction for repeat uploads
+        entry = store.put_blocks(spool.digest, blocks, uploaded_file.name)
+        if not entry.characters:
             st.error("❌ No content could be extracted from the file")
             return None
             
         # Basic content validation
-        if len(content) < 50:
+        if entry.characters < 50:
             st.warning("⚠️ File content seems very short. Make sure it contains your CV/Resume information.")
         
-        # Ensure directory exists
-        os.makedirs(os.path.dirname(config.paths.uploaded_content_file), exist_ok=True)
-        
         # Save to file
-        with open(config.paths.uploaded_content_file, "w", encoding="utf-8") as f:
-            f.write(content)
+        _write_uploaded_content(entry.content_hash)
         
         # Show success message with file stats
-        word_count = len(content.split())
+        word_count = count_words(get_content_store().segments(entry.content_hash) or [])
         st.success(f"✅ Successfully processed **{uploaded_file.name}**")
-        st.info(f"� **{len(content):,}** characters • **{word_count:,}** words extracted")
+        st.info(f"📊 **{entry.characters:,}** characters • **{word_count:,}** words extracted")
+        st.caption(f"⏱️ Read {format_throughput(spool.size, spool.seconds)}")
         
-        return content
+        return entry.content_hash
         
+    except UploadTooLargeError as e:
+        st.error(f"❌ {str(e)}")
+        return None
     except Exception as e:
         st.error(f"❌ Error processing file: {str(e)}")
         st.info("💡 Try checking that your file is a valid PDF or text file")
         return None
+    finally:
+        if spool is not None:
+            spool.close()
 
 
 def get_content_hash(content: str) -> str:
@@ -239,14 +358,14 @@ def get_knowledge_base_hash() -> str:
     """
     Get hash of current knowledge base for caching.
     
+    The hash comes from the background knowledge base watcher, so the file
+    is only re-read when its size, mtime or inode changes.
+    
     Returns:
         Hash of knowledge base content or "no_file" if not found
     """
-    try:
-        content = load_knowledge_base()
-        return get_content_hash(content)
-    except FileNotFoundError:
-        return "no_file"
+    from src.utils.fingerprint import get_knowledge_base_watcher
+    return get_knowledge_base_watcher().current_hash()
 
 
 def get_content_stats(content: str) -> dict[str, int]:
@@ -8,13 +8,31 @@ import hashlib
 from typing import Optional, Any, Dict
 import streamlit as st
 
-
-def extract_pdf_text_cloud(uploaded_file: Any) -> str:
+from .content_store import get_content_store, is_cloud_environment as detect_cloud_environment
+from .name_validation import get_name_matcher
+from .text_decoding import count_words, decode_text
+from .upload_spool import UploadSpool, UploadTooLargeError, format_throughput, spool_upload
+from .upload_store import (
+    clear_session_upload, get_session_upload, get_upload_store, set_session_upload
+)
+
+# The cloud check also accepts the short name "Amir"
+CLOUD_NAME_VARIATIONS = [
+    "abdolamir karbalaie",
+    "abdolamir",
+    "karbalaie",
+    "amir karbalaie",
+    "amir"
+]
+
+
+def extract_pdf_text_cloud(uploaded_file: Any, spool: Optional[UploadSpool] = None) -> str:
     """
     Extract text from PDF file using pypdf - Cloud compatible.
     
     Args:
         uploaded_file: Streamlit uploaded file object
+        spool: Spooled copy of the file (made here if not given)
         
     Returns:
         Extracted text content
@@ -22,42 +40,18 @@ def extract_pdf_text_cloud(uploaded_file: Any) -> str:
     Raises:
         Exception: If PDF processing fails
     """
-    try:
-        from pypdf import PdfReader
-        
-        # Reset file pointer to beginning
-        uploaded_file.seek(0)
-        
-        reader = PdfReader(uploaded_file)
-        text = ""
-        
-        if len(reader.pages) == 0:
-            raise Exception("PDF file contains no pages")
-        
-        for page_num, page in enumerate(reader.pages):
-            try:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text + "\n"
-            except Exception as e:
-                st.warning(f"Could not extract text from page {page_num + 1}: {str(e)}")
-                continue
-        
-        if not text.strip():
-            raise Exception("No text could be extracted from the PDF")
-        
-        return text.strip()
-        
-    except Exception as e:
-        raise Exception(f"PDF processing failed: {str(e)}")
+    # Page-parallel extraction works in memory, so the cloud path shares it
+    from .file_processing import extract_pdf_text as extract_pdf_pages_text
+    return extract_pdf_pages_text(uploaded_file, spool)
 
 
-def extract_text_file_cloud(uploaded_file: Any) -> str:
+def extract_text_file_cloud(uploaded_file: Any, spool: Optional[UploadSpool] = None) -> str:
     """
     Extract text from text file - Cloud compatible.
     
     Args:
         uploaded_file: Streamlit uploaded file object
+        spool: Spooled copy of the file (read directly if not given)
         
     Returns:
         Text content
@@ -66,46 +60,35 @@ def extract_text_file_cloud(uploaded_file: Any) -> str:
         Exception: If text processing fails
     """
     try:
-        # Reset file pointer to beginning
-        uploaded_file.seek(0)
-        
-        # Try different encodings
-        encodings = ['utf-8', 'latin-1', 'cp1252', 'iso-8859-1']
-        
-        for encoding in encodings:
-            try:
-                uploaded_file.seek(0)
-                content = uploaded_file.read().decode(encoding)
-                if content.strip():
-                    return content.strip()
-            except (UnicodeDecodeError, UnicodeError):
-                continue
+        if spool is not None:
+            stream = spool.stream()
+        else:
+            # Reset file pointer to beginning
+            uploaded_file.seek(0)
+            stream = uploaded_file
         
-        raise Exception("Could not decode text file with any common encoding")
+        # Encoding from BOM or prefix sample, decoded in one pass
+        content = decode_text(stream).strip()
+        if not content:
+            raise Exception("Text file is empty")
+        return content
         
     except Exception as e:
         raise Exception(f"Text file processing failed: {str(e)}")
 
 
-def validate_name_in_content_cloud(content: str) -> bool:
+def validate_name_in_content_cloud(content: str, content_hash: Optional[str] = None) -> bool:
     """
     Check if the content contains expected name variations - Cloud compatible.
     
     Args:
         content: Text content to validate
+        content_hash: Hash of the content, if known (results are cached by it)
         
     Returns:
         True if any name variation is found, False otherwise
     """
-    content_lower = content.lower()
-    name_variations = [
-        "abdolamir karbalaie",
-        "abdolamir", 
-        "karbalaie",
-        "amir karbalaie",
-        "amir"
-    ]
-    return any(name.lower() in content_lower for name in name_variations)
+    return get_name_matcher(CLOUD_NAME_VARIATIONS).matches(content, content_hash)
 
 
 def load_knowledge_base_cloud() -> str:
@@ -137,62 +120,81 @@ def process_uploaded_file_cloud(uploaded_file: Any) -> Optional[str]:
     """
     Process uploaded file for Streamlit Cloud - stores in session state only.
     
+    Text files are decoded, hashed and validated block by block, so memory
+    use stays flat however large the upload is.
+    
     Args:
         uploaded_file: Streamlit uploaded file object
         
     Returns:
-        Extracted content if successful, None otherwise
+        Content hash of the extracted text if successful, None otherwise
     """
+    spool = None
     try:
-        # Validate file size (limit to 10MB)
-        if uploaded_file.size > 10 * 1024 * 1024:
-            st.error("❌ File too large. Maximum size is 10MB.")
-            return None
+        # Copy to a spool (on disk when large), hashing and enforcing the size limit
+        spool = spool_upload(uploaded_file)
+        
+        # Identical files (from any session) are extracted only once
+        store = get_upload_store()
+        entry = store.get(spool.digest)
+        if entry is not None:
+            set_session_upload(spool.digest, uploaded_file.name)
+            st.success(f"✅ Successfully processed **{uploaded_file.name}**")
+            st.info(f"♻️ Reusing previously extracted content • **{entry.characters:,}** characters")
+            return entry.content_hash
         
         # Extract content based on file type
-        content = None
         file_type = uploaded_file.type
         
         if file_type == "application/pdf":
             st.info("📄 Processing PDF file...")
-            content = extract_pdf_text_cloud(uploaded_file)
+            blocks = [extract_pdf_text_cloud(uploaded_file, spool)]
         elif file_type == "text/plain" or uploaded_file.name.endswith('.txt'):
             st.info("📝 Processing text file...")
-            content = extract_text_file_cloud(uploaded_file)
+            from .file_processing import iter_text_file
+            blocks = iter_text_file(uploaded_file, spool)
         else:
             st.error(f"❌ Unsupported file type: {file_type}")
             st.info("💡 Supported formats: PDF (.pdf), Text (.txt)")
             return None
         
-        if not content or not content.strip():
+        # Store in the shared in-memory upload store; session state keeps only the digest
+        entry = store.put_blocks(spool.digest, blocks, uploaded_file.name)
+        if not entry.characters:
             st.error("❌ No content could be extracted from the file")
             return None
             
         # Basic content validation
-        if len(content) < 50:
+        if entry.characters < 50:
             st.warning("⚠️ File content seems very short. Make sure it contains your CV/Resume information.")
+        set_session_upload(spool.digest, uploaded_file.name)
         
-        # Validate name presence
-        if not validate_name_in_content_cloud(content):
+        # Validate name presence over the stored blocks
+        content_store = get_content_store()
+        matcher = get_name_matcher(CLOUD_NAME_VARIATIONS)
+        if not matcher.matches_blocks(content_store.segments(entry.content_hash) or [], entry.content_hash):
             st.warning("⚠️ The uploaded content doesn't appear to contain expected name variations.")
             st.info("💡 Make sure this is the correct CV/Resume file.")
-        
-        # Store in session state instead of file system
-        st.session_state.uploaded_content = content
-        st.session_state.uploaded_filename = uploaded_file.name
         st.session_state.upload_timestamp = st.session_state.get('upload_timestamp', 0) + 1
         
         # Show success message with file stats
-        word_count = len(content.split())
+        word_count = count_words(content_store.segments(entry.content_hash) or [])
         st.success(f"✅ Successfully processed **{uploaded_file.name}**")
-        st.info(f"📊 **{len(content):,}** characters • **{word_count:,}** words extracted")
+        st.info(f"📊 **{entry.characters:,}** characters • **{word_count:,}** words extracted")
+        st.caption(f"⏱️ Read {format_throughput(spool.size, spool.seconds)}")
         
-        return content
+        return entry.content_hash
         
+    except UploadTooLargeError as e:
+        st.error(f"❌ {str(e)}")
+        return None
     except Exception as e:
         st.error(f"❌ Error processing file: {str(e)}")
         st.info("💡 Try checking that your file is a valid PDF or text file")
         return None
+    finally:
+        if spool is not None:
+            spool.close()
 
 
 def get_uploaded_content_cloud() -> Optional[str]:
@@ -202,16 +204,15 @@ def get_uploaded_content_cloud() -> Optional[str]:
     Returns:
         Uploaded content if available, None otherwise
     """
-    return st.session_state.get('uploaded_content', None)
+    entry = get_session_upload()
+    return entry.content if entry else None
 
 
 def clear_uploaded_content_cloud():
     """
     Clear uploaded content from session state - Cloud compatible.
     """
-    for key in ['uploaded_content', 'uploaded_filename', 'upload_timestamp']:
-        if key in st.session_state:
-            del st.session_state[key]
+    clear_session_upload()
 
 
 def get_content_stats_cloud(content: str) -> Dict[str, int]:
@@ -252,16 +253,8 @@ def is_cloud_environment() -> bool:
     Returns:
         True if running on Streamlit Cloud, False otherwise
     """
-    # Check common Streamlit Cloud environment indicators
-    cloud_indicators = [
-        'STREAMLIT_CLOUD' in os.environ,
-        'streamlit.app' in os.environ.get('STREAMLIT_SERVER_HEADLESS', ''),
-        '/mount/src' in os.getcwd(),
-        'share.streamlit.io' in os.environ.get('STREAMLIT_SERVER_BASE_URL', ''),
-        os.environ.get('STREAMLIT_RUNTIME_ENVIRONMENT') == 'cloud'
-    ]
-    
-    return any(cloud_indicators)
+    # Detected once per process by the content store module
+    return detect_cloud_environment()
 
 
 # Auto-detect environment and use appropriate functions
@@ -0,0 +1,287 @@
+"""
+Fingerprint module for CV RAG Chatbot.
+Caches content hashes against file stat data and watches the knowledge base
+documents in the background, so Streamlit reruns do no file I/O.
+"""
+
+import hashlib
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+NO_FILE_HASH = "no_file"
+
+_HASH_BLOCK_BYTES = 1024 * 1024
+
+
+@dataclass(frozen=True)
+class FileFingerprint:
+    """Content hash and basic statistics of a file at a given stat state."""
+    path: str
+    content_hash: str
+    size: int
+    mtime_ns: int
+    characters: int
+    words: int
+
+
+@dataclass(frozen=True)
+class KnowledgeBaseFingerprint:
+    """Fingerprints of all knowledge base documents, with one combined hash."""
+    documents: Tuple[FileFingerprint, ...]
+    content_hash: str
+    characters: int
+    words: int
+
+    @classmethod
+    def combine(cls, documents: Sequence[FileFingerprint]) -> "KnowledgeBaseFingerprint":
+        """
+        Combine document fingerprints.
+
+        A single document keeps its own hash, so a one-file knowledge base
+        has the same cache key as before.
+
+        Args:
+            documents: Fingerprints of the documents, in a stable order
+
+        Returns:
+            KnowledgeBaseFingerprint
+        """
+        if len(documents) == 1:
+            content_hash = documents[0].content_hash
+        else:
+            listing = "".join(f"{doc.path}\0{doc.content_hash}\n" for doc in documents)
+            content_hash = hashlib.md5(listing.encode()).hexdigest()
+        return cls(
+            documents=tuple(documents),
+            content_hash=content_hash,
+            characters=sum(doc.characters for doc in documents),
+            words=sum(doc.words for doc in documents)
+        )
+
+
+class FileFingerprinter:
+    """
+    Content hashes cached by (path, size, mtime_ns, inode).
+
+    A file is only re-read and rehashed when its stat data changes. Hashes
+    of text files match get_content_hash() of the decoded text, so they can
+    be used as pipeline cache keys interchangeably. PDFs are hashed as
+    bytes and have no text statistics until they are extracted.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._cache: Dict[str, Tuple[Tuple[int, int, int, int], FileFingerprint]] = {}
+
+    @staticmethod
+    def _stat_key(path: str) -> Tuple[int, int, int, int]:
+        """Stat data that identifies one version of a file."""
+        st = os.stat(path)
+        return (st.st_size, st.st_mtime_ns, st.st_ino, st.st_dev)
+
+    def fingerprint(self, path: str) -> FileFingerprint:
+        """
+        Get the fingerprint of a file, rehashing only if it changed.
+
+        Args:
+            path: File path
+
+        Returns:
+            FileFingerprint for the current file version
+
+        Raises:
+            FileNotFoundError: If the file does not exist
+        """
+        path = os.path.abspath(path)
+        key = self._stat_key(path)
+        with self._lock:
+            cached = self._cache.get(path)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        if path.lower().endswith(".pdf"):
+            digest = hashlib.md5()
+            with open(path, "rb") as f:
+                for block in iter(lambda: f.read(_HASH_BLOCK_BYTES), b""):
+                    digest.update(block)
+            content_hash, characters, words = digest.hexdigest(), 0, 0
+        else:
+            with open(path, "r", encoding="utf-8") as f:
+                content = f.read()
+            content_hash = hashlib.md5(content.encode()).hexdigest()
+            characters, words = len(content), len(content.split())
+        result = FileFingerprint(
+            path=path,
+            content_hash=content_hash,
+            size=key[0],
+            mtime_ns=key[1],
+            characters=characters,
+            words=words
+        )
+        with self._lock:
+            self._cache[path] = (key, result)
+        return result
+
+    def content_hash(self, path: Optional[str]) -> str:
+        """
+        Get the content hash of a file, or NO_FILE_HASH if it is missing.
+
+        Args:
+            path: File path (None means no file)
+
+        Returns:
+            MD5 hash string
+        """
+        if not path:
+            return NO_FILE_HASH
+        try:
+            return self.fingerprint(path).content_hash
+        except FileNotFoundError:
+            return NO_FILE_HASH
+
+    def fingerprint_all(self, paths: Sequence[str]) -> Optional[KnowledgeBaseFingerprint]:
+        """
+        Fingerprint a set of documents, skipping any that cannot be read.
+
+        Args:
+            paths: Document paths, in a stable order
+
+        Returns:
+            KnowledgeBaseFingerprint, or None if no document could be read
+        """
+        documents = []
+        for path in paths:
+            try:
+                documents.append(self.fingerprint(path))
+            except (OSError, UnicodeDecodeError) as e:
+                print(f"Could not fingerprint {path}: {e}")
+        return KnowledgeBaseFingerprint.combine(documents) if documents else None
+
+
+class KnowledgeBaseWatcher:
+    """
+    Background watcher that keeps the knowledge base fingerprint current.
+
+    A daemon thread polls the documents' stat data and rehashes changed
+    files, then notifies listeners (e.g. to rebuild the pipeline) before
+    the next request arrives. Readers only look at the cached fingerprint.
+    """
+
+    def __init__(self, path_resolver: Callable[[], List[str]],
+                 poll_interval: Optional[float] = None,
+                 fingerprinter: Optional[FileFingerprinter] = None):
+        """
+        Initialize the watcher.
+
+        Args:
+            path_resolver: Returns the knowledge base document paths in use
+            poll_interval: Seconds between stat checks (defaults to config)
+            fingerprinter: Fingerprinter to use (defaults to the shared one)
+        """
+        self.path_resolver = path_resolver
+        self.poll_interval = poll_interval or config.watch.poll_interval
+        self.fingerprinter = fingerprinter or get_fingerprinter()
+        self._listeners: List[Callable[[Optional[KnowledgeBaseFingerprint]], None]] = []
+        self._current: Optional[KnowledgeBaseFingerprint] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.refresh(notify=False)
+
+    @property
+    def current(self) -> Optional[KnowledgeBaseFingerprint]:
+        """Latest fingerprint, or None if the knowledge base is missing."""
+        return self._current
+
+    def current_hash(self) -> str:
+        """Latest content hash, or NO_FILE_HASH if the knowledge base is missing."""
+        if self._thread is None:
+            # Not polling in the background: fall back to a stat check on read
+            self.refresh()
+        current = self._current
+        return current.content_hash if current else NO_FILE_HASH
+
+    def add_listener(self, callback: Callable[[Optional[KnowledgeBaseFingerprint]], None]):
+        """Register a callback invoked with the new fingerprint after a change."""
+        self._listeners.append(callback)
+
+    def refresh(self, notify: bool = True) -> bool:
+        """
+        Check the knowledge base now.
+
+        Args:
+            notify: Whether to call listeners if it changed
+
+        Returns:
+            True if the fingerprint changed
+        """
+        latest = self.fingerprinter.fingerprint_all(self.path_resolver())
+
+        previous = self._current
+        changed = (previous.content_hash if previous else None) != (latest.content_hash if latest else None)
+        self._current = latest
+
+        if changed and notify:
+            for callback in list(self._listeners):
+                try:
+                    callback(latest)
+                except Exception as e:
+                    print(f"Knowledge base change listener failed: {e}")
+        return changed
+
+    def _run(self):
+        """Polling loop."""
+        while not self._stop.wait(self.poll_interval):
+            self.refresh()
+
+    def start(self):
+        """Start the background polling thread (idempotent)."""
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(
+                target=self._run, name="kb-watcher", daemon=True
+            )
+            self._thread.start()
+
+    def stop(self):
+        """Stop the background polling thread."""
+        self._stop.set()
+        self._thread = None
+
+
+_fingerprinter = FileFingerprinter()
+_watcher: Optional[KnowledgeBaseWatcher] = None
+_watcher_lock = threading.Lock()
+
+
+def get_fingerprinter() -> FileFingerprinter:
+    """
+    Get the process-wide file fingerprinter.
+
+    Returns:
+        Shared FileFingerprinter instance
+    """
+    return _fingerprinter
+
+
+def get_knowledge_base_watcher() -> KnowledgeBaseWatcher:
+    """
+    Get the process-wide knowledge base watcher, starting it on first use.
+
+    Returns:
+        Shared KnowledgeBaseWatcher instance
+    """
+    global _watcher
+    with _watcher_lock:
+        if _watcher is None:
+            from src.utils.file_processing import get_knowledge_base_documents
+            _watcher = KnowledgeBaseWatcher(get_knowledge_base_documents)
+            if config.watch.enabled:
+                _watcher.start()
+    return _watcher
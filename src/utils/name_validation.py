@@ -0,0 +1,135 @@
+"""
+Name validation module for CV RAG Chatbot.
+Checks that uploaded content mentions the CV owner with one compiled,
+case-insensitive pattern over all name variations, scanning the text once
+and stopping at the first hit. Results are cached by content hash.
+"""
+
+import hashlib
+import os
+import re
+import sys
+import threading
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Dict, Iterable, Optional, Sequence, Tuple
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+if TYPE_CHECKING:
+    from src.core.deadline import Deadline
+
+# Validation results remembered per matcher (one bool per content hash)
+_RESULT_CACHE_ENTRIES = 256
+
+
+class NameMatcher:
+    """Single-pass matcher for a set of name variations."""
+
+    def __init__(self, variations: Sequence[str]):
+        """
+        Compile the variations into one pattern.
+
+        Args:
+            variations: Names to look for (matched case-insensitively)
+        """
+        # Longest first, so the alternation prefers full names
+        names = sorted({name.strip().lower() for name in variations if name.strip()}, key=len, reverse=True)
+        self._pattern = re.compile("|".join(re.escape(name) for name in names), re.IGNORECASE) if names else None
+        # Text carried between blocks so names split across blocks still match
+        self._overlap = len(names[0]) if names else 0
+        self._lock = threading.Lock()
+        self._results: "OrderedDict[str, bool]" = OrderedDict()
+
+    def matches(self, content: str, content_hash: Optional[str] = None) -> bool:
+        """
+        Check content for any variation, reusing the result for known content.
+
+        Args:
+            content: Text content
+            content_hash: get_content_hash() of the content, if already known
+
+        Returns:
+            True if any variation occurs
+        """
+        key = content_hash or hashlib.md5(content.encode()).hexdigest()
+        found = self._cached(key)
+        if found is None:
+            # One regex pass over the original text; stops at the first match
+            found = self._pattern is not None and self._pattern.search(content) is not None
+            self._remember(key, found)
+        return found
+
+    def matches_blocks(self, blocks: Iterable[str], content_hash: str,
+                       deadline: Optional["Deadline"] = None) -> bool:
+        """
+        Check text that arrives as blocks, e.g. ContentStore.segments().
+
+        Blocks are only read when the hash has no cached result, and
+        scanning stops at the first match.
+
+        Args:
+            blocks: Text blocks in order
+            content_hash: get_content_hash() of the joined text
+            deadline: Optional time limit, checked between blocks
+
+        Returns:
+            True if any variation occurs
+
+        Raises:
+            TimeoutError: If the deadline expires before the scan finishes
+                (nothing is cached, so a later call scans again)
+        """
+        found = self._cached(content_hash)
+        if found is None:
+            found = False
+            if self._pattern is not None:
+                tail = ""
+                for block in blocks:
+                    if deadline is not None and deadline.expired():
+                        raise TimeoutError("Name check ran out of time")
+                    window = tail + block
+                    if self._pattern.search(window) is not None:
+                        found = True
+                        break
+                    tail = window[-self._overlap:]
+            self._remember(content_hash, found)
+        return found
+
+    def _cached(self, key: str) -> Optional[bool]:
+        """Cached result for a content hash, or None."""
+        with self._lock:
+            if key in self._results:
+                self._results.move_to_end(key)
+                return self._results[key]
+        return None
+
+    def _remember(self, key: str, found: bool):
+        """Cache the result for a content hash."""
+        with self._lock:
+            self._results[key] = found
+            while len(self._results) > _RESULT_CACHE_ENTRIES:
+                self._results.popitem(last=False)
+
+
+_matchers: Dict[Tuple[str, ...], NameMatcher] = {}
+_matchers_lock = threading.Lock()
+
+
+def get_name_matcher(variations: Optional[Sequence[str]] = None) -> NameMatcher:
+    """
+    Get the shared matcher for a list of name variations.
+
+    Args:
+        variations: Names to look for (defaults to config.name_variations)
+
+    Returns:
+        NameMatcher compiled once per distinct list
+    """
+    key = tuple(variations if variations is not None else config.name_variations or [])
+    with _matchers_lock:
+        matcher = _matchers.get(key)
+        if matcher is None:
+            matcher = _matchers[key] = NameMatcher(key)
+    return matcher
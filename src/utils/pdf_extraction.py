@@ -0,0 +1,354 @@
+"""
+PDF extraction module for CV RAG Chatbot.
+Extracts PDF pages in a process pool with a page limit and timeout, and
+caches page text by page-content hash so re-uploads of edited PDFs only
+re-extract the pages that changed. Pages are yielded in order as they
+finish, so indexing can start before extraction ends.
+"""
+
+import hashlib
+import io
+import multiprocessing
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterator, List, Optional, Set, Tuple, Union
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+# Raw bytes, or a file path (so large PDFs are not sent to every worker)
+PdfSource = Union[bytes, str]
+
+
+@dataclass
+class PdfExtractionResult:
+    """Text of the extracted pages and what could not be extracted."""
+    pages: List[str]
+    total_pages: int
+    truncated: bool = False
+    timed_out: bool = False
+    cached_pages: int = 0
+    errors: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def text(self) -> str:
+        """Page texts joined in page order."""
+        return "\n".join(page for page in self.pages if page).strip()
+
+
+def _open_pdf(source: PdfSource):
+    """Open a PDF from its bytes or a file path."""
+    from pypdf import PdfReader
+
+    return PdfReader(source if isinstance(source, str) else io.BytesIO(source))
+
+
+def _extract_page(reader, page_number: int) -> Tuple[int, Optional[str], Optional[str]]:
+    """Extract one page of an open PDF as (page index, text or None, error message or None)."""
+    try:
+        return page_number, reader.pages[page_number].extract_text() or "", None
+    except Exception as e:
+        return page_number, None, str(e)
+
+
+def _extract_pages(source: PdfSource, page_numbers: List[int]) -> List[Tuple[int, Optional[str], Optional[str]]]:
+    """
+    Extract text from some pages of a PDF (runs in a worker process).
+
+    Args:
+        source: Raw PDF bytes, or the path of the PDF file
+        page_numbers: Zero-based page indices
+
+    Returns:
+        List of (page index, text or None, error message or None)
+    """
+    reader = _open_pdf(source)
+    return [_extract_page(reader, page_number) for page_number in page_numbers]
+
+
+def _hash_pdf_object(digest, obj, seen: Dict[Tuple[int, int], int]):
+    """
+    Feed a PDF object, with indirect references resolved, into a hash.
+
+    Dictionaries are hashed in key order and streams by their data, so
+    fonts and their ToUnicode maps count but object numbers (which change
+    when a PDF is re-saved) do not. Image data is skipped since it does
+    not affect the extracted text.
+
+    Args:
+        digest: hashlib object to update
+        obj: pypdf object
+        seen: Indirect references already hashed, with their visit order
+    """
+    idnum = getattr(obj, "idnum", None)
+    if idnum is not None:
+        ref = (idnum, obj.generation)
+        if ref in seen:
+            digest.update(f"@{seen[ref]}".encode())
+            return
+        seen[ref] = len(seen)
+        obj = obj.get_object()
+
+    if isinstance(obj, dict):
+        digest.update(b"<<")
+        for key in sorted(obj.keys()):
+            if key == "/Parent":
+                continue
+            digest.update(str(key).encode())
+            _hash_pdf_object(digest, obj.raw_get(key), seen)
+        digest.update(b">>")
+        if hasattr(obj, "get_data") and obj.get("/Subtype") != "/Image":
+            digest.update(obj.get_data())
+    elif isinstance(obj, list):
+        digest.update(b"[")
+        for item in obj:
+            _hash_pdf_object(digest, item, seen)
+        digest.update(b"]")
+    else:
+        digest.update(repr(obj).encode())
+
+
+def page_content_hash(page) -> str:
+    """
+    Hash the content stream, resources and size of a PDF page.
+
+    The resources (fonts with their encodings and ToUnicode maps, form
+    XObjects) are included because they change the extracted text even
+    when the content stream is identical.
+
+    Args:
+        page: pypdf PageObject
+
+    Returns:
+        SHA-1 hex digest
+    """
+    digest = hashlib.sha1(str(page.mediabox).encode())
+    contents = page.get_contents()
+    if contents is not None:
+        digest.update(contents.get_data())
+    if "/Resources" in page:
+        _hash_pdf_object(digest, page.raw_get("/Resources"), {})
+    return digest.hexdigest()
+
+
+class PageTextCache:
+    """LRU cache of extracted page text keyed by page-content hash."""
+
+    def __init__(self, max_pages: int):
+        self.max_pages = max_pages
+        self._lock = threading.Lock()
+        self._pages: "OrderedDict[str, str]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            text = self._pages.get(key)
+            if text is not None:
+                self._pages.move_to_end(key)
+            return text
+
+    def put(self, key: str, text: str):
+        with self._lock:
+            self._pages[key] = text
+            self._pages.move_to_end(key)
+            while len(self._pages) > self.max_pages:
+                self._pages.popitem(last=False)
+
+
+_page_cache = PageTextCache(config.pdf.cache_pages)
+
+
+def _new_pool(tasks: int) -> ProcessPoolExecutor:
+    """
+    Worker pool for one extraction (spawned, so workers do not inherit Streamlit threads).
+
+    Each extraction owns its pool, so killing it after a timeout or crash
+    never breaks another session's extraction.
+    """
+    return ProcessPoolExecutor(
+        max_workers=max(1, min(config.pdf.max_workers, tasks)),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _close_pool(pool: ProcessPoolExecutor, kill: bool = False):
+    """Shut an extraction's pool down, terminating its workers if kill is set."""
+    # shutdown() alone lets a worker stuck on a hostile page run on
+    processes = list((pool._processes or {}).values()) if kill else []
+    pool.shutdown(wait=False, cancel_futures=True)
+    for process in processes:
+        if process.is_alive():
+            process.terminate()
+
+
+def iter_pdf_pages(source: PdfSource, result: Optional[PdfExtractionResult] = None,
+                   progress: Optional[Callable[[int, int], None]] = None,
+                   max_pages: Optional[int] = None, timeout: Optional[float] = None) -> Iterator[str]:
+    """
+    Extract the text of a PDF page by page, yielding pages as they finish.
+
+    Cached pages are reused; the rest are extracted in small batches in a
+    worker pool of this extraction's own (inline for short documents).
+    Pages are yielded in page order as soon as all earlier pages are done,
+    so callers can start chunking and indexing before the whole document is
+    extracted. The timeout covers page hashing, inline extraction and the
+    pool; time the caller spends between pages does not count against it.
+
+    Args:
+        source: Raw PDF bytes, or the path of the PDF file
+        result: Filled in with page texts, errors and truncation as pages finish
+        progress: Called with (pages done, pages to extract)
+        max_pages: Only extract this many pages (defaults to config)
+        timeout: Seconds allowed for extraction (defaults to config)
+
+    Yields:
+        Text of each extracted, non-empty page in page order
+
+    Raises:
+        ValueError: If the PDF has no pages
+    """
+    max_pages = max_pages or config.pdf.max_pages
+    deadline = time.monotonic() + (timeout or config.pdf.timeout)
+
+    reader = _open_pdf(source)
+    total_pages = len(reader.pages)
+    if total_pages == 0:
+        raise ValueError("PDF file contains no pages")
+
+    page_count = min(total_pages, max_pages)
+    if result is None:
+        result = PdfExtractionResult(pages=[], total_pages=0)
+    result.pages = [""] * page_count
+    result.total_pages = total_pages
+    result.truncated = total_pages > page_count
+
+    keys: Dict[int, str] = {}
+    pending: List[int] = []
+    finished_pages: Set[int] = set()
+    for page_number in range(page_count):
+        if time.monotonic() >= deadline:
+            # Pages not hashed in time are not extracted either
+            result.timed_out = True
+            break
+        try:
+            keys[page_number] = page_content_hash(reader.pages[page_number])
+        except Exception:
+            pass
+        cached = _page_cache.get(keys[page_number]) if page_number in keys else None
+        if cached is not None:
+            result.pages[page_number] = cached
+            result.cached_pages += 1
+            finished_pages.add(page_number)
+        else:
+            pending.append(page_number)
+
+    done = result.cached_pages
+    next_page = 0
+
+    def record(batch_results):
+        nonlocal done
+        for page_number, text, error in batch_results:
+            finished_pages.add(page_number)
+            if error is not None:
+                result.errors[page_number] = error
+                continue
+            result.pages[page_number] = text
+            if page_number in keys:
+                _page_cache.put(keys[page_number], text)
+        done += len(batch_results)
+        if progress:
+            progress(done, page_count)
+
+    def ready_pages(flush: bool = False) -> List[str]:
+        # Pages whose predecessors are all done (or, when flushing, all finished pages)
+        nonlocal next_page
+        texts = []
+        while next_page < page_count and (next_page in finished_pages or flush):
+            if next_page in finished_pages and result.pages[next_page]:
+                texts.append(result.pages[next_page])
+            next_page += 1
+        return texts
+
+    if progress:
+        progress(done, page_count)
+
+    pool = None
+    futures = {}
+    if result.timed_out:
+        pending = []
+    if len(pending) > config.pdf.inline_page_threshold:
+        batch_size = config.pdf.pages_per_task
+        batches = [pending[i:i + batch_size] for i in range(0, len(pending), batch_size)]
+        try:
+            pool = _new_pool(len(batches))
+            futures = {pool.submit(_extract_pages, source, batch): batch for batch in batches}
+        except Exception as e:
+            # No process pool available here (e.g. restricted sandbox): extract inline
+            print(f"PDF worker pool unavailable, extracting inline: {e}")
+            if pool is not None:
+                _close_pool(pool, kill=True)
+                pool = None
+            futures = {}
+    if not futures:
+        for page_number in pending:
+            if time.monotonic() >= deadline:
+                result.timed_out = True
+                break
+            record([_extract_page(reader, page_number)])
+
+    remaining = set(futures)
+    try:
+        for text in ready_pages():
+            paused = time.monotonic()
+            yield text
+            deadline += time.monotonic() - paused
+        while remaining:
+            finished, remaining = wait(remaining, timeout=max(0.0, deadline - time.monotonic()),
+                                       return_when=FIRST_COMPLETED)
+            if not finished:
+                result.timed_out = True
+                break
+            for future in finished:
+                try:
+                    record(future.result())
+                except Exception as e:
+                    # A worker crashed; the rest of this pool's batches fail the same way
+                    record([(page_number, None, str(e)) for page_number in futures[future]])
+            for text in ready_pages():
+                paused = time.monotonic()
+                yield text
+                deadline += time.monotonic() - paused
+        # Pages after a timeout gap are still returned
+        yield from ready_pages(flush=True)
+    finally:
+        if pool is not None:
+            # Workers still busy (timeout, or the caller stopped early) are killed
+            _close_pool(pool, kill=bool(remaining))
+
+
+def extract_pdf_pages(source: PdfSource, progress: Optional[Callable[[int, int], None]] = None,
+                      max_pages: Optional[int] = None, timeout: Optional[float] = None) -> PdfExtractionResult:
+    """
+    Extract the text of a PDF page by page (see iter_pdf_pages).
+
+    Args:
+        source: Raw PDF bytes, or the path of the PDF file
+        progress: Called with (pages done, pages to extract)
+        max_pages: Only extract this many pages (defaults to config)
+        timeout: Seconds allowed for extraction (defaults to config)
+
+    Returns:
+        PdfExtractionResult with page texts in page order
+
+    Raises:
+        ValueError: If the PDF has no pages
+    """
+    result = PdfExtractionResult(pages=[], total_pages=0)
+    for _ in iter_pdf_pages(source, result, progress=progress, max_pages=max_pages, timeout=timeout):
+        pass
+    return result
@@ -7,6 +7,8 @@ import os
 import streamlit as st
 from typing import Optional, Any, Dict
 
+from src.utils.content_store import get_content_store, is_cloud_environment
+
 
 def is_streamlit_cloud() -> bool:
     """
@@ -15,25 +17,8 @@ def is_streamlit_cloud() -> bool:
     Returns:
         True if running on Streamlit Cloud, False otherwise
     """
-    # Multiple detection methods for reliability
-    cloud_indicators = [
-        # Environment variables set by Streamlit Cloud
-        'STREAMLIT_CLOUD' in os.environ,
-        'GITHUB_REPOSITORY' in os.environ and 'STREAMLIT' in os.environ.get('STREAMLIT_RUNTIME_ENVIRONMENT', ''),
-        
-        # URL-based detection
-        'streamlit.app' in os.environ.get('STREAMLIT_SERVER_BASE_URL', ''),
-        'share.streamlit.io' in os.environ.get('STREAMLIT_SERVER_BASE_URL', ''),
-        
-        # File system indicators
-        '/mount/src' in os.getcwd(),
-        '/app' in os.getcwd() and not os.path.exists('/home'),
-        
-        # Runtime environment
-        os.environ.get('STREAMLIT_RUNTIME_ENVIRONMENT') == 'cloud'
-    ]
-    
-    return any(cloud_indicators)
+    # Detected once per process, not on every call
+    return is_cloud_environment()
 
 
 def smart_file_upload(uploaded_file: Any) -> Optional[str]:
@@ -44,7 +29,7 @@ def smart_file_upload(uploaded_file: Any) -> Optional[str]:
         uploaded_file: Streamlit uploaded file object
         
     Returns:
-        Extracted content if successful, None otherwise
+        Content hash of the extracted text if successful, None otherwise
     """
     try:
         if is_streamlit_cloud():
@@ -77,25 +62,74 @@ def smart_load_uploaded_content() -> Optional[str]:
     """
     try:
         if is_streamlit_cloud():
-            # Use session state
-            return st.session_state.get('uploaded_content', None)
+            # Session state holds the upload digest; text lives in the shared store
+            from src.utils.file_processing_cloud import get_uploaded_content_cloud
+            return get_uploaded_content_cloud()
         else:
             # Use file system
             from src.utils.file_processing import load_uploaded_content
             return load_uploaded_content()
     except Exception:
-        # Fallback to session state
-        return st.session_state.get('uploaded_content', None)
+        # Fallback to the session's upload in the shared store
+        from src.utils.upload_store import get_session_upload
+        entry = get_session_upload()
+        return entry.content if entry else None
+
+
+def smart_get_upload_hash(deadline: Optional[Any] = None) -> Optional[str]:
+    """
+    Get the content hash of the current upload without loading its text.
+    
+    The text is in the shared content store, so pipeline builds read it
+    from there. Locally, the upload file is only read when its content is
+    not stored yet, e.g. after a restart with the memory backend. Either way
+    the name check runs over the stored blocks, and its result is cached by
+    hash.
+    
+    Args:
+        deadline: Optional Deadline for fingerprinting and the name check.
+            Work is skipped once it expires; the fingerprint and name
+            results finished so far stay cached for the next call.
+    
+    Returns:
+        Content hash, or None if there is no valid upload (or no time left)
+    """
+    try:
+        if is_streamlit_cloud():
+            from src.utils.upload_store import get_session_upload
+            entry = get_session_upload()
+            return entry.content_hash if entry else None
+        
+        from src.utils.file_processing import load_uploaded_content
+        from src.utils.fingerprint import NO_FILE_HASH, get_fingerprinter
+        from src.utils.name_validation import get_name_matcher
+        from configs.app_config import config
+        content_hash = get_fingerprinter().content_hash(config.paths.uploaded_content_file)
+        if content_hash == NO_FILE_HASH or (deadline is not None and deadline.expired()):
+            return None
+        store = get_content_store()
+        if content_hash not in store:
+            # Validates the name as it loads
+            content = load_uploaded_content()
+            if not content:
+                return None
+            store.put(content)
+        elif not get_name_matcher().matches_blocks(store.segments(content_hash) or [], content_hash, deadline):
+            st.warning("⚠️ Uploaded content doesn't contain the expected name. Using knowledge base instead.")
+            return None
+        return content_hash
+    except Exception as e:
+        print(f"Could not resolve uploaded content: {e}")
+        return None
 
 
 def smart_clear_uploaded_content():
     """
     Smart content clearing that works both locally and on Streamlit Cloud.
     """
-    # Always clear session state
-    for key in ['uploaded_content', 'uploaded_filename', 'upload_timestamp']:
-        if key in st.session_state:
-            del st.session_state[key]
+    # Always release the session's upload
+    from src.utils.upload_store import clear_session_upload
+    clear_session_upload()
     
     # Also try to clear file system if local
     if not is_streamlit_cloud():
@@ -187,9 +221,12 @@ def display_environment_debug():
         st.subheader("Session State Keys")
         st.write(list(st.session_state.keys()))
         
-        if 'uploaded_content' in st.session_state:
-            content = st.session_state['uploaded_content']
-            st.write(f"Uploaded content length: {len(content)} characters")
+        from src.utils.upload_store import get_session_upload, get_upload_store
+        entry = get_session_upload()
+        if entry is not None:
+            st.write(f"Uploaded content length: {entry.characters} characters")
+        st.write(f"Upload store: {get_upload_store().stats}")
+        st.write(f"Content store: {get_content_store().stats()}")
 
 
 # Environment warning for users
@@ -0,0 +1,171 @@
+"""
+Text decoding module for CV RAG Chatbot.
+Chooses the encoding of a text upload from its byte order mark or a
+bounded prefix sample, then decodes the file once, incrementally. Bytes
+that are invalid in the chosen encoding are decoded as Windows-1252 on the
+spot instead of restarting with another encoding.
+"""
+
+import codecs
+import os
+import sys
+from typing import BinaryIO, Iterable, Iterator, Optional
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+# Longest BOMs first: the UTF-32 LE BOM starts with the UTF-16 LE one
+_BOMS = [
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+]
+
+_FALLBACK_ERRORS = "cv-rag-cp1252-fallback"
+
+
+def _decode_as_cp1252(error: UnicodeError):
+    """Codec error handler: decode the offending bytes as Windows-1252 (Latin-1 where undefined)."""
+    if not isinstance(error, UnicodeDecodeError):
+        raise error
+    raw = error.object[error.start:error.end]
+    try:
+        return raw.decode("cp1252"), error.end
+    except UnicodeDecodeError:
+        return raw.decode("latin-1"), error.end
+
+
+codecs.register_error(_FALLBACK_ERRORS, _decode_as_cp1252)
+
+
+def detect_encoding(prefix: bytes) -> str:
+    """
+    Guess the encoding of a text file from the start of its content.
+
+    Checks for a byte order mark, then for the NUL pattern of BOM-less
+    UTF-16, and otherwise assumes UTF-8. Invalid bytes in a UTF-8 file are
+    not a reason to pick another codec: the decoder's fallback handler
+    reads them as Windows-1252 one sequence at a time, so a single stray
+    byte cannot turn the file's valid UTF-8 into mojibake.
+
+    Args:
+        prefix: First bytes of the file
+
+    Returns:
+        Python codec name
+    """
+    for bom, encoding in _BOMS:
+        if prefix.startswith(bom):
+            return encoding
+
+    sample = prefix[:len(prefix) - len(prefix) % 2]
+    if sample:
+        even_nuls = sample[0::2].count(0)
+        odd_nuls = sample[1::2].count(0)
+        half = len(sample) // 2
+        # ASCII text in UTF-16 has a NUL in every other byte
+        if odd_nuls > half * 0.4 and even_nuls < half * 0.05:
+            return "utf-16-le"
+        if even_nuls > half * 0.4 and odd_nuls < half * 0.05:
+            return "utf-16-be"
+
+    return "utf-8"
+
+
+def iter_decoded_text(stream: BinaryIO, encoding: Optional[str] = None,
+                      block_bytes: Optional[int] = None) -> Iterator[str]:
+    """
+    Decode a binary stream in one incremental pass.
+
+    The encoding is detected from the first block unless given. Bytes that
+    are invalid in that encoding are decoded as Windows-1252, so only the
+    failing sequence falls back, never the whole file.
+
+    Args:
+        stream: Readable binary file object, positioned at the start
+        encoding: Codec to use instead of detecting one
+        block_bytes: Bytes read per block (defaults to config)
+
+    Yields:
+        Decoded blocks of text
+    """
+    block_bytes = max(block_bytes or config.uploads.read_block_bytes, config.uploads.encoding_sample_bytes)
+    block = stream.read(block_bytes)
+    encoding = encoding or detect_encoding(block[:config.uploads.encoding_sample_bytes])
+    decoder = codecs.getincrementaldecoder(encoding)(errors=_FALLBACK_ERRORS)
+
+    while block:
+        text = decoder.decode(block)
+        if text:
+            yield text
+        block = stream.read(block_bytes)
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+def strip_blocks(blocks: Iterable[str]) -> Iterator[str]:
+    """
+    Strip leading and trailing whitespace from text that arrives as blocks.
+
+    Joining the result gives the same text as str.strip() on the joined
+    input. Whitespace at the end of a block is held back until later text
+    shows it is not trailing.
+
+    Args:
+        blocks: Text blocks in order
+
+    Yields:
+        Non-empty stripped blocks
+    """
+    started = False
+    pending = ""
+    for block in blocks:
+        if not started:
+            block = block.lstrip()
+            started = bool(block)
+        body = block.rstrip()
+        if body:
+            yield pending + body
+            pending = block[len(body):]
+        else:
+            pending += block
+
+
+def count_words(blocks: Iterable[str]) -> int:
+    """
+    Count whitespace-separated words in text that arrives as blocks.
+
+    Args:
+        blocks: Text blocks in order
+
+    Returns:
+        Same count as len(text.split()) on the joined text
+    """
+    words = 0
+    joined = False  # Previous block ended inside a word
+    for block in blocks:
+        if not block:
+            continue
+        words += len(block.split())
+        if joined and not block[0].isspace():
+            words -= 1
+        joined = not block[-1].isspace()
+    return words
+
+
+def decode_text(stream: BinaryIO, encoding: Optional[str] = None) -> str:
+    """
+    Decode a whole binary stream (see iter_decoded_text).
+
+    Args:
+        stream: Readable binary file object, positioned at the start
+        encoding: Codec to use instead of detecting one
+
+    Returns:
+        Decoded text
+    """
+    return "".join(iter_decoded_text(stream, encoding))
@@ -0,0 +1,167 @@
+"""
+Upload spooling module for CV RAG Chatbot.
+Copies an uploaded file in bounded blocks into a spooled temporary file,
+hashing it and enforcing the size limit on the way, so large uploads are
+processed from disk without extra in-memory copies.
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import time
+from typing import Any, BinaryIO, Optional, Union
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+
+_MB = 1024 * 1024
+
+
+class UploadTooLargeError(ValueError):
+    """Raised when an upload exceeds the configured size limit."""
+
+
+class UploadSpool:
+    """
+    Spooled copy of one upload.
+
+    Like tempfile.SpooledTemporaryFile, data stays in memory up to
+    memory_limit and moves to a temporary file beyond it. Unlike it, the
+    file on disk has a name, so PDF worker processes can open it by path
+    instead of being sent the bytes.
+    """
+
+    def __init__(self, memory_limit: Optional[int] = None, directory: Optional[str] = None):
+        """
+        Initialize an empty spool.
+
+        Args:
+            memory_limit: Bytes kept in memory before moving to disk (defaults to config)
+            directory: Directory for the temporary file (defaults to config, then the system temp dir)
+        """
+        self.memory_limit = memory_limit or config.uploads.spool_memory_bytes
+        self.directory = directory or config.uploads.spool_directory
+        self.file: BinaryIO = io.BytesIO()
+        self.path: Optional[str] = None
+        self.size = 0
+        self.digest = ""
+        self.seconds = 0.0
+
+    def write(self, data: bytes):
+        """Append bytes, moving the spool to disk once it outgrows memory_limit."""
+        if self.path is None and self.size + len(data) > self.memory_limit:
+            self._rollover()
+        self.file.write(data)
+        self.size += len(data)
+
+    def _rollover(self):
+        """Move the in-memory data to a named temporary file."""
+        fd, path = tempfile.mkstemp(prefix="cv-rag-upload-", suffix=".spool", dir=self.directory)
+        spooled = os.fdopen(fd, "w+b")
+        spooled.write(self.file.getvalue())
+        self.file.close()
+        self.file, self.path = spooled, path
+
+    def stream(self) -> BinaryIO:
+        """
+        The spooled data as a readable binary file, rewound to the start.
+
+        Returns:
+            File object owned by the spool
+        """
+        self.file.flush()
+        self.file.seek(0)
+        return self.file
+
+    def source(self) -> Union[str, bytes]:
+        """
+        The spooled data for PDF extraction.
+
+        Returns:
+            Path of the temporary file if on disk, else the bytes
+        """
+        if self.path is not None:
+            self.file.flush()
+            return self.path
+        return self.file.getvalue()
+
+    def close(self):
+        """Release the memory or delete the temporary file."""
+        self.file.close()
+        if self.path is not None:
+            try:
+                os.remove(self.path)
+            except OSError:
+                pass
+            self.path = None
+
+    def __enter__(self) -> "UploadSpool":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def spool_upload(uploaded_file: Any, max_bytes: Optional[int] = None,
+                 block_bytes: Optional[int] = None) -> UploadSpool:
+    """
+    Copy an uploaded file into a spool, hashing it as it is read.
+
+    Args:
+        uploaded_file: Streamlit uploaded file object (or any binary file)
+        max_bytes: Size limit (defaults to config)
+        block_bytes: Bytes copied at a time (defaults to config)
+
+    Returns:
+        UploadSpool with the data, its SHA-256 digest (the upload store
+        key) and the copy time
+
+    Raises:
+        UploadTooLargeError: If the upload exceeds max_bytes
+    """
+    max_bytes = max_bytes or config.uploads.max_bytes
+    block_bytes = block_bytes or config.uploads.read_block_bytes
+    too_large = UploadTooLargeError(f"File too large. Maximum size is {max_bytes / _MB:.0f} MB.")
+
+    # Reject early when the size is known up front
+    if (getattr(uploaded_file, "size", None) or 0) > max_bytes:
+        raise too_large
+
+    started = time.monotonic()
+    digest = hashlib.sha256()
+    spool = UploadSpool()
+    try:
+        uploaded_file.seek(0)
+        while True:
+            block = uploaded_file.read(block_bytes)
+            if not block:
+                break
+            if spool.size + len(block) > max_bytes:
+                raise too_large
+            digest.update(block)
+            spool.write(block)
+    except BaseException:
+        spool.close()
+        raise
+
+    spool.digest = digest.hexdigest()
+    spool.seconds = time.monotonic() - started
+    return spool
+
+
+def format_throughput(size_bytes: int, seconds: float) -> str:
+    """
+    Describe how fast an upload was read.
+
+    Args:
+        size_bytes: Bytes processed
+        seconds: Time taken
+
+    Returns:
+        Text like "12.3 MB in 0.08s (150 MB/s)"
+    """
+    rate = size_bytes / _MB / max(seconds, 1e-6)
+    return f"{size_bytes / _MB:.1f} MB in {seconds:.2f}s ({rate:,.0f} MB/s)"
@@ -0,0 +1,301 @@
+"""
+Upload store module for CV RAG Chatbot.
+Content-addressed index of extracted uploads, keyed by a hash of the raw
+file bytes and shared by all sessions, so repeat uploads of the same file
+skip extraction and reuse the already built index. The text itself lives
+once in the shared content store.
+"""
+
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, Iterable, List, Optional, Set
+
+# Add the parent directory to sys.path to import config
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..')))
+from configs.app_config import config
+import streamlit as st
+from src.utils.content_store import get_content_store
+
+
+@dataclass
+class UploadEntry:
+    """One extracted upload, shared by the sessions using it."""
+    digest: str
+    content_hash: str
+    characters: int
+    filename: str
+    refs: Set[str] = field(default_factory=set)
+
+    @property
+    def content(self) -> Optional[str]:
+        """Extracted text, decoded from the content store."""
+        return get_content_store().get(self.content_hash)
+
+
+class UploadStore:
+    """
+    Reference-counted, content-addressed store of extracted uploads.
+
+    Sessions hold a reference to the digest of their current upload. When
+    the last reference is released, the entry is kept as idle for reuse and
+    evicted least recently used beyond max_idle_entries, invalidating its
+    pipeline. References of sessions not seen for session_ttl seconds are
+    released, since Streamlit gives no session-end signal.
+    """
+
+    def __init__(self, max_idle_entries: Optional[int] = None, session_ttl: Optional[float] = None):
+        """
+        Initialize the store.
+
+        Args:
+            max_idle_entries: Unreferenced uploads kept for reuse (defaults to config)
+            session_ttl: Seconds before an inactive session's reference expires (defaults to config)
+        """
+        self.max_idle_entries = max_idle_entries if max_idle_entries is not None else config.uploads.max_idle_entries
+        self.session_ttl = session_ttl or config.uploads.session_ttl
+        self._lock = threading.Lock()
+        self._entries: Dict[str, UploadEntry] = {}
+        self._idle: "OrderedDict[str, None]" = OrderedDict()
+        self._sessions: Dict[str, str] = {}
+        self._last_seen: Dict[str, float] = {}
+        self.stats = {"extractions": 0, "reuses": 0, "evictions": 0}
+
+    def get(self, digest: str) -> Optional[UploadEntry]:
+        """
+        Look up an upload by raw-bytes digest.
+
+        Args:
+            digest: Digest of the raw file bytes
+
+        Returns:
+            UploadEntry if the file was already extracted, else None
+        """
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is not None:
+                self.stats["reuses"] += 1
+                if digest in self._idle:
+                    self._idle.move_to_end(digest)
+            return entry
+
+    def put(self, digest: str, content: str, filename: str) -> UploadEntry:
+        """
+        Store extracted text for a digest.
+
+        Args:
+            digest: Digest of the raw file bytes
+            content: Extracted text
+            filename: Original file name
+
+        Returns:
+            The stored UploadEntry
+        """
+        return self.put_blocks(digest, [content], filename)
+
+    def put_blocks(self, digest: str, blocks: Iterable[str], filename: str) -> UploadEntry:
+        """
+        Store extracted text that arrives as blocks (see ContentStore.put_blocks).
+
+        Empty text is not kept, so a failed extraction is retried on the
+        next upload of the same file.
+
+        Args:
+            digest: Digest of the raw file bytes
+            blocks: Extracted text blocks in order
+            filename: Original file name
+
+        Returns:
+            The stored UploadEntry (unstored, with no characters, if the text was empty)
+        """
+        content_hash, characters = get_content_store().put_blocks(blocks)
+        if not characters:
+            return UploadEntry(digest=digest, content_hash=content_hash, characters=0, filename=filename)
+        with self._lock:
+            entry = self._entries.get(digest)
+            if entry is None:
+                entry = UploadEntry(digest=digest, content_hash=content_hash,
+                                    characters=characters, filename=filename)
+                self._entries[digest] = entry
+                self._idle[digest] = None
+                self.stats["extractions"] += 1
+            evicted = self._evict_idle()
+        self._invalidate_pipelines(evicted)
+        return entry
+
+    def acquire(self, session_id: str, digest: str):
+        """
+        Make a digest the session's current upload, releasing its previous one.
+
+        Args:
+            session_id: Streamlit session identifier
+            digest: Digest of a stored upload
+        """
+        with self._lock:
+            self._last_seen[session_id] = time.monotonic()
+            previous = self._sessions.get(session_id)
+            if previous == digest or digest not in self._entries:
+                evicted = []
+            else:
+                if previous is not None:
+                    self._release_locked(session_id, previous)
+                self._sessions[session_id] = digest
+                self._entries[digest].refs.add(session_id)
+                self._idle.pop(digest, None)
+                self._expire_sessions()
+                evicted = self._evict_idle()
+        self._invalidate_pipelines(evicted)
+
+    def release(self, session_id: str):
+        """
+        Release the session's current upload.
+
+        Args:
+            session_id: Streamlit session identifier
+        """
+        with self._lock:
+            digest = self._sessions.pop(session_id, None)
+            self._last_seen.pop(session_id, None)
+            if digest is not None:
+                self._release_locked(session_id, digest)
+            evicted = self._evict_idle()
+        self._invalidate_pipelines(evicted)
+
+    def session_entry(self, session_id: str) -> Optional[UploadEntry]:
+        """
+        Get the session's current upload, refreshing its reference.
+
+        Args:
+            session_id: Streamlit session identifier
+
+        Returns:
+            UploadEntry, or None if the session has no upload
+        """
+        with self._lock:
+            digest = self._sessions.get(session_id)
+            if digest is None:
+                return None
+            self._last_seen[session_id] = time.monotonic()
+            return self._entries.get(digest)
+
+    def _release_locked(self, session_id: str, digest: str):
+        """Drop one session reference (lock held)."""
+        entry = self._entries.get(digest)
+        if entry is not None:
+            entry.refs.discard(session_id)
+            if not entry.refs:
+                self._idle[digest] = None
+
+    def _expire_sessions(self):
+        """Release references of sessions inactive for session_ttl (lock held)."""
+        cutoff = time.monotonic() - self.session_ttl
+        for session_id in [s for s, seen in self._last_seen.items() if seen < cutoff]:
+            digest = self._sessions.pop(session_id, None)
+            del self._last_seen[session_id]
+            if digest is not None:
+                self._release_locked(session_id, digest)
+
+    def _evict_idle(self) -> List[str]:
+        """Evict least recently used unreferenced uploads over the limit (lock held)."""
+        evicted = []
+        while len(self._idle) > self.max_idle_entries:
+            digest, _ = self._idle.popitem(last=False)
+            entry = self._entries.pop(digest, None)
+            if entry is not None:
+                self.stats["evictions"] += 1
+                # Different files can extract to the same text
+                if not any(other.content_hash == entry.content_hash for other in self._entries.values()):
+                    evicted.append(entry.content_hash)
+        return evicted
+
+    @staticmethod
+    def _invalidate_pipelines(content_hashes: List[str]):
+        """Drop the text and pipelines of evicted uploads."""
+        if not content_hashes:
+            return
+        from src.core.personas import get_persona_registry, pipeline_cache_key
+        from src.core.pipeline_builder import get_pipeline_build_manager
+        from src.core.pipeline_registry import get_pipeline_registry
+        store = get_content_store()
+        registry = get_pipeline_registry()
+        manager = get_pipeline_build_manager()
+        persona_ids = [p.persona_id for p in get_persona_registry().personas()]
+        for content_hash in content_hashes:
+            store.discard(content_hash)
+            # The text is gone, so nothing can rebuild these: drop them from
+            # the build manager too instead of only marking them stale
+            for persona in persona_ids:
+                key = pipeline_cache_key(content_hash, True, persona)
+                registry.remove(key)
+                manager.forget(key)
+
+
+_upload_store: Optional[UploadStore] = None
+_upload_store_lock = threading.Lock()
+
+
+def get_upload_store() -> UploadStore:
+    """
+    Get the process-wide upload store.
+
+    Returns:
+        Shared UploadStore instance
+    """
+    global _upload_store
+    with _upload_store_lock:
+        if _upload_store is None:
+            _upload_store = UploadStore()
+    return _upload_store
+
+
+def _session_id() -> str:
+    """Identifier of the current Streamlit session."""
+    if "session_id" not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    return st.session_state.session_id
+
+
+def get_session_upload() -> Optional[UploadEntry]:
+    """
+    Get the current session's uploaded content from the shared store.
+
+    Returns:
+        UploadEntry, or None if the session has no (unexpired) upload
+    """
+    if "uploaded_digest" not in st.session_state:
+        return None
+    store = get_upload_store()
+    entry = store.session_entry(_session_id())
+    if entry is None:
+        # Reference expired or evicted: re-acquire if the text is still stored
+        store.acquire(_session_id(), st.session_state.uploaded_digest)
+        entry = store.session_entry(_session_id())
+    return entry
+
+
+def set_session_upload(digest: str, filename: str):
+    """
+    Point the current session at a stored upload.
+
+    Session state only holds the digest; the text lives in the shared store.
+
+    Args:
+        digest: Digest of the raw file bytes
+        filename: Original file name
+    """
+    get_upload_store().acquire(_session_id(), digest)
+    st.session_state.uploaded_digest = digest
+    st.session_state.uploaded_filename = filename
+
+
+def clear_session_upload():
+    """Release the current session's upload."""
+    if "session_id" in st.session_state:
+        get_upload_store().release(st.session_state.session_id)
+    for key in ['uploaded_digest', 'uploaded_filename', 'upload_timestamp']:
+        if key in st.session_state:
+            del st.session_state[key]
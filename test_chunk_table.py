@@ -0,0 +1,76 @@
+"""
+Unit tests for the offset-based chunk table docstore.
+
+Usage:
+    python -m unittest test_chunk_table
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.chunk_table import ChunkTable, MergedChunkTables, chunk_hash
+from src.core.cv_sections import chunk_sections
+
+TEXT = (
+    "Summary\n"
+    "Data scientist in Malmö — “search” and ranking, 日本語 basics 🚀\n"
+    "\n"
+    "Experience\n"
+    "- Ünïcode AB, Göteborg, 2019–2023\n"
+    "- Café Labs, Tromsø, 2015–2019\n"
+)
+
+
+def build_table(text, chunk_size=40):
+    """Table over the section chunks of text, with the source attached."""
+    table = ChunkTable()
+    chunks = list(chunk_sections([text], chunk_size=chunk_size, chunk_overlap=5))
+    for chunk in chunks:
+        table.append(chunk)
+    table.attach(text.encode("utf-8"))
+    return table, chunks
+
+
+class ChunkTableTest(unittest.TestCase):
+    def test_text_round_trips_over_utf8_offsets(self):
+        table, chunks = build_table(TEXT)
+        self.assertGreater(len(table), 3)
+        for row, chunk in enumerate(chunks):
+            self.assertEqual(table.text(row), chunk.text)
+            self.assertEqual(table.metadata(row)["hash"], f"{chunk_hash(chunk.text):016x}")
+
+    def test_search_builds_documents(self):
+        table, chunks = build_table(TEXT)
+        document = table.search(str(len(chunks) - 1))
+        self.assertEqual(document.page_content, chunks[-1].text)
+        self.assertEqual(document.metadata["section"], "Experience")
+        self.assertEqual(table.search(len(chunks)), f"ID {len(chunks)} not found.")
+
+    def test_text_needs_source(self):
+        table = ChunkTable()
+        table.append(next(chunk_sections([TEXT])))
+        with self.assertRaises(ValueError):
+            table.text(0)
+
+    def test_identical_sources_are_shared(self):
+        first, _ = build_table(TEXT)
+        second, _ = build_table(TEXT)
+        self.assertIs(first.source, second.source)
+
+    def test_merged_tables_route_rows_to_their_source(self):
+        first, first_chunks = build_table(TEXT)
+        other = "Skills\nPython, SQL, Rust — and a little Go\n"
+        second, second_chunks = build_table(other)
+        merged = MergedChunkTables([("cv.pdf", first), ("skills.txt", second)])
+
+        self.assertEqual(len(merged), len(first_chunks) + len(second_chunks))
+        document = merged.search(len(first_chunks))
+        self.assertEqual(document.page_content, second_chunks[0].text)
+        self.assertEqual(document.metadata["source"], "skills.txt")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for structure-aware CV chunking.
+
+Usage:
+    python -m unittest test_cv_sections
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.cv_sections import DEFAULT_SECTION, chunk_sections
+
+CV_TEXT = (
+    "Jane Doe — Data Scientist\n"
+    "Malmö, Sweden\n"
+    "\n"
+    "EXPERIENCE\n"
+    "- Senior engineer at Ünïcode AB, 2019–2023, building search\n"
+    "- Researcher at Café Labs, 2015–2019\n"
+    "\n"
+    "## Education\n"
+    "PhD in Computer Science, Universitet i Tromsø\n"
+    "\n"
+    "Skills\n"
+    "Python, SQL, “retrieval”, Rust\n"
+)
+
+
+def split_every(text, size):
+    """Cut text into fixed-size segments, ignoring line boundaries."""
+    return [text[i:i + size] for i in range(0, len(text), size)]
+
+
+class ChunkSectionsTest(unittest.TestCase):
+    def assert_offsets_round_trip(self, text, chunks):
+        encoded = text.encode("utf-8")
+        for chunk in chunks:
+            self.assertEqual(encoded[chunk.start:chunk.end].decode("utf-8"), chunk.text)
+
+    def test_offsets_are_utf8_byte_offsets(self):
+        chunks = list(chunk_sections([CV_TEXT], chunk_size=80, chunk_overlap=10))
+        self.assertGreater(len(chunks), 3)
+        self.assert_offsets_round_trip(CV_TEXT, chunks)
+
+    def test_segment_boundaries_do_not_change_chunks(self):
+        whole = list(chunk_sections([CV_TEXT], chunk_size=80, chunk_overlap=10))
+        for size in (1, 7, 64):
+            self.assertEqual(list(chunk_sections(split_every(CV_TEXT, size), chunk_size=80, chunk_overlap=10)), whole)
+
+    def test_headings_set_sections(self):
+        chunks = list(chunk_sections([CV_TEXT], chunk_size=200, chunk_overlap=0))
+        sections = [chunk.section for chunk in chunks]
+        self.assertEqual(sections[0], DEFAULT_SECTION)
+        self.assertEqual(sections[1:], ["Experience", "Education", "Skills"])
+        self.assertTrue(chunks[1].text.startswith("EXPERIENCE\n- Senior engineer"))
+
+    def test_list_items_are_not_split(self):
+        chunks = list(chunk_sections([CV_TEXT], chunk_size=70, chunk_overlap=0))
+        texts = [chunk.text for chunk in chunks]
+        self.assertTrue(any(text.endswith("- Researcher at Café Labs, 2015–2019") for text in texts))
+        self.assertTrue(any("- Senior engineer at Ünïcode AB, 2019–2023, building search" in text for text in texts))
+
+    def test_oversized_line_pieces_keep_offsets(self):
+        text = "Summary\n" + " ".join(f"wörd{i}" for i in range(60)) + "\n"
+        chunks = list(chunk_sections([text], chunk_size=50, chunk_overlap=10))
+        self.assertGreater(len(chunks), 3)
+        self.assertTrue(all(len(chunk.text) <= 50 for chunk in chunks))
+        self.assert_offsets_round_trip(text, chunks)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+"""
+Unit tests for near-duplicate chunk detection.
+
+Usage:
+    python -m unittest test_dedup
+"""
+
+import os
+import sys
+import unittest
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.cv_sections import Chunk
+from src.core.dedup import NearDuplicateFilter, drop_near_duplicates
+from src.core.ingestion import ingest
+
+ITEM = ("Led the migration of the recommendation service to Kubernetes, "
+        "cutting deployment time from two hours to ten minutes for the whole team")
+
+
+class NearDuplicateFilterTest(unittest.TestCase):
+    def setUp(self):
+        self.near_filter = NearDuplicateFilter(threshold=0.7, num_perm=64, bands=16, shingle_words=3)
+
+    def test_new_chunks_are_kept_in_order(self):
+        self.assertIsNone(self.near_filter.add(ITEM))
+        self.assertIsNone(self.near_filter.add("PhD in Computer Science from the University of Oslo, 2014"))
+        self.assertEqual(self.near_filter.add(ITEM), 0)
+
+    def test_exact_match_ignores_case_and_punctuation(self):
+        self.near_filter.add(ITEM)
+        self.assertEqual(self.near_filter.add("- " + ITEM.upper() + "."), 0)
+
+    def test_near_duplicate_is_caught(self):
+        self.near_filter.add("PhD in Computer Science from the University of Oslo, 2014")
+        self.near_filter.add(ITEM)
+        self.assertEqual(self.near_filter.add(ITEM.replace("ten minutes", "twelve minutes")), 1)
+
+    def test_bands_must_divide_signature(self):
+        with self.assertRaises(ValueError):
+            NearDuplicateFilter(num_perm=64, bands=10)
+
+    def test_drop_near_duplicates_groups_copies(self):
+        chunks = [
+            Chunk(ITEM, 0, 100, "Experience"),
+            Chunk("Python, SQL, Rust", 101, 118, "Skills"),
+            Chunk(ITEM, 119, 219, "Summary"),
+        ]
+        groups = {}
+        kept = list(drop_near_duplicates(chunks, groups, self.near_filter))
+        self.assertEqual(kept, chunks[:2])
+        self.assertEqual(list(groups), [0])
+        self.assertEqual(groups[0].sections, ["Summary"])
+        self.assertEqual(groups[0].spans, [(119, 219)])
+
+
+class MergedSectionRetrievalTest(unittest.TestCase):
+    def test_representative_matches_sections_of_dropped_copies(self):
+        from src.core.simple_rag import SimpleRAGPipeline
+
+        text = f"Summary\n{ITEM}\n\nSkills\nPython, SQL, Rust\n\nExperience\n{ITEM}\n"
+        vectorstore, stats = ingest([text], section_aware=True, dedup=True)
+        self.assertEqual(stats.duplicates, 1)
+
+        pipeline = SimpleNamespace(vectorstore=vectorstore)
+        # The Skills chunk is the better match overall; the section filter must still pick the merged one
+        docs = SimpleRAGPipeline._retrieve(pipeline, "Python, SQL, Rust", k=1, section="Experience")
+        self.assertIn("Kubernetes", docs[0].page_content)
+        self.assertEqual(docs[0].metadata["sections"], ["Experience", "Summary"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+"""
+Unit tests for the out-of-scope question guardrail.
+
+Usage:
+    python -m unittest test_guardrails
+"""
+
+import hashlib
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.embeddings import SimpleHashEmbeddings
+from src.core.guardrails import ScopeGuardrail, get_guardrail
+
+
+class ScopeGuardrailTest(unittest.TestCase):
+    def setUp(self):
+        self.guardrail = ScopeGuardrail()
+
+    def test_refuses_personal_questions(self):
+        for question in [
+            "What is his salary?",
+            "What salary does he expect?",
+            "Does he have kids?",
+            "Is he married?",
+            "Who does he vote for?",
+            "What is his phone number?",
+        ]:
+            with self.subTest(question=question):
+                self.assertTrue(self.guardrail.classify(question).blocked)
+
+    def test_allows_ml_terms_that_overlap_personal_topics(self):
+        for question in [
+            "Has he used voting ensembles?",
+            "Did he work on reward and compensation modelling?",
+            "Did he build a salary prediction model?",
+            "Has he analysed election forecasting data?",
+            "Did he teach kids programming?",
+            "What church projects did he build?",
+            "Did he help run his family business?",
+        ]:
+            with self.subTest(question=question):
+                self.assertFalse(self.guardrail.classify(question).blocked)
+
+    def test_refuses_personal_context_for_project_terms(self):
+        for question in ["Does he go to church?", "Which mosque does he attend?", "Tell me about his family life."]:
+            with self.subTest(question=question):
+                self.assertTrue(self.guardrail.classify(question).blocked)
+
+    def test_name_rules_follow_the_persona(self):
+        guardrail = ScopeGuardrail(name_variations=["Maria Lopez", "Maria"], refusal_message="Ask Maria.")
+        self.assertTrue(guardrail.classify("Where does Maria live?").blocked)
+        self.assertFalse(guardrail.classify("Where does Abdolamir live?").blocked)
+        self.assertEqual(guardrail.check("Where does Maria live?"), "Ask Maria.")
+        self.assertIn("maria", guardrail._stopwords)
+        self.assertNotIn("abdolamir", guardrail._stopwords)
+
+    def test_one_shared_guardrail_per_persona(self):
+        self.assertIs(get_guardrail(["Maria Lopez"]), get_guardrail(["Maria Lopez"]))
+        self.assertIsNot(get_guardrail(["Maria Lopez"]), get_guardrail())
+
+    def test_embeddings_do_not_depend_on_the_process_hash_seed(self):
+        # hash() of a str changes with PYTHONHASHSEED; the bucket must not
+        digest = hashlib.blake2b(b"salary", digest_size=8).digest()
+        expected = int.from_bytes(digest, "little") % 384
+        vector = SimpleHashEmbeddings(dimension=384).embed_query("salary")
+        self.assertEqual(vector.index(1.0), expected)
+
+
+if __name__ == "__main__":
+    unittest.main()
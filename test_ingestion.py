@@ -0,0 +1,53 @@
+"""
+Unit tests for the streaming ingestion chunker and chunk table source.
+
+Usage:
+    python -m unittest test_ingestion
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.chunk_table import ChunkTable
+from src.core.ingestion import chunk_segments, iter_text_segments
+
+TEXT = " ".join(f"Worked on prøject {i} with Python and SQL." for i in range(200))
+
+
+class ChunkSegmentsTest(unittest.TestCase):
+    def assert_offsets_round_trip(self, text, chunks):
+        encoded = text.encode("utf-8")
+        for chunk in chunks:
+            self.assertEqual(encoded[chunk.start:chunk.end].decode("utf-8"), chunk.text)
+
+    def test_streamed_chunks_keep_offsets(self):
+        chunks = list(chunk_segments(iter_text_segments(TEXT, 37), chunk_size=100, chunk_overlap=20))
+        self.assertGreater(len(chunks), 50)
+        self.assertTrue(all(len(chunk.text) <= 100 for chunk in chunks))
+        self.assertTrue(chunks[-1].text.endswith("prøject 199 with Python and SQL."))
+        self.assert_offsets_round_trip(TEXT, chunks)
+
+    def test_whitespace_run_is_cut_not_buffered(self):
+        text = "Summary line\n" + " " * 5000 + "\nSkills: Python, SQL\n"
+        chunks = list(chunk_segments(iter_text_segments(text, 50), chunk_size=100, chunk_overlap=20))
+        self.assertEqual([chunk.text for chunk in chunks], ["Summary line", "Skills: Python, SQL"])
+        self.assert_offsets_round_trip(text, chunks)
+
+
+class ChunkTableSourceTest(unittest.TestCase):
+    def test_view_source_is_not_copied(self):
+        source = bytearray("Café Labs, Tromsø".encode("utf-8"))
+        chunks = list(chunk_segments([source.decode("utf-8")], chunk_size=100, chunk_overlap=0))
+        table = ChunkTable()
+        for chunk in chunks:
+            table.append(chunk)
+        table.attach(memoryview(source))
+        self.assertEqual(table.text(0), "Café Labs, Tromsø")
+        self.assertIs(table.source.data.obj, source)
+
+
+if __name__ == "__main__":
+    unittest.main()
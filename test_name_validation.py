@@ -0,0 +1,65 @@
+"""
+Unit tests for the single-pass name matcher.
+
+Usage:
+    python -m unittest test_name_validation
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.deadline import Deadline
+from src.utils.name_validation import NameMatcher, get_name_matcher
+
+
+class NameMatcherTest(unittest.TestCase):
+    def setUp(self):
+        self.matcher = NameMatcher(["Jane Doe", " doe ", "J. Doe", ""])
+
+    def test_matches_case_insensitively(self):
+        self.assertTrue(self.matcher.matches("Curriculum vitae of JANE DOE"))
+        self.assertTrue(self.matcher.matches("by j. doe, 2024"))
+        self.assertFalse(self.matcher.matches("Curriculum vitae of John Smith"))
+
+    def test_names_are_literal(self):
+        # "." in "J. Doe" is not a regex wildcard
+        self.assertFalse(NameMatcher(["J. Smith"]).matches("JX Smith"))
+
+    def test_no_variations_never_match(self):
+        self.assertFalse(NameMatcher([]).matches("Jane Doe"))
+        self.assertFalse(NameMatcher([" "]).matches_blocks(["Jane Doe"], "h"))
+
+    def test_result_cached_by_content_hash(self):
+        self.assertTrue(self.matcher.matches("Jane Doe", "h1"))
+        # Same hash: the cached result is returned without scanning
+        self.assertTrue(self.matcher.matches("nobody", "h1"))
+        self.assertFalse(self.matcher.matches("nobody", "h2"))
+
+    def test_matches_name_split_across_blocks(self):
+        self.assertTrue(self.matcher.matches_blocks(["... written by Ja", "ne D", "oe."], "split"))
+        self.assertFalse(self.matcher.matches_blocks(["Jane ", "Smith"], "other"))
+
+    def test_blocks_not_read_for_known_hash(self):
+        self.matcher.matches("Jane Doe", "known")
+
+        def blocks():
+            raise AssertionError("blocks were read")
+            yield ""
+
+        self.assertTrue(self.matcher.matches_blocks(blocks(), "known"))
+
+    def test_expired_deadline_stops_scan_uncached(self):
+        with self.assertRaises(TimeoutError):
+            self.matcher.matches_blocks(["Jane Doe"], "late", Deadline(0.0))
+        self.assertTrue(self.matcher.matches_blocks(["Jane Doe"], "late"))
+
+    def test_shared_matcher_per_variation_list(self):
+        self.assertIs(get_name_matcher(["a", "b"]), get_name_matcher(["a", "b"]))
+        self.assertIsNot(get_name_matcher(["a", "b"]), get_name_matcher(["a"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the memory-budgeted pipeline registry.
+
+Usage:
+    python -m unittest test_pipeline_registry
+"""
+
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.core.pipeline_registry import PipelineRegistry
+
+
+class PipelineRegistryTest(unittest.TestCase):
+    def test_evicts_least_recently_used_over_byte_budget(self):
+        registry = PipelineRegistry(max_bytes=100, max_entries=10)
+        evicted = []
+        registry.add_eviction_listener(evicted.append)
+        registry.put("a", {"n": "a"}, size_bytes=40)
+        registry.put("b", {"n": "b"}, size_bytes=40)
+        registry.get("a")  # b is now least recently used
+        registry.put("c", {"n": "c"}, size_bytes=40)
+
+        self.assertEqual(evicted, ["b"])
+        self.assertIsNone(registry.get("b"))
+        self.assertEqual(registry.get("a"), {"n": "a"})
+        self.assertEqual(registry.stats()["bytes"], 80)
+
+    def test_evicts_over_entry_limit(self):
+        registry = PipelineRegistry(max_bytes=10 ** 9, max_entries=2)
+        for key in "abc":
+            registry.put(key, {}, size_bytes=1)
+        self.assertIsNone(registry.get("a"))
+        self.assertEqual(registry.stats()["entries"], 2)
+
+    def test_protected_entry_survives_and_only_one_is_protected(self):
+        registry = PipelineRegistry(max_bytes=100, max_entries=10)
+        registry.put("kb1", {}, protected=True, size_bytes=60)
+        registry.put("upload", {}, size_bytes=60)
+        # Over budget, but the protected entry and the new entry both stay
+        self.assertIsNotNone(registry.get("kb1"))
+        self.assertIsNotNone(registry.get("upload"))
+
+        # Protecting a new knowledge base version releases the old one
+        registry.put("kb2", {}, protected=True, size_bytes=60)
+        self.assertIsNone(registry.get("kb1"))
+        self.assertIsNotNone(registry.get("kb2"))
+
+    def test_remove_and_scoped_invalidate_keep_accounting(self):
+        registry = PipelineRegistry(max_bytes=1000, max_entries=10)
+        registry.put("h1_True", {}, size_bytes=10, content_hash="h1", resource_type="simple")
+        registry.put("h1_False", {}, size_bytes=20, content_hash="h1", resource_type="chain")
+        registry.put("h2_True", {}, size_bytes=30, content_hash="h2", resource_type="simple")
+
+        self.assertEqual(registry.invalidate(content_hash="h1", resource_type="simple"), ["h1_True"])
+        self.assertTrue(registry.remove("h2_True"))
+        self.assertFalse(registry.remove("h2_True"))
+        self.assertEqual(registry.stats()["bytes"], 20)
+
+    def test_stale_entry_misses_but_stays_counted_until_replaced(self):
+        registry = PipelineRegistry(max_bytes=1000, max_entries=10)
+        registry.put("h_True", {"v": 1}, size_bytes=100)
+        self.assertEqual(registry.mark_stale("h_True"), ["h_True"])
+
+        self.assertIsNone(registry.get("h_True"))
+        self.assertEqual(registry.stats()["bytes"], 100)
+
+        registry.put("h_True", {"v": 2}, size_bytes=120)
+        self.assertEqual(registry.get("h_True"), {"v": 2})
+        self.assertEqual(registry.stats()["bytes"], 120)
+
+
+if __name__ == "__main__":
+    unittest.main()
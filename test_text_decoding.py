@@ -0,0 +1,74 @@
+"""
+Unit tests for text upload encoding detection and decoding.
+
+Usage:
+    python -m unittest test_text_decoding
+"""
+
+import codecs
+import io
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.text_decoding import count_words, decode_text, detect_encoding, iter_decoded_text, strip_blocks
+
+
+class DetectEncodingTest(unittest.TestCase):
+    def test_byte_order_marks(self):
+        self.assertEqual(detect_encoding(codecs.BOM_UTF8 + b"abc"), "utf-8-sig")
+        self.assertEqual(detect_encoding(codecs.BOM_UTF16_LE + "abc".encode("utf-16-le")), "utf-16")
+        self.assertEqual(detect_encoding(codecs.BOM_UTF32_LE + "abc".encode("utf-32-le")), "utf-32")
+
+    def test_bomless_utf16(self):
+        self.assertEqual(detect_encoding("Jane Doe, engineer".encode("utf-16-le")), "utf-16-le")
+        self.assertEqual(detect_encoding("Jane Doe, engineer".encode("utf-16-be")), "utf-16-be")
+
+    def test_defaults_to_utf8_even_with_invalid_bytes(self):
+        self.assertEqual(detect_encoding("héllo".encode("utf-8")), "utf-8")
+        self.assertEqual(detect_encoding("héllo".encode("cp1252")), "utf-8")
+
+
+class DecodeTextTest(unittest.TestCase):
+    def test_mixed_utf8_and_stray_cp1252_byte(self):
+        data = "héllo “x”".encode("utf-8") + b" caf\xe9"
+        self.assertEqual(decode_text(io.BytesIO(data)), "héllo “x” café")
+
+    def test_cp1252_file(self):
+        data = "naïve “quotes” – €5".encode("cp1252")
+        self.assertEqual(decode_text(io.BytesIO(data)), "naïve “quotes” – €5")
+
+    def test_multibyte_sequence_split_across_blocks(self):
+        # Blocks are at least the encoding sample size; the odd prefix puts
+        # a block boundary inside a two-byte character
+        text = "a" + "é" * 100000
+        blocks = list(iter_decoded_text(io.BytesIO(text.encode("utf-8")), block_bytes=64 * 1024))
+        self.assertGreater(len(blocks), 1)
+        self.assertEqual("".join(blocks), text)
+
+    def test_utf16_with_bom(self):
+        data = "Résumé".encode("utf-16")
+        self.assertEqual(decode_text(io.BytesIO(data)), "Résumé")
+
+
+class BlockHelpersTest(unittest.TestCase):
+    CASES = [
+        ["  \n", " Jane ", "Doe\n\n", "  ", "engineer  ", " \t"],
+        ["   "],
+        ["one", "word", " two", "three "],
+        [],
+    ]
+
+    def test_strip_blocks_matches_strip(self):
+        for blocks in self.CASES:
+            self.assertEqual("".join(strip_blocks(blocks)), "".join(blocks).strip())
+
+    def test_count_words_matches_split(self):
+        for blocks in self.CASES:
+            self.assertEqual(count_words(blocks), len("".join(blocks).split()))
+
+
+if __name__ == "__main__":
+    unittest.main()
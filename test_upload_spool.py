@@ -0,0 +1,111 @@
+"""
+Unit tests for upload spooling and streamed upload storage.
+
+Usage:
+    python -m unittest test_upload_spool
+"""
+
+import hashlib
+import io
+import os
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, os.path.abspath(os.path.dirname(__file__)))
+
+from src.utils.content_store import ContentStore, DiskContentStore, MemoryContentStore, MmapContentStore
+from src.utils.upload_spool import UploadSpool, UploadTooLargeError, spool_upload
+
+
+class UploadSpoolTest(unittest.TestCase):
+    def test_stays_in_memory_up_to_limit(self):
+        with UploadSpool(memory_limit=10) as spool:
+            spool.write(b"0123456789")
+            self.assertIsNone(spool.path)
+            self.assertEqual(spool.source(), b"0123456789")
+
+    def test_rolls_over_to_named_file(self):
+        with tempfile.TemporaryDirectory() as directory:
+            spool = UploadSpool(memory_limit=10, directory=directory)
+            spool.write(b"0123456789")
+            spool.write(b"abc")
+            path = spool.source()
+            self.assertEqual(os.path.dirname(path), directory)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"0123456789abc")
+            self.assertEqual(spool.stream().read(), b"0123456789abc")
+            self.assertEqual(spool.size, 13)
+
+            spool.close()
+            self.assertFalse(os.path.exists(path))
+
+    def test_spool_upload_hashes_in_blocks(self):
+        data = os.urandom(5000)
+        with spool_upload(io.BytesIO(data), max_bytes=10000, block_bytes=1024) as spool:
+            self.assertEqual(spool.digest, hashlib.sha256(data).hexdigest())
+            self.assertEqual(spool.stream().read(), data)
+
+    def test_rejects_oversized_upload_while_reading(self):
+        with self.assertRaises(UploadTooLargeError):
+            spool_upload(io.BytesIO(b"x" * 5000), max_bytes=4096, block_bytes=1024)
+
+    def test_rejects_oversized_upload_by_declared_size(self):
+        upload = io.BytesIO(b"x")
+        upload.size = 10 ** 9
+        with self.assertRaises(UploadTooLargeError):
+            spool_upload(upload, max_bytes=4096)
+        self.assertEqual(upload.tell(), 0)
+
+
+class StreamedContentStoreTest(unittest.TestCase):
+    def test_put_blocks_matches_put(self):
+        blocks = ["héllo ", "wörld", "", " “x”"]
+        text = "".join(blocks)
+        with tempfile.TemporaryDirectory() as directory:
+            for store in (MemoryContentStore(), DiskContentStore(directory)):
+                content_hash, characters = store.put_blocks(iter(blocks))
+                self.assertEqual(content_hash, hashlib.md5(text.encode()).hexdigest())
+                self.assertEqual(characters, len(text))
+                self.assertEqual(store.get(content_hash), text)
+                self.assertEqual(store.put(text), content_hash)
+            self.assertEqual(sorted(os.listdir(directory)), [f"{content_hash}.txt"])
+
+    def test_failed_stream_leaves_nothing_behind(self):
+        def blocks():
+            yield "partial"
+            raise IOError("read failed")
+
+        with tempfile.TemporaryDirectory() as directory:
+            with self.assertRaises(IOError):
+                DiskContentStore(directory).put_blocks(blocks())
+            self.assertEqual(os.listdir(directory), [])
+
+    def test_store_interface_is_abstract(self):
+        with self.assertRaises(TypeError):
+            ContentStore()
+
+    def test_old_content_files_are_swept_on_open(self):
+        with tempfile.TemporaryDirectory() as directory:
+            old_hash = DiskContentStore(directory).put("old")
+            new_hash = DiskContentStore(directory).put("new")
+            old_path = os.path.join(directory, f"{old_hash}.txt")
+            os.utime(old_path, (0, 0))
+            store = DiskContentStore(directory)
+            self.assertNotIn(old_hash, store)
+            self.assertEqual(store.get(new_hash), "new")
+
+    def test_mmap_discard_closes_mapping(self):
+        with tempfile.TemporaryDirectory() as directory:
+            store = MmapContentStore(directory)
+            content_hash = store.put("mapped text")
+            view = store.view(content_hash)
+            mapped = view.obj
+            view.release()
+            store.discard(content_hash)
+            self.assertTrue(mapped.closed)
+            self.assertNotIn(content_hash, store)
+
+
+if __name__ == "__main__":
+    unittest.main()